@@ -1,11 +1,26 @@
-from babySql.class_methods import MariaDB
-from babySql.class_methods import MySQL
-from babySql.class_methods import SqLite
-from babySql.class_methods import PostgreSQL
+from babySql.class_methods import load_backend
+
+__all__ = ["BabySql", "AsyncBabySql", "MySQL", "MariaDB", "SqLite", "PostgreSQL"]
+_BACKEND_NAMES = ("MySQL", "MariaDB", "SqLite", "PostgreSQL")
+
+
+def __getattr__(name: str):
+    # 数据库类按需导入，from babySql import SqLite 只会加载sqlite3
+    if name in _BACKEND_NAMES:
+        from babySql import class_methods
+        backend = getattr(class_methods, name)
+        globals()[name] = backend
+        return backend
+    # asyncio接口按需导入
+    if name == "AsyncBabySql":
+        from babySql.aio import AsyncBabySql
+        globals()[name] = AsyncBabySql
+        return AsyncBabySql
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class BabySql:
-    def __new__(cls, dt_type, host=None, port=None, user=None, passwd=None, db=None, max_connections=50):
+    def __new__(cls, dt_type, host=None, port=None, user=None, passwd=None, db=None, max_connections=50, **options):
         """
         统一数据库访问接口 - 实例化时返回相应的数据库连接类
         :param dt_type: 数据库类型 ("MySQL", "SqLite", "MariaDB", "PostgreSQL")
@@ -15,41 +30,22 @@ class BabySql:
         :param passwd: 数据库密码 (MySQL/MariaDB/PostgreSQL 需要)
         :param db: 数据库名称或SQLite文件路径
         :param max_connections: 连接池最大连接数
+        :param options: 其余参数原样传递给对应的数据库类，如SQLite的pragmas、profile
         :return: 相应的数据库连接类实例
         """
-        dt_type = dt_type.lower()
-
-        if dt_type == "mysql":
-            return MySQL(
-                host=host,
-                port=port,
-                user=user,
-                passwd=passwd,
-                db=db,
-                max_connections=max_connections
-            )
-        elif dt_type == "mariadb":
-            return MariaDB(
-                host=host,
-                port=port,
-                user=user,
-                passwd=passwd,
-                db=db,
-                max_connections=max_connections
-            )
-        elif dt_type == "postgresql":
-            return PostgreSQL(
-                host=host,
-                port=port,
-                user=user,
-                passwd=passwd,
-                db=db,
-                max_connections=max_connections
-            )
-        elif dt_type == "sqlite":
-            return SqLite(
+        backend = load_backend(dt_type)
+        if dt_type.lower() == "sqlite":
+            return backend(
                 db=db,
-                max_connections=max_connections
+                max_connections=max_connections,
+                **options
             )
-        else:
-            raise ValueError(f"不支持的数据库类型: {dt_type}")
+        return backend(
+            host=host,
+            port=port,
+            user=user,
+            passwd=passwd,
+            db=db,
+            max_connections=max_connections,
+            **options
+        )
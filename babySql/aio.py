@@ -0,0 +1,235 @@
+import asyncio
+import functools
+import inspect
+import itertools
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from babySql import BabySql
+
+
+@functools.lru_cache(maxsize=None)
+def _builder_class(db_class, method: str):
+    """
+    同步实例的select/update/delete返回的构建器类型（方法的返回值注解），未注解时为None
+    :param db_class: 同步实例的类型
+    :param method: 方法名
+    :return:
+    """
+    annotation = inspect.signature(getattr(db_class, method)).return_annotation
+    return annotation if isinstance(annotation, type) else None
+
+
+class AsyncQuery:
+    """
+    异步条件构建器：记录select/update/delete之后链式调用的条件，在run()/stream()时于执行器线程中
+    创建同步构建器并重放这些调用，await期间不占用连接池连接
+    使用示例：
+        rows = await db.select("user", ["id", "name"]).equal("name", "Rose").sort("id").run()
+    """
+
+    def __init__(self, db, method: str, args: tuple, kwargs: dict):
+        self.__db__ = db
+        self.__method__ = method
+        self.__args__ = args
+        self.__kwargs__ = kwargs
+        self.__calls__ = []
+        self.__builder__ = _builder_class(type(db.sync), method)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        # 在调用处检查方法名，而不是等到执行器线程中重放时才失败
+        builder = self.__builder__
+        if builder is not None and not callable(getattr(builder, name, None)):
+            raise AttributeError(f"'{builder.__name__}' object has no attribute '{name}'")
+
+        def record(*args, **kwargs):
+            self.__calls__.append((name, args, kwargs))
+            return self
+
+        return record
+
+    def _build(self):
+        """
+        在执行器线程中创建同步构建器并重放链式调用
+        :return:
+        """
+        builder = getattr(self.__db__.sync, self.__method__)(*self.__args__, **self.__kwargs__)
+        for name, args, kwargs in self.__calls__:
+            builder = getattr(builder, name)(*args, **kwargs)
+        return builder
+
+    async def run(self, format: str = "rows"):
+        """
+        执行查询/修改
+        :param format: 结果格式：rows或columnar
+        :return: 与同步构建器的run()相同
+        """
+        if format == "rows":
+            return await self.__db__._call(lambda: self._build().run())
+        return await self.__db__._call(lambda: self._build().run(format))
+
+    async def to_columns(self, batch_size: int = 10000, kind: str = "array"):
+        """
+        执行查询并按列返回结果
+        :param batch_size: 每批读取的记录数
+        :param kind: 列类型：array或numpy
+        :return: 与同步构建器的to_columns()相同
+        """
+        return await self.__db__._call(lambda: self._build().to_columns(batch_size, kind))
+
+    async def to_dataframe(self, batch_size: int = 10000):
+        """
+        执行查询并返回pandas.DataFrame
+        :param batch_size: 每批读取的记录数
+        :return: pandas.DataFrame
+        """
+        return await self.__db__._call(lambda: self._build().to_dataframe(batch_size))
+
+    async def stream(self, batch_size: int = 1000):
+        """
+        异步流式查询，每次在执行器线程中读取一批数据，逐行返回\n
+        async for row in db.select("user").stream(): ...\n
+        提前退出循环或任务被取消时，会在执行器线程中关闭游标并归还连接
+        :param batch_size: 每批读取的行数
+        :return: 异步迭代器
+        """
+        if type(batch_size) is not int:
+            raise TypeError('batch_size should be int')
+        rows = await self.__db__._call(lambda: self._build().stream(batch_size))
+        try:
+            while True:
+                batch = await self.__db__._call(lambda: list(itertools.islice(rows, batch_size)))
+                if not batch:
+                    break
+                for row in batch:
+                    yield row
+        finally:
+            await self.__db__._call(rows.close)
+
+
+class AsyncBabySql:
+    """
+    babySql的asyncio接口，所有阻塞操作在一个与连接池大小相同的专用线程池中执行
+    使用示例：
+        db = AsyncBabySql(dt_type="mysql", host="127.0.0.1", port=3306, user="root", passwd="root123", db="test")
+        await db.insert("user", ["id", "name"], [1, "Rose"])
+        rows = await db.select("user", ["id", "name"]).equal("id", 1).run()
+        async for row in db.select("user").stream(batch_size=1000):
+            print(row)
+        await db.close()
+    """
+
+    def __init__(self, dt_type, host=None, port=None, user=None, passwd=None, db=None, max_connections=50,
+                 max_workers: int = None, **options):
+        """
+        :param dt_type: 数据库类型 ("MySQL", "SqLite", "MariaDB", "PostgreSQL")
+        :param max_workers: 执行器线程数，默认与max_connections相同，使线程不会因等待连接而阻塞
+        其余参数与BabySql相同
+        """
+        sync = BabySql(dt_type, host=host, port=port, user=user, passwd=passwd, db=db,
+                       max_connections=max_connections, **options)
+        self._init(sync, max_workers or max_connections)
+
+    @classmethod
+    def wrap(cls, sync, max_workers: int = 50):
+        """
+        包装已创建的同步实例
+        :param sync: MySQL/MariaDB/PostgreSQL/SqLite实例
+        :param max_workers: 执行器线程数，建议与连接池最大连接数相同
+        :return:
+        """
+        self = cls.__new__(cls)
+        self._init(sync, max_workers)
+        return self
+
+    def _init(self, sync, max_workers: int):
+        if type(max_workers) is not int:
+            raise TypeError("max_workers should be int")
+        if max_workers < 1:
+            raise ValueError("max_workers should be greater than 0")
+        self.__sync__ = sync
+        self.__executor__ = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="babysql-aio")
+
+    @property
+    def sync(self):
+        """
+        被包装的同步实例
+        :return:
+        """
+        return self.__sync__
+
+    async def _call(self, func):
+        """
+        在执行器中运行阻塞函数；等待期间任务被取消时，尚未开始执行的调用不会再执行
+        :param func: 无参可调用对象
+        :return:
+        """
+        result = await asyncio.get_running_loop().run_in_executor(self.__executor__, func)
+        # SQLite单写线程模式下写操作返回Future，等待其提交
+        if isinstance(result, Future):
+            result = await asyncio.wrap_future(result)
+        return result
+
+    def select(self, *args, **kwargs):
+        """
+        查询数据，参数与同步版本相同
+        :return: AsyncQuery
+        """
+        return AsyncQuery(self, "select", args, kwargs)
+
+    def update(self, *args, **kwargs):
+        """
+        更新数据，参数与同步版本相同
+        :return: AsyncQuery
+        """
+        return AsyncQuery(self, "update", args, kwargs)
+
+    def delete(self, *args, **kwargs):
+        """
+        删除数据，参数与同步版本相同
+        :return: AsyncQuery
+        """
+        return AsyncQuery(self, "delete", args, kwargs)
+
+    async def insert(self, *args, **kwargs):
+        """
+        插入数据，参数与同步版本相同
+        :return:
+        """
+        return await self._call(functools.partial(self.__sync__.insert, *args, **kwargs))
+
+    async def user_defined_sql(self, *args, **kwargs):
+        """
+        执行自定义SQL，参数与同步版本相同
+        :return:
+        """
+        return await self._call(functools.partial(self.__sync__.user_defined_sql, *args, **kwargs))
+
+    def __getattr__(self, name):
+        # 其余同步方法（bulk_insert、show_table等）包装为协程
+        if name.startswith("_"):
+            raise AttributeError(name)
+        method = getattr(self.__sync__, name)
+        if not callable(method):
+            return method
+
+        async def call(*args, **kwargs):
+            return await self._call(functools.partial(method, *args, **kwargs))
+
+        return call
+
+    async def close(self):
+        """
+        等待执行中的操作结束，关闭执行器与连接池
+        :return:
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self.__executor__.shutdown)
+        self.__sync__.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
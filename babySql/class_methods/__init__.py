@@ -1,4 +1,39 @@
-from babySql.class_methods.cm_mysql import MySQL
-from babySql.class_methods.cm_mariadb import MariaDB
-from babySql.class_methods.cm_sqlite import SqLite
-from babySql.class_methods.cm_postgresql import PostgreSQL
+import importlib
+
+# 数据库类型 -> (模块, 类名)，后端在第一次使用时才导入，只加载实际用到的数据库驱动
+BACKENDS = {
+    "mysql": ("babySql.class_methods.cm_mysql", "MySQL"),
+    "mariadb": ("babySql.class_methods.cm_mariadb", "MariaDB"),
+    "sqlite": ("babySql.class_methods.cm_sqlite", "SqLite"),
+    "postgresql": ("babySql.class_methods.cm_postgresql", "PostgreSQL"),
+}
+_CLASS_NAMES = {class_name: dt_type for dt_type, (_, class_name) in BACKENDS.items()}
+
+__all__ = ["MySQL", "MariaDB", "SqLite", "PostgreSQL", "BACKENDS", "load_backend"]
+
+
+def load_backend(dt_type: str):
+    """
+    按数据库类型加载对应的数据库类
+    :param dt_type: 数据库类型 ("mysql", "sqlite", "mariadb", "postgresql")，不区分大小写
+    :return: 数据库类
+    """
+    if type(dt_type) is not str:
+        raise TypeError("dt_type should be str")
+    backend = BACKENDS.get(dt_type.lower())
+    if backend is None:
+        raise ValueError(f"不支持的数据库类型: {dt_type}")
+    module, class_name = backend
+    return getattr(importlib.import_module(module), class_name)
+
+
+def __getattr__(name: str):
+    if name in _CLASS_NAMES:
+        backend = load_backend(_CLASS_NAMES[name])
+        globals()[name] = backend
+        return backend
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_CLASS_NAMES))
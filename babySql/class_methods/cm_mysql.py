@@ -1,11 +1,21 @@
 import pymysql
-from dbutils.pooled_db import PooledDB
-from babySql.tools import MySQLSelectConditionsBuilder, MySQLCreateTable
+from babySql.tools import MySQLSelectConditionsBuilder, MySQLCreateTable, Transaction
+from babySql.tools import bulk
+from babySql.tools.keywords import load_keywords
+from babySql.tools.cache import ResultCache
+from babySql.tools.rows import check_row_factory, ROW_FACTORIES
+from babySql.tools.pool import StatsPooledDB, check_pool_options, warm_size
+from babySql.tools.router import ROUTES, ReplicaRouter, replica_configs
+from babySql.tools.select.s_base import is_read_sql
 
 
 class MySQL:
 
-    def __init__(self, host: str, port: int, user: str, passwd: str, db: str = None, max_connections: int = 50):
+    def __init__(self, host: str, port: int, user: str, passwd: str, db: str = None, max_connections: int = 50,
+                 mincached: int = 0, maxcached: int = 0, blocking: bool = False, maxusage: int = None,
+                 ping: int = 1, setsession: list = None, reset: bool = None, warm=False,
+                 replicas: list = None, read_strategy: str = "round_robin", read_your_writes: float = 0,
+                 result_cache: int = 0, result_cache_ttl: float = None, row_factory: str = "tuple"):
         """
         babySql for MySQL
         :param host: 数据库地址
@@ -14,11 +24,31 @@ class MySQL:
         :param passwd: 用户密码
         :param db: 数据库名称
         :param max_connections: 最大连接数
+        :param mincached: 启动时创建的空闲连接数
+        :param maxcached: 最多保留的空闲连接数，0为不限制
+        :param blocking: 连接数达到上限时是否阻塞等待，False时抛出TooManyConnectionsError
+        :param maxusage: 单个连接最多使用次数，达到后重新连接，None为不限制
+        :param ping: 何时检查连接是否可用，与dbutils的ping参数相同
+        :param setsession: 新建连接时执行的SQL列表
+        :param reset: 归还连接时是否回滚，默认True
+        :param warm: 创建时调用warmup()并行预热连接池：True为预热mincached个连接（需设置mincached），整数为预热的连接数
+        :param replicas: 只读实例列表，如[{"host": "10.0.0.2"}, {"host": "10.0.0.3", "port": 3307}]，
+                         未设置的连接参数与主库相同；设置后select()与只读的user_defined_sql()使用只读实例
+        :param read_strategy: 只读实例的负载均衡策略，"round_robin"轮询，"least_busy"选择占用连接最少的实例
+        :param read_your_writes: 写操作后查询仍使用主库的时间（秒），0为不启用
+        :param result_cache: 结果缓存的最大查询数，0为不启用；启用后调用了cache()的查询结果按SQL与参数缓存
+        :param result_cache_ttl: 结果缓存的默认时间（秒），None为不过期
+        :param row_factory: select()返回的行格式："tuple"元组（默认）；"named"按查询字段生成的元组子类，可按属性、字段名或下标访问；
+                            "dict"字典（pymysql的DictCursor）
         """
         if type(db) is not str:
             raise TypeError("db should be str")
         if type(max_connections) is not int:
             raise TypeError("max_connections should be int")
+        check_pool_options(mincached, maxcached, blocking, maxusage, ping, setsession, reset)
+        if type(result_cache) is not int:
+            raise TypeError("result_cache should be int")
+        check_row_factory(row_factory, ROW_FACTORIES)
         if type(user) is not str:
             raise TypeError("user should be str")
         if type(passwd) is not str:
@@ -33,18 +63,105 @@ class MySQL:
         self.__passwd__ = passwd
         self.__db__ = db
         self.__max_connections__ = max_connections
-        self.__pool__ = PooledDB(
+        # 关键字集合，第一次select指定字段时加载
+        self.__keywords__ = None
+        self.__cache__ = ResultCache(result_cache, result_cache_ttl) if result_cache else None
+        self.__row_factory__ = row_factory
+        # warmup()默认的预热连接数
+        self.__warm_size__ = warm_size(warm, mincached, max_connections)
+        # 主库与只读实例共用的连接池参数，预热时由warmup()并行创建连接
+        self.__pool_options__ = {
+            "mincached": 0 if warm else mincached,
+            "maxcached": maxcached,
+            "maxconnections": self.__max_connections__,
+            "blocking": blocking,
+            "maxusage": maxusage,
+            "setsession": setsession,
+            # 归还连接时回滚，结束只读查询未提交的事务（及其一致性读快照）
+            "reset": True if reset is None else reset,
+            "ping": ping,
+        }
+        self.__pool__ = self._new_pool(host, port, user, passwd, db)
+        self.__router__ = None
+        if replicas is not None:
+            configs = replica_configs(replicas, {"host": host, "port": port, "user": user, "passwd": passwd, "db": db})
+            self.__router__ = ReplicaRouter(self.__pool__, [self._new_pool(**config) for config in configs],
+                                            read_strategy, read_your_writes)
+        if warm:
+            self.warmup()
+
+    def _new_pool(self, host: str, port: int, user: str, passwd: str, db: str):
+        """
+        创建主库或只读实例的连接池
+        :param host: 数据库地址
+        :param port: 数据库端口
+        :param user: 操作用户
+        :param passwd: 用户密码
+        :param db: 数据库名称
+        :return:
+        """
+        return StatsPooledDB(
             creator=pymysql,
-            maxconnections=self.__max_connections__,
+            **self.__pool_options__,
             **{
-                'host': self.__host__,
-                'port': self.__port__,
-                'user': self.__user__,
-                'password': self.__passwd__,
-                'database': self.__db__
+                'host': host,
+                'port': port,
+                'user': user,
+                'password': passwd,
+                'database': db
             }
         )
 
+    def _read_pool(self, route: str = None):
+        """
+        查询使用的连接池，设置了只读实例时按路由选择
+        :param route: None自动选择，"primary"主库，"replica"只读实例
+        :return:
+        """
+        if route is not None and route not in ROUTES:
+            raise ValueError(f"route should be one of {list(ROUTES)}")
+        if self.__router__ is None:
+            if route == "replica":
+                raise ValueError("route 'replica' requires replicas")
+            return self.__pool__
+        return self.__router__.reader(route)
+
+    def _write_pool(self):
+        """
+        写操作使用的连接池，设置了只读实例时写操作结束后开始read-your-writes窗口
+        :return:
+        """
+        if self.__router__ is None:
+            return self.__pool__
+        return self.__router__.writer()
+
+    def _invalidate(self, *tables):
+        """
+        写操作后使相关表的结果缓存失效
+        :param tables: 表名
+        :return:
+        """
+        if self.__cache__ is not None:
+            self.__cache__.invalidate(tables)
+
+    def cache_stats(self):
+        """
+        结果缓存统计：hits/misses（命中/未命中）、evictions（LRU淘汰）、expirations（过期）、
+        invalidations（因写操作失效）、size（当前缓存的查询数）、hit_rate（命中率）
+        :return: 未启用结果缓存时返回None
+        """
+        if self.__cache__ is None:
+            return None
+        return self.__cache__.stats()
+
+    def clear_cache(self):
+        """
+        清空结果缓存
+        :return:
+        """
+        if self.__cache__ is not None:
+            self.__cache__.clear()
+
     def connect_information(self):
         """
         返回数据库连接信息
@@ -58,27 +175,91 @@ class MySQL:
             "db": self.__db__
         }
 
-    def user_defined_sql(self, sql: str, params: tuple = None):
+    def warmup(self, n: int = None):
+        """
+        预热连接池：并行新建并验证n个连接（执行setsession），避免启动后的第一批请求承担建立连接的耗时
+        :param n: 预热后的空闲连接数，默认为warm设置的连接数或mincached
+        :return: 预热报告，如{"requested": 10, "opened": 10, "failed": 0, "idle": 10, "seconds": 0.05, ...}，
+                 设置了只读实例时replicas为各只读实例的预热报告
+        """
+        n = self.__warm_size__ if n is None else n
+        report = self.__pool__.warmup(n)
+        if self.__router__ is not None:
+            report["replicas"] = [pool.warmup(n) for pool in self.__router__.replicas]
+        return report
+
+    def pool_stats(self):
+        """
+        连接池统计：checkouts（取出次数）、returns（归还次数）、created/closed（新建/关闭的连接数）、
+        rejected（连接数达到上限被拒绝的次数）、waits（需要等待的次数）、等待耗时与直方图、in_use/idle（当前占用/空闲连接数）
+        设置了只读实例时replicas为各只读实例的连接池统计，routing为读写路由统计
+        :return:
+        """
+        stats = self.__pool__.stats()
+        if self.__router__ is not None:
+            stats["replicas"] = [pool.stats() for pool in self.__router__.replicas]
+            stats["routing"] = self.__router__.stats()
+        return stats
+
+    def add_listener(self, listener):
+        """
+        添加语句执行监听器，所有经过连接池（包括只读实例）执行的语句触发before/after/error事件\n
+        db.add_listener(SlowQueryLogger(threshold=0.5))
+        :param listener: QueryListener的子类实例或具有before/after/error方法的对象
+        :return:
+        """
+        for pool in self._pools():
+            pool.add_listener(listener)
+
+    def remove_listener(self, listener):
+        """
+        移除语句执行监听器
+        :param listener: 监听器
+        :return:
+        """
+        for pool in self._pools():
+            pool.remove_listener(listener)
+
+    def _pools(self):
+        """
+        主库与只读实例的连接池
+        :return:
+        """
+        if self.__router__ is None:
+            return [self.__pool__]
+        return [self.__pool__] + self.__router__.replicas
+
+    def user_defined_sql(self, sql: str, params: tuple = None, route: str = None):
         """
         运行自定义SQL\n
         在不输入参数: user_defined_sql('select name from user where id = 1')\n
         输入参数: user_defined_sql('select name from user where id = %s', (1))
         :param sql: SQL
         :param params: 参数，输入参数为参数化查询
+        :param route: 设置了只读实例时只读语句的路由，None自动选择，"primary"主库，"replica"只读实例；写语句总是使用主库
         :return:
         """
         if type(sql) is not str:
             raise TypeError("sql should be str")
         if params is not None and type(params) is not tuple:
             raise TypeError("params should be tuple")
-        connect = self.__pool__.connection()
+        if route is not None and route not in ROUTES:
+            raise ValueError(f"route should be one of {list(ROUTES)}")
+        read = is_read_sql(sql)
+        if not read and route == "replica":
+            raise ValueError("only read-only statements can be routed to a replica")
+        connect = (self._read_pool(route) if read else self._write_pool()).connection()
         cursor = connect.cursor()
         if params is None:
             cursor.execute(sql)
         else:
             cursor.execute(sql, params)
         row = cursor.fetchall()
-        connect.commit()
+        # 只读语句无需提交
+        if not read:
+            connect.commit()
+            # 无法确定自定义SQL修改了哪些表，清空结果缓存
+            self.clear_cache()
         cursor.close()
         connect.close()
         return row
@@ -103,42 +284,106 @@ class MySQL:
             raise TypeError(f"values {columns} type is not list")
         column = "(" + ", ".join(columns) + ")"
         if type(values[0]) is list:
-            params = ()
-            value_list = []
+            params = []
+            row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
             for value in values:
                 if len(value) == len(columns):
-                    for value_s in value:
-                        params += (value_s,)
-                    value_list.append("(" + ", ".join(["%s" for _ in value]) + ")")
+                    params.extend(value)
                 else:
                     raise ValueError(f"{columns}->{len(columns)} != {value}->{len(value)}")
-            values = ", ".join(value_list)
+            values = ", ".join([row_placeholder] * len(values))
             sql = f"insert into {table} {column} values {values};"
-            connect = self.__pool__.connection()
+            connect = self._write_pool().connection()
             cursor = connect.cursor()
             cursor.execute(sql, params)
             connect.commit()
             cursor.close()
             connect.close()
+            self._invalidate(table)
             return sql
         else:
-            params = ()
             if len(values) == len(columns):
-                for value_s in values:
-                    params += (value_s,)
+                params = tuple(values)
                 values = "(" + ", ".join(["%s" for _ in values]) + ")"
                 sql = f"insert into {table} {column} values {values};"
-                connect = self.__pool__.connection()
+                connect = self._write_pool().connection()
                 cursor = connect.cursor()
                 cursor.execute(sql, params)
                 connect.commit()
                 cursor.close()
                 connect.close()
+                self._invalidate(table)
                 return sql
             else:
                 raise ValueError(f"{columns}->{len(columns)} != {values}->{len(values)}")
 
-    def update(self, table: str, columns_values: dict):
+    def bulk_insert(self, table: str, columns: list, values, chunk_rows: int = 1000,
+                    chunk_bytes: int = 1024 * 1024, transaction: bool = True) -> int:
+        """
+        批量插入数据，按行数和字节预算将数据切分为多条INSERT语句执行，避免单条语句超过max_allowed_packet\n
+        bulk_insert('user', ['id', 'name'], [[1, 'Rose'], [2, 'Jack']], chunk_rows=500)
+        :param table: 表名
+        :param columns: 字段
+        :param values: 插入数据，每行为list或tuple，可以是任意可迭代对象（如生成器）
+        :param chunk_rows: 每条语句的最大行数
+        :param chunk_bytes: 每条语句VALUES部分的最大字节数，应小于服务端的max_allowed_packet
+        :param transaction: True时所有批次在同一个事务中提交，False时每批单独提交
+        :return: 影响的总行数
+        """
+        if type(table) is not str:
+            raise TypeError("table should be str")
+        if type(columns) is not list:
+            raise TypeError(f"columns {columns} type is not list")
+        if isinstance(values, (str, bytes, dict)) or not hasattr(values, "__iter__"):
+            raise TypeError("values should be an iterable of rows")
+        if type(chunk_rows) is not int:
+            raise TypeError("chunk_rows should be int")
+        if type(chunk_bytes) is not int:
+            raise TypeError("chunk_bytes should be int")
+        if type(transaction) is not bool:
+            raise TypeError("transaction should be bool")
+        if chunk_rows <= 0 or chunk_bytes <= 0:
+            raise ValueError("chunk_rows and chunk_bytes must be greater than 0")
+        column = "(" + ", ".join(columns) + ")"
+        row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        total = 0
+        connect = self._write_pool().connection()
+        cursor = connect.cursor()
+        try:
+            if transaction:
+                connect.begin()
+            for rows in bulk.chunk_rows(values, len(columns), chunk_rows, chunk_bytes):
+                params = []
+                for row in rows:
+                    params.extend(row)
+                sql = f"insert into {table} {column} values {', '.join([row_placeholder] * len(rows))};"
+                total += cursor.execute(sql, params)
+                if not transaction:
+                    connect.commit()
+            if transaction:
+                connect.commit()
+        except Exception:
+            connect.rollback()
+            raise
+        finally:
+            cursor.close()
+            connect.close()
+            # 逐批提交时失败前的批次已经写入
+            self._invalidate(table)
+        return total
+
+    def transaction(self):
+        """
+        开启跨多个操作的事务，事务内的insert/select/update/delete等方法共用同一个连接，
+        正常退出with块时提交一次，出现异常时回滚\n
+        with db.transaction() as tx:\n
+            tx.insert("user", ["id", "name"], [1, "Rose"])\n
+            tx.update("user", {"name": "Jack"}).equal("id", 1).run()
+        :return: 事务对象
+        """
+        return Transaction(self)
+
+    def update(self, table: str, columns_values: dict) -> MySQLSelectConditionsBuilder:
         """
         更新数据
         :param table: 表名
@@ -149,13 +394,12 @@ class MySQL:
             raise TypeError("table should be str")
         if type(columns_values) is not dict:
             raise TypeError(f"columns_values {columns_values} type is not dict")
-        cvs = ', '.join([f"{k}='{v}'" for k, v in columns_values.items()])
+        cvs = ', '.join([f"{k}=%s" for k in columns_values.keys()])
         head_sql = f"UPDATE {table} SET {cvs} "
-        connect = self.__pool__.connection()
-        cursor = connect.cursor()
-        return MySQLSelectConditionsBuilder(head_sql, cursor, connect)
+        builder = MySQLSelectConditionsBuilder(head_sql, self._write_pool(), tuple(columns_values.values()))
+        return builder._use_cache(self.__cache__, (table,))
 
-    def delete(self, table: str):
+    def delete(self, table: str) -> MySQLSelectConditionsBuilder:
         """
         删除数据
         :param table: 表名
@@ -163,16 +407,16 @@ class MySQL:
         """
         if type(table) is not str:
             raise TypeError("table should be str")
-        connect = self.__pool__.connection()
-        cursor = connect.cursor()
         head_sql = f"DELETE FROM {table}"
-        return MySQLSelectConditionsBuilder(head_sql, cursor, connect)
+        builder = MySQLSelectConditionsBuilder(head_sql, self._write_pool())
+        return builder._use_cache(self.__cache__, (table,))
 
-    def select(self, table: str, columns: list = None):
+    def select(self, table: str, columns: list = None, route: str = None) -> MySQLSelectConditionsBuilder:
         """
         查询数据
         :param table: 表名
         :param columns: 字段名，默认为全部
+        :param route: 设置了只读实例时的路由，None自动选择，"primary"主库，"replica"只读实例
         :return:
         """
         if type(table) is not str:
@@ -182,7 +426,7 @@ class MySQL:
         if columns is None:
             columns_str = "*"
         else:
-            keywords = [i[0] for i in self.user_defined_sql("SELECT `name` from mysql.help_keyword")]
+            keywords = self._keywords()
             add_columns = []
             for i in columns:
                 if i.upper() in keywords:
@@ -191,9 +435,28 @@ class MySQL:
                     add_columns.append(f"{i}")
             columns_str = ", ".join(add_columns)
         head_sql = f"SELECT {columns_str} FROM {table}"
-        connect = self.__pool__.connection()
-        cursor = connect.cursor()
-        return MySQLSelectConditionsBuilder(head_sql, cursor, connect)
+        builder = MySQLSelectConditionsBuilder(head_sql, self._read_pool(route))
+        return builder._use_cache(self.__cache__, (table,))._use_rows(self.__row_factory__)
+
+    def _keywords(self):
+        """
+        获取当前服务端版本的关键字集合，按版本在进程内缓存，实例内只在第一次使用时获取一次服务端版本
+        :return:
+        """
+        if self.__keywords__ is None:
+            connect = self.__pool__.connection()
+            cursor = connect.cursor()
+
+            def loader():
+                cursor.execute("SELECT `name` from mysql.help_keyword")
+                return [i[0] for i in cursor.fetchall()]
+
+            try:
+                self.__keywords__ = load_keywords("mysql", cursor.connection.get_server_info(), loader)
+            finally:
+                cursor.close()
+                connect.close()
+        return self.__keywords__
 
     def create_table(self, table_name: str, table_comment=None):
         """
@@ -210,7 +473,7 @@ class MySQL:
             raise TypeError("table_name should be str")
         if table_name is not None and type(table_comment) is not str:
             raise TypeError("table_comment should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         return MySQLCreateTable(connect, cursor, table_name, table_comment=table_comment)
 
@@ -228,7 +491,7 @@ class MySQL:
             raise TypeError("character should be str")
         if type(collate) is not str:
             raise TypeError("collate should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"CREATE DATABASE IF NOT EXISTS {database_name} CHARACTER SET {character} COLLATE {collate}"
         cursor.execute(sql)
@@ -244,13 +507,14 @@ class MySQL:
         """
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"DROP TABLE IF EXISTS {table_name};"
         cursor.execute(sql)
         connect.commit()
         cursor.close()
         connect.close()
+        self._invalidate(table_name)
 
     def show_table(self):
         """
@@ -262,7 +526,6 @@ class MySQL:
         sql = f"SHOW TABLES;"
         cursor.execute(sql)
         row = cursor.fetchall()
-        connect.commit()
         cursor.close()
         connect.close()
         return row
@@ -280,7 +543,6 @@ class MySQL:
         sql = f"SELECT TABLE_NAME AS '表名' FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = '{name}';"
         cursor.execute(sql)
         row = cursor.fetchall()
-        connect.commit()
         cursor.close()
         connect.close()
         return row
@@ -295,7 +557,6 @@ class MySQL:
         sql = f"SHOW DATABASES;"
         cursor.execute(sql)
         row = cursor.fetchall()
-        connect.commit()
         cursor.close()
         connect.close()
         return row
@@ -308,13 +569,14 @@ class MySQL:
         """
         if type(database_name) is not str:
             raise TypeError("database_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"DROP DATABASE IF EXISTS {database_name}"
         cursor.execute(sql)
         connect.commit()
         cursor.close()
         connect.close()
+        self.clear_cache()
 
     def alter_table_name(self, table_name: str, new_table_name: str):
         """
@@ -327,13 +589,14 @@ class MySQL:
             raise TypeError("table_name should be str")
         if type(new_table_name) is not str:
             raise TypeError("new_table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"ALTER TABLE {table_name} RENAME TO {new_table_name}"
         cursor.execute(sql)
         connect.commit()
         cursor.close()
         connect.close()
+        self._invalidate(table_name, new_table_name)
 
     def drop_column(self, table_name: str, column: str):
         """
@@ -346,13 +609,14 @@ class MySQL:
             raise TypeError("column should be str")
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"ALTER TABLE {table_name} DROP {column};"
         cursor.execute(sql)
         connect.commit()
         cursor.close()
         connect.close()
+        self._invalidate(table_name)
 
     def alter_column_type(self, table_name: str, column_name: str, column_type: str, length: int,
                           is_not_null: bool = True, is_primary_key: str = False, is_auto_increment: str = False):
@@ -381,7 +645,7 @@ class MySQL:
             raise TypeError("is_auto_increment should be bool")
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         constraint = ""
         if is_not_null:
@@ -396,6 +660,7 @@ class MySQL:
         connect.commit()
         cursor.close()
         connect.close()
+        self._invalidate(table_name)
 
     def alter_column_name(self, table_name: str, column_name: str, new_column_name: str, column_type: str, length: int):
         """
@@ -417,13 +682,14 @@ class MySQL:
             raise TypeError("length should be int")
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"ALTER TABLE {table_name} CHANGE {column_name} {new_column_name} {column_type}({length})"
         cursor.execute(sql)
         connect.commit()
         cursor.close()
         connect.close()
+        self._invalidate(table_name)
 
     def add_column(self, table_name: str, column_name: str, column_type: str = "varchar", length: int = 255,
                    is_not_null: bool = True, is_primary_key: str = False, is_auto_increment: str = False,
@@ -456,7 +722,7 @@ class MySQL:
             raise TypeError("table_name should be str")
         if type(is_first) is not bool:
             raise TypeError("is_first should be bool")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         constraint = ""
         if is_not_null:
@@ -473,6 +739,7 @@ class MySQL:
         connect.commit()
         cursor.close()
         connect.close()
+        self._invalidate(table_name)
 
     def create_index(self, table_name: str, column_name: str, index_name: str):
         """
@@ -488,7 +755,7 @@ class MySQL:
             raise TypeError("index_name should be str")
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"CREATE INDEX {index_name} ON {table_name} ({column_name});"
         cursor.execute(sql)
@@ -510,7 +777,7 @@ class MySQL:
             raise TypeError("index_name should be str")
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"CREATE UNIQUE INDEX {index_name} ON {table_name} ({column_name});"
         cursor.execute(sql)
@@ -529,7 +796,7 @@ class MySQL:
             raise TypeError("index_name should be str")
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"ALTER TABLE {table_name} DROP INDEX {index_name};"
         cursor.execute(sql)
@@ -542,7 +809,7 @@ class MySQL:
         返回游标
         :return:
         """
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         return cursor
 
@@ -551,7 +818,7 @@ class MySQL:
         返回连接
         :return:
         """
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         return connect
 
     def show_columns(self, database: str, table: str):
@@ -566,9 +833,12 @@ class MySQL:
         if type(table) is not str:
             raise TypeError("table should be str")
         columns = ["COLUMN_NAME", "DATA_TYPE"]
-        dt = self.select("INFORMATION_SCHEMA.COLUMNS", columns) \
+        # 表结构在DDL后立即读取，不使用可能存在复制延迟的只读实例
+        dt = self.select("INFORMATION_SCHEMA.COLUMNS", columns, route="primary") \
             .equal("TABLE_SCHEMA", database, "and").equal("TABLE_NAME", table, "and").run()
         return dt
 
     def close(self):
+        if self.__router__ is not None:
+            self.__router__.close()
         self.__pool__.close()
@@ -1,10 +1,20 @@
+import io
 import psycopg2
-from dbutils.pooled_db import PooledDB
-from babySql.tools import PostgreSQLSelectConditionsBuilder, PostgreSQLCreateTable
+from babySql.tools import PostgreSQLSelectConditionsBuilder, PostgreSQLCreateTable, Transaction
+from babySql.tools import bulk
+from babySql.tools.cache import ResultCache
+from babySql.tools.rows import check_row_factory, ROW_FACTORIES
+from babySql.tools.pool import StatsPooledDB, check_pool_options, warm_size
+from babySql.tools.router import ROUTES, ReplicaRouter, replica_configs
+from babySql.tools.select.s_base import is_read_sql
 
 
 class PostgreSQL:
-    def __init__(self, host: str, port: int, user: str, passwd: str, db: str = None, max_connections: int = 50):
+    def __init__(self, host: str, port: int, user: str, passwd: str, db: str = None, max_connections: int = 50,
+                 mincached: int = 0, maxcached: int = 0, blocking: bool = False, maxusage: int = None,
+                 ping: int = 1, setsession: list = None, reset: bool = None, warm=False,
+                 replicas: list = None, read_strategy: str = "round_robin", read_your_writes: float = 0,
+                 result_cache: int = 0, result_cache_ttl: float = None, row_factory: str = "tuple"):
         """
         babySql for PostgreSQL
         :param host: 数据库地址
@@ -13,6 +23,22 @@ class PostgreSQL:
         :param passwd: 用户密码
         :param db: 数据库名称
         :param max_connections: 最大连接数
+        :param mincached: 启动时创建的空闲连接数
+        :param maxcached: 最多保留的空闲连接数，0为不限制
+        :param blocking: 连接数达到上限时是否阻塞等待，False时抛出TooManyConnectionsError
+        :param maxusage: 单个连接最多使用次数，达到后重新连接，None为不限制
+        :param ping: 何时检查连接是否可用，与dbutils的ping参数相同
+        :param setsession: 新建连接时执行的SQL列表
+        :param reset: 归还连接时是否回滚，默认True
+        :param warm: 创建时调用warmup()并行预热连接池：True为预热mincached个连接（需设置mincached），整数为预热的连接数
+        :param replicas: 只读实例列表，如[{"host": "10.0.0.2"}, {"host": "10.0.0.3", "port": 3307}]，
+                         未设置的连接参数与主库相同；设置后select()与只读的user_defined_sql()使用只读实例
+        :param read_strategy: 只读实例的负载均衡策略，"round_robin"轮询，"least_busy"选择占用连接最少的实例
+        :param read_your_writes: 写操作后查询仍使用主库的时间（秒），0为不启用
+        :param result_cache: 结果缓存的最大查询数，0为不启用；启用后调用了cache()的查询结果按SQL与参数缓存
+        :param result_cache_ttl: 结果缓存的默认时间（秒），None为不过期
+        :param row_factory: select()返回的行格式："tuple"元组（默认）；"named"按查询字段生成的元组子类，可按属性、字段名或下标访问；
+                            "dict"字典（psycopg2的RealDictCursor）
         """
         if type(host) is not str:
             raise TypeError("host should be str")
@@ -26,24 +52,112 @@ class PostgreSQL:
             raise TypeError("database should be str")
         if type(max_connections) is not int:
             raise TypeError("max_connections should be int")
+        check_pool_options(mincached, maxcached, blocking, maxusage, ping, setsession, reset)
+        if type(result_cache) is not int:
+            raise TypeError("result_cache should be int")
+        check_row_factory(row_factory, ROW_FACTORIES)
         self.__host__ = host
         self.__port__ = port
         self.__user__ = user
         self.__passwd__ = passwd
         self.__db__ = db
         self.__max_connections__ = max_connections
-        self.__pool__ = PooledDB(
+        self.__cache__ = ResultCache(result_cache, result_cache_ttl) if result_cache else None
+        self.__row_factory__ = row_factory
+        # warmup()默认的预热连接数
+        self.__warm_size__ = warm_size(warm, mincached, max_connections)
+        # 主库与只读实例共用的连接池参数，预热时由warmup()并行创建连接
+        self.__pool_options__ = {
+            "mincached": 0 if warm else mincached,
+            "maxcached": maxcached,
+            "maxconnections": self.__max_connections__,
+            "blocking": blocking,
+            "maxusage": maxusage,
+            "setsession": setsession,
+            "reset": True if reset is None else reset,
+            "ping": ping,
+        }
+        self.__pool__ = self._new_pool(host, port, user, passwd, db)
+        self.__router__ = None
+        if replicas is not None:
+            configs = replica_configs(replicas, {"host": host, "port": port, "user": user, "passwd": passwd, "db": db})
+            self.__router__ = ReplicaRouter(self.__pool__, [self._new_pool(**config) for config in configs],
+                                            read_strategy, read_your_writes)
+        if warm:
+            self.warmup()
+
+    def _new_pool(self, host: str, port: int, user: str, passwd: str, db: str):
+        """
+        创建主库或只读实例的连接池
+        :param host: 数据库地址
+        :param port: 数据库端口
+        :param user: 操作用户
+        :param passwd: 用户密码
+        :param db: 数据库名称
+        :return:
+        """
+        return StatsPooledDB(
             creator=psycopg2,
-            maxconnections=self.__max_connections__,
+            **self.__pool_options__,
             **{
-                'host': self.__host__,
-                'port': self.__port__,
-                'user': self.__user__,
-                'password': self.__passwd__,
-                'database': self.__db__
+                'host': host,
+                'port': port,
+                'user': user,
+                'password': passwd,
+                'database': db
             }
         )
 
+    def _read_pool(self, route: str = None):
+        """
+        查询使用的连接池，设置了只读实例时按路由选择
+        :param route: None自动选择，"primary"主库，"replica"只读实例
+        :return:
+        """
+        if route is not None and route not in ROUTES:
+            raise ValueError(f"route should be one of {list(ROUTES)}")
+        if self.__router__ is None:
+            if route == "replica":
+                raise ValueError("route 'replica' requires replicas")
+            return self.__pool__
+        return self.__router__.reader(route)
+
+    def _write_pool(self):
+        """
+        写操作使用的连接池，设置了只读实例时写操作结束后开始read-your-writes窗口
+        :return:
+        """
+        if self.__router__ is None:
+            return self.__pool__
+        return self.__router__.writer()
+
+    def _invalidate(self, *tables):
+        """
+        写操作后使相关表的结果缓存失效
+        :param tables: 表名
+        :return:
+        """
+        if self.__cache__ is not None:
+            self.__cache__.invalidate(tables)
+
+    def cache_stats(self):
+        """
+        结果缓存统计：hits/misses（命中/未命中）、evictions（LRU淘汰）、expirations（过期）、
+        invalidations（因写操作失效）、size（当前缓存的查询数）、hit_rate（命中率）
+        :return: 未启用结果缓存时返回None
+        """
+        if self.__cache__ is None:
+            return None
+        return self.__cache__.stats()
+
+    def clear_cache(self):
+        """
+        清空结果缓存
+        :return:
+        """
+        if self.__cache__ is not None:
+            self.__cache__.clear()
+
     def connect_information(self):
         """
         返回数据库连接信息
@@ -57,29 +171,121 @@ class PostgreSQL:
             "db": self.__db__
         }
 
-    def user_defined_sql(self, sql: str, params: tuple = None):
+    def warmup(self, n: int = None):
+        """
+        预热连接池：并行新建并验证n个连接（执行setsession），避免启动后的第一批请求承担建立连接的耗时
+        :param n: 预热后的空闲连接数，默认为warm设置的连接数或mincached
+        :return: 预热报告，如{"requested": 10, "opened": 10, "failed": 0, "idle": 10, "seconds": 0.05, ...}，
+                 设置了只读实例时replicas为各只读实例的预热报告
+        """
+        n = self.__warm_size__ if n is None else n
+        report = self.__pool__.warmup(n)
+        if self.__router__ is not None:
+            report["replicas"] = [pool.warmup(n) for pool in self.__router__.replicas]
+        return report
+
+    def pool_stats(self):
+        """
+        连接池统计：checkouts（取出次数）、returns（归还次数）、created/closed（新建/关闭的连接数）、
+        rejected（连接数达到上限被拒绝的次数）、waits（需要等待的次数）、等待耗时与直方图、in_use/idle（当前占用/空闲连接数）
+        设置了只读实例时replicas为各只读实例的连接池统计，routing为读写路由统计
+        :return:
+        """
+        stats = self.__pool__.stats()
+        if self.__router__ is not None:
+            stats["replicas"] = [pool.stats() for pool in self.__router__.replicas]
+            stats["routing"] = self.__router__.stats()
+        return stats
+
+    def add_listener(self, listener):
+        """
+        添加语句执行监听器，所有经过连接池（包括只读实例）执行的语句触发before/after/error事件\n
+        db.add_listener(SlowQueryLogger(threshold=0.5))
+        :param listener: QueryListener的子类实例或具有before/after/error方法的对象
+        :return:
+        """
+        for pool in self._pools():
+            pool.add_listener(listener)
+
+    def remove_listener(self, listener):
+        """
+        移除语句执行监听器
+        :param listener: 监听器
+        :return:
+        """
+        for pool in self._pools():
+            pool.remove_listener(listener)
+
+    def _pools(self):
+        """
+        主库与只读实例的连接池
+        :return:
+        """
+        if self.__router__ is None:
+            return [self.__pool__]
+        return [self.__pool__] + self.__router__.replicas
+
+    def user_defined_sql(self, sql: str, params: tuple = None, route: str = None):
         """
         执行自定义SQL
         :param sql: Sql
         :param params: 参数化查询的参数
+        :param route: 设置了只读实例时只读语句的路由，None自动选择，"primary"主库，"replica"只读实例；写语句总是使用主库
         :return:
         """
         if type(sql) is not str:
             raise TypeError("sql should be str")
         if params is not None and type(params) is not tuple:
             raise TypeError("params should be tuple")
-        connect = self.__pool__.connection()
+        if route is not None and route not in ROUTES:
+            raise ValueError(f"route should be one of {list(ROUTES)}")
+        if is_read_sql(sql):
+            return self._read(sql, params, self._read_pool(route))
+        if route == "replica":
+            raise ValueError("only read-only statements can be routed to a replica")
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         if params is None:
             cursor.execute(sql)
         else:
             cursor.execute(sql, params)
-        row = cursor.fetchall()
+        # 无结果集的语句（如DDL、DML）没有description，不能fetchall
+        row = cursor.fetchall() if cursor.description is not None else []
         connect.commit()
         cursor.close()
         connect.close()
+        # 无法确定自定义SQL修改了哪些表，清空结果缓存
+        self.clear_cache()
         return row
 
+    def _read(self, sql: str, params: tuple = None, pool=None):
+        """
+        以autocommit方式执行只读查询，省去psycopg2隐式发送的BEGIN以及结束后的COMMIT
+        :param sql: SQL
+        :param params: 参数
+        :param pool: 使用的连接池，默认为主库
+        :return:
+        """
+        connect = (self.__pool__ if pool is None else pool).connection()
+        cursor = connect.cursor()
+        connection = cursor.connection
+        # 处于transaction()中时保持原事务，不切换autocommit
+        changed = not getattr(connect, "in_transaction", False) and not connection.autocommit \
+            and connection.get_transaction_status() == 0
+        try:
+            if changed:
+                connection.autocommit = True
+            if params is None:
+                cursor.execute(sql)
+            else:
+                cursor.execute(sql, params)
+            return cursor.fetchall()
+        finally:
+            if changed:
+                connection.autocommit = False
+            cursor.close()
+            connect.close()
+
     def insert(self, table: str, columns: list, values: list):
         """
         插入数据
@@ -116,15 +322,77 @@ class PostgreSQL:
                 sql = f"insert into {table} {column} values {values};"
             else:
                 raise ValueError(f"{columns}->{len(columns)} != {values}->{len(values)}")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         cursor.execute(sql, params)
         connect.commit()
         cursor.close()
         connect.close()
+        self._invalidate(table)
         return sql
 
-    def update(self, table: str, columns_values: dict):
+    def copy_insert(self, table: str, columns: list, values, chunk_rows: int = 10000,
+                    chunk_bytes: int = 8 * 1024 * 1024) -> int:
+        """
+        使用COPY ... FROM STDIN批量导入数据，比insert的多行VALUES快一个数量级\n
+        数据以CSV格式写入内存缓冲区，按行数和字节预算分块通过cursor.copy_expert发送，所有块在同一个事务中提交\n
+        copy_insert('user', ['id', 'name'], [[1, 'Rose'], [2, 'Jack']])
+        :param table: 表名
+        :param columns: 字段
+        :param values: 插入数据，每行为list或tuple，可以是任意可迭代对象（如生成器）
+        :param chunk_rows: 每块的最大行数
+        :param chunk_bytes: 每块的最大字节数
+        :return: 导入的总行数
+        """
+        if type(table) is not str:
+            raise TypeError("table should be str")
+        if type(columns) is not list:
+            raise TypeError(f"columns {columns} type is not list")
+        if isinstance(values, (str, bytes, dict)) or not hasattr(values, "__iter__"):
+            raise TypeError("values should be an iterable of rows")
+        if type(chunk_rows) is not int:
+            raise TypeError("chunk_rows should be int")
+        if type(chunk_bytes) is not int:
+            raise TypeError("chunk_bytes should be int")
+        if chunk_rows <= 0 or chunk_bytes <= 0:
+            raise ValueError("chunk_rows and chunk_bytes must be greater than 0")
+        column = "(" + ", ".join([f'"{col}"' for col in columns]) + ")"
+        sql = f"COPY {table} {column} FROM STDIN WITH (FORMAT csv)"
+        total = 0
+        connect = self._write_pool().connection()
+        cursor = connect.cursor()
+        try:
+            for rows in bulk.chunk_rows(values, len(columns), chunk_rows, chunk_bytes):
+                buffer = io.StringIO()
+                for row in rows:
+                    buffer.write(",".join([bulk.copy_csv_value(value) for value in row]))
+                    buffer.write("\n")
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                total += len(rows)
+            connect.commit()
+        except Exception:
+            connect.rollback()
+            raise
+        finally:
+            cursor.close()
+            connect.close()
+            # 所有批次在同一个事务中，失败时已回滚；commit本身出错时无法确定是否已提交，因此总是使缓存失效
+            self._invalidate(table)
+        return total
+
+    def transaction(self):
+        """
+        开启跨多个操作的事务，事务内的insert/select/update/delete等方法共用同一个连接，
+        正常退出with块时提交一次，出现异常时回滚\n
+        with db.transaction() as tx:\n
+            tx.insert("user", ["id", "name"], [1, "Rose"])\n
+            tx.update("user", {"name": "Jack"}).equal("id", 1).run()
+        :return: 事务对象
+        """
+        return Transaction(self)
+
+    def update(self, table: str, columns_values: dict) -> PostgreSQLSelectConditionsBuilder:
         """
         更新数据
         :param table: 表名
@@ -135,13 +403,12 @@ class PostgreSQL:
             raise TypeError("table should be str")
         if type(columns_values) is not dict:
             raise TypeError(f"columns_values {columns_values} type is not dict")
-        cvs = ', '.join([f'"{k}"=\'{v}\'' for k, v in columns_values.items()])
+        cvs = ', '.join([f'"{k}"=%s' for k in columns_values.keys()])
         head_sql = f"UPDATE {table} SET {cvs} "
-        connect = self.__pool__.connection()
-        cursor = connect.cursor()
-        return PostgreSQLSelectConditionsBuilder(head_sql, cursor, connect)
+        builder = PostgreSQLSelectConditionsBuilder(head_sql, self._write_pool(), tuple(columns_values.values()))
+        return builder._use_cache(self.__cache__, (table,))
 
-    def delete(self, table: str):
+    def delete(self, table: str) -> PostgreSQLSelectConditionsBuilder:
         """
         删除数据
         :param table: 表名
@@ -149,16 +416,16 @@ class PostgreSQL:
         """
         if type(table) is not str:
             raise TypeError("table should be str")
-        connect = self.__pool__.connection()
-        cursor = connect.cursor()
         head_sql = f"DELETE FROM {table}"
-        return PostgreSQLSelectConditionsBuilder(head_sql, cursor, connect)
+        builder = PostgreSQLSelectConditionsBuilder(head_sql, self._write_pool())
+        return builder._use_cache(self.__cache__, (table,))
 
-    def select(self, table: str, columns: list = None):
+    def select(self, table: str, columns: list = None, route: str = None) -> PostgreSQLSelectConditionsBuilder:
         """
         查询数据
         :param table: 表名
         :param columns: 字段名
+        :param route: 设置了只读实例时的路由，None自动选择，"primary"主库，"replica"只读实例
         :return:
         """
         if type(table) is not str:
@@ -170,9 +437,8 @@ class PostgreSQL:
         else:
             columns_str = ", ".join([f'"{col}"' for col in columns])
         head_sql = f"SELECT {columns_str} FROM {table}"
-        connect = self.__pool__.connection()
-        cursor = connect.cursor()
-        return PostgreSQLSelectConditionsBuilder(head_sql, cursor, connect)
+        builder = PostgreSQLSelectConditionsBuilder(head_sql, self._read_pool(route))
+        return builder._use_cache(self.__cache__, (table,))._use_rows(self.__row_factory__)
 
     def create_table(self, table_name: str, table_comment: str = None):
         """
@@ -185,9 +451,10 @@ class PostgreSQL:
             raise TypeError("table_name should be str")
         if table_comment is not None and type(table_comment) is not str:
             raise TypeError("table_comment should be str")
-        connect = self.__pool__.connection()
+        pool = self._write_pool()
+        connect = pool.connection()
         cursor = connect.cursor()
-        return PostgreSQLCreateTable(connect, cursor, table_name, table_comment=table_comment)
+        return PostgreSQLCreateTable(connect, cursor, table_name, table_comment=table_comment, pool=pool)
 
     def create_database(self, database_name: str, character: str = "utf8", collate: str = "utf8_general_ci"):
         """
@@ -203,7 +470,7 @@ class PostgreSQL:
             raise TypeError("character should be str")
         if type(collate) is not str:
             raise TypeError("collate should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"CREATE DATABASE {database_name} WITH ENCODING='{character}' LC_COLLATE='{collate}' LC_CTYPE='{collate}'"
         cursor.execute(sql)
@@ -219,28 +486,22 @@ class PostgreSQL:
         """
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"DROP TABLE IF EXISTS {table_name};"
         cursor.execute(sql)
         connect.commit()
         cursor.close()
         connect.close()
+        self._invalidate(table_name)
 
     def show_table(self):
         """
         显示数据库中所有表名
         :return:
         """
-        connect = self.__pool__.connection()
-        cursor = connect.cursor()
         sql = f"SELECT table_name FROM information_schema.tables WHERE table_schema = 'public';"
-        cursor.execute(sql)
-        row = cursor.fetchall()
-        connect.commit()
-        cursor.close()
-        connect.close()
-        return row
+        return self._read(sql)
 
     def show_table_by_database_name(self, name: str):
         """
@@ -250,30 +511,16 @@ class PostgreSQL:
         """
         if type(name) is not str:
             raise TypeError("name should be str")
-        connect = self.__pool__.connection()
-        cursor = connect.cursor()
         sql = f"SELECT table_name AS '表名' FROM information_schema.tables WHERE table_schema = '{name}';"
-        cursor.execute(sql)
-        row = cursor.fetchall()
-        connect.commit()
-        cursor.close()
-        connect.close()
-        return row
+        return self._read(sql)
 
     def show_database(self):
         """
         显示所有数据库
         :return:
         """
-        connect = self.__pool__.connection()
-        cursor = connect.cursor()
         sql = f"SELECT datname FROM pg_database;"
-        cursor.execute(sql)
-        row = cursor.fetchall()
-        connect.commit()
-        cursor.close()
-        connect.close()
-        return row
+        return self._read(sql)
 
     def drop_database(self, database_name: str):
         """
@@ -283,13 +530,14 @@ class PostgreSQL:
         """
         if type(database_name) is not str:
             raise TypeError("database_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"DROP DATABASE IF EXISTS {database_name}"
         cursor.execute(sql)
         connect.commit()
         cursor.close()
         connect.close()
+        self.clear_cache()
 
     def alter_table_name(self, table_name: str, new_table_name: str):
         """
@@ -302,13 +550,14 @@ class PostgreSQL:
             raise TypeError("table_name should be str")
         if type(new_table_name) is not str:
             raise TypeError("new_table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"ALTER TABLE {table_name} RENAME TO {new_table_name}"
         cursor.execute(sql)
         connect.commit()
         cursor.close()
         connect.close()
+        self._invalidate(table_name, new_table_name)
 
     def drop_column(self, table_name: str, column: str):
         """
@@ -321,13 +570,14 @@ class PostgreSQL:
             raise TypeError("column should be str")
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"ALTER TABLE {table_name} DROP COLUMN {column};"
         cursor.execute(sql)
         connect.commit()
         cursor.close()
         connect.close()
+        self._invalidate(table_name)
 
     def alter_column_type(self, table_name: str, column_name: str, column_type: str, length: int = None,
                           is_not_null: bool = True, is_primary_key: bool = False,
@@ -357,7 +607,7 @@ class PostgreSQL:
             raise TypeError("is_auto_increment should be bool")
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         constraint = ""
         if is_not_null:
@@ -379,6 +629,7 @@ class PostgreSQL:
         connect.commit()
         cursor.close()
         connect.close()
+        self._invalidate(table_name)
 
     def alter_column_name(self, table_name: str, column_name: str, new_column_name: str,
                           column_type: str, length: int = None):
@@ -401,7 +652,7 @@ class PostgreSQL:
             raise TypeError("length should be int")
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         type_def = column_type
         if length is not None and column_type not in ["text", "boolean", "integer", "bigint", "smallint"]:
@@ -412,6 +663,7 @@ class PostgreSQL:
         connect.commit()
         cursor.close()
         connect.close()
+        self._invalidate(table_name)
 
     def add_column(self, table_name: str, column_name: str, column_type: str = "varchar", length: int = 255,
                    is_not_null: bool = True, is_primary_key: bool = False,
@@ -444,7 +696,7 @@ class PostgreSQL:
             raise TypeError("is_first should be bool")
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         constraint = ""
         if is_not_null:
@@ -477,6 +729,7 @@ class PostgreSQL:
         connect.commit()
         cursor.close()
         connect.close()
+        self._invalidate(table_name)
 
     def create_index(self, table_name: str, column_name: str, index_name: str):
         """
@@ -492,7 +745,7 @@ class PostgreSQL:
             raise TypeError("index_name should be str")
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"CREATE INDEX {index_name} ON {table_name} (\"{column_name}\");"
         cursor.execute(sql)
@@ -514,7 +767,7 @@ class PostgreSQL:
             raise TypeError("index_name should be str")
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"CREATE UNIQUE INDEX {index_name} ON {table_name} (\"{column_name}\");"
         cursor.execute(sql)
@@ -530,7 +783,7 @@ class PostgreSQL:
         """
         if type(index_name) is not str:
             raise TypeError("index_name should be str")
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         sql = f"DROP INDEX {index_name};"
         cursor.execute(sql)
@@ -543,7 +796,7 @@ class PostgreSQL:
         返回游标
         :return:
         """
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         cursor = connect.cursor()
         return cursor
 
@@ -552,7 +805,7 @@ class PostgreSQL:
         返回连接
         :return:
         """
-        connect = self.__pool__.connection()
+        connect = self._write_pool().connection()
         return connect
 
     def show_columns(self, database: str, table: str):
@@ -567,9 +820,12 @@ class PostgreSQL:
         if type(table) is not str:
             raise TypeError("table should be str")
         columns = ["column_name", "data_type"]
-        dt = self.select("information_schema.columns", columns) \
+        # 表结构在DDL后立即读取，不使用可能存在复制延迟的只读实例
+        dt = self.select("information_schema.columns", columns, route="primary") \
             .equal("table_schema", database, "and").equal("table_name", table, "and").run()
         return dt
 
     def close(self):
+        if self.__router__ is not None:
+            self.__router__.close()
         self.__pool__.close()
@@ -1,36 +1,200 @@
 import sqlite3
 from sqlite3 import Connection, Cursor
 from typing import List, Dict, Any
-from babySql.tools import SqLiteSelectConditionsBuilder, SqLiteCreateTable
-from dbutils.pooled_db import PooledDB
+from babySql.tools import SqLiteSelectConditionsBuilder, SqLiteCreateTable, Transaction
+from babySql.tools.select.s_base import is_read_sql
+from babySql.tools.cache import ResultCache
+from babySql.tools.rows import check_row_factory, SQLITE_ROW_FACTORIES
+from babySql.tools.pool import StatsPooledDB, check_pool_options, warm_size
+
+# 预置的PRAGMA配置
+PROFILES = {
+    # 高并发读写：WAL模式下读写互不阻塞，synchronous=NORMAL在WAL模式下仍可保证数据库一致性，
+    # 256MB mmap、64MB页缓存、内存临时表，写锁冲突时最多等待5秒
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,
+        "cache_size": -65536,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+
+def _is_pragma(sql: str) -> bool:
+    """
+    是否为PRAGMA语句
+    :param sql: SQL
+    :return:
+    """
+    return sql.lstrip().upper().startswith("PRAGMA")
 
 
 class SqLite:
-    def __init__(self, db: str, max_connections: int = 50):
+    def __init__(self, db: str, max_connections: int = 50, pragmas: dict = None, profile: str = None,
+                 writer: bool = False, writer_batch: int = 1000, mincached: int = 0, maxcached: int = 0,
+                 blocking: bool = False, maxusage: int = None, ping: int = 1, setsession: list = None,
+                 reset: bool = None, warm=False,
+                 result_cache: int = 0, result_cache_ttl: float = None, row_factory: str = "tuple"):
         """
         babySql for SQLite
         :param db: SQLite数据库文件路径（或":memory:"表示内存数据库）
         :param max_connections: 最大连接数
-        """
+        :param pragmas: 每个新建的连接池连接执行的PRAGMA，如{"journal_mode": "WAL", "busy_timeout": 5000}
+        :param profile: 预置的PRAGMA配置，目前支持"throughput"；与pragmas同时设置时pragmas优先
+        :param writer: 是否启用单写线程模式，启用后insert/update/delete、user_defined_sql()的写语句与execute_script()
+                       进入写队列，由一个专用连接合并提交并返回Future；drop_table()等修改表结构的方法等待写队列执行完成；
+                       查询、PRAGMA、create_table()、transaction()与backup()仍使用连接池
+        :param writer_batch: 单写线程模式下每个事务最多合并的写操作数
+        :param mincached: 启动时创建的空闲连接数
+        :param maxcached: 最多保留的空闲连接数，0为不限制
+        :param blocking: 连接数达到上限时是否阻塞等待，False时抛出TooManyConnectionsError
+        :param maxusage: 单个连接最多使用次数，达到后重新连接，None为不限制
+        :param ping: 何时检查连接是否可用，与dbutils的ping参数相同
+        :param setsession: 新建连接时执行的SQL列表，在PRAGMA之后执行
+        :param reset: 归还连接时是否回滚，默认True
+        :param warm: 创建时调用warmup()并行预热连接池：True为预热mincached个连接（需设置mincached），整数为预热的连接数
+        :param result_cache: 结果缓存的最大查询数，0为不启用；启用后调用了cache()的查询结果按SQL与参数缓存
+        :param result_cache_ttl: 结果缓存的默认时间（秒），None为不过期
+        :param row_factory: select()返回的行格式："tuple"元组（默认）；"named"按查询字段生成的元组子类，可按属性、字段名或下标访问；
+                            "dict"字典；"row"为sqlite3.Row
+        """
+        if type(writer) is not bool:
+            raise TypeError("writer should be bool")
+        if pragmas is not None and type(pragmas) is not dict:
+            raise TypeError("pragmas should be dict")
+        if profile is not None and type(profile) is not str:
+            raise TypeError("profile should be str")
+        if profile is not None and profile not in PROFILES:
+            raise ValueError(f"profile should be one of {list(PROFILES)}")
+        check_pool_options(mincached, maxcached, blocking, maxusage, ping, setsession, reset)
+        if type(result_cache) is not int:
+            raise TypeError("result_cache should be int")
+        check_row_factory(row_factory, SQLITE_ROW_FACTORIES)
         self.__database__ = db
         self.__max_connections__ = max_connections
-        # SQLite连接池
-        self.__pool__ = PooledDB(
+        self.__pragmas__ = dict(PROFILES[profile]) if profile is not None else {}
+        self.__pragmas__.update(pragmas or {})
+        session = self._pragma_sql(self.__pragmas__) + list(setsession or [])
+        self.__cache__ = ResultCache(result_cache, result_cache_ttl) if result_cache else None
+        self.__row_factory__ = row_factory
+        # warmup()默认的预热连接数
+        self.__warm_size__ = warm_size(warm, mincached, max_connections)
+        # SQLite连接池，PRAGMA通过setsession在每个新建（包括重连）的连接上执行
+        self.__pool__ = StatsPooledDB(
             creator=sqlite3,
+            # 预热时由warmup()并行创建连接
+            mincached=0 if warm else mincached,
+            maxcached=maxcached,
             maxconnections=self.__max_connections__,
+            blocking=blocking,
+            maxusage=maxusage,
+            setsession=session,
+            reset=True if reset is None else reset,
+            ping=ping,
             database=self.__database__,
             check_same_thread=False  # 允许多线程访问
         )
+        self.__writer__ = None
+        if writer:
+            # 写队列依赖concurrent.futures（会导入logging），只在写队列模式下导入
+            from babySql.tools.sqlite_writer import SQLiteWriter
+            self.__writer__ = SQLiteWriter(db, session, writer_batch)
+        if warm:
+            self.warmup()
+
+    @staticmethod
+    def _pragma_sql(pragmas: dict):
+        """
+        生成PRAGMA语句
+        :param pragmas: PRAGMA配置
+        :return:
+        """
+        sql = []
+        for name, value in pragmas.items():
+            if type(name) is not str or not name.isidentifier():
+                raise ValueError(f"invalid pragma name: {name!r}")
+            if type(value) is bool:
+                value = int(value)
+            if type(value) is str and not value.replace("-", "").replace("_", "").isalnum():
+                raise ValueError(f"invalid value for pragma {name}: {value!r}")
+            if type(value) not in (str, int):
+                raise TypeError(f"pragma {name} should be str, int or bool")
+            sql.append(f"PRAGMA {name}={value}")
+        return sql
+
+    def _invalidate(self, *tables):
+        """
+        写操作后使相关表的结果缓存失效
+        :param tables: 表名
+        :return:
+        """
+        if self.__cache__ is not None:
+            self.__cache__.invalidate(tables)
+
+    def cache_stats(self):
+        """
+        结果缓存统计：hits/misses（命中/未命中）、evictions（LRU淘汰）、expirations（过期）、
+        invalidations（因写操作失效）、size（当前缓存的查询数）、hit_rate（命中率）
+        :return: 未启用结果缓存时返回None
+        """
+        if self.__cache__ is None:
+            return None
+        return self.__cache__.stats()
+
+    def clear_cache(self):
+        """
+        清空结果缓存
+        :return:
+        """
+        if self.__cache__ is not None:
+            self.__cache__.clear()
 
     def connect_information(self):
         """
         返回数据库连接信息
         """
-        return {"database": self.__database__}
+        return {"database": self.__database__, "pragmas": dict(self.__pragmas__)}
+
+    def warmup(self, n: int = None):
+        """
+        预热连接池：并行新建并验证n个连接（执行setsession），避免启动后的第一批请求承担建立连接的耗时
+        :param n: 预热后的空闲连接数，默认为warm设置的连接数或mincached
+        :return: 预热报告，如{"requested": 10, "opened": 10, "failed": 0, "idle": 10, "seconds": 0.05, ...}
+        """
+        return self.__pool__.warmup(self.__warm_size__ if n is None else n)
+
+    def pool_stats(self):
+        """
+        连接池统计：checkouts（取出次数）、returns（归还次数）、created/closed（新建/关闭的连接数）、
+        rejected（连接数达到上限被拒绝的次数）、waits（需要等待的次数）、等待耗时与直方图、in_use/idle（当前占用/空闲连接数）
+        :return:
+        """
+        return self.__pool__.stats()
+
+    def add_listener(self, listener):
+        """
+        添加语句执行监听器，所有经过连接池执行的语句触发before/after/error事件（单写线程的写连接不经过连接池，不触发）\n
+        db.add_listener(SlowQueryLogger(threshold=0.5))
+        :param listener: QueryListener的子类实例或具有before/after/error方法的对象
+        :return:
+        """
+        self.__pool__.add_listener(listener)
+
+    def remove_listener(self, listener):
+        """
+        移除语句执行监听器
+        :param listener: 监听器
+        :return:
+        """
+        self.__pool__.remove_listener(listener)
 
     def user_defined_sql(self, sql: str, params: tuple = None):
         """
         运行自定义SQL
+
+        单写线程模式下，写语句（PRAGMA除外，PRAGMA只作用于执行它的连接）提交到写队列，返回Future，事务提交后结果为影响行数
         :param sql: SQL语句
         :param params: 参数（可选）
         :return: 查询结果
@@ -39,6 +203,9 @@ class SqLite:
             raise TypeError("sql should be str")
         if params is not None and type(params) is not tuple:
             raise TypeError("params should be tuple")
+        if self.__writer__ is not None and not is_read_sql(sql) and not _is_pragma(sql):
+            # 无法确定自定义SQL修改了哪些表（包括DDL），提交后清空结果缓存
+            return self.__writer__.submit(sql, params or (), on_commit=self.clear_cache)
         conn = self.__pool__.connection()
         cursor = conn.cursor()
         try:
@@ -46,12 +213,16 @@ class SqLite:
                 cursor.execute(sql, params)
             else:
                 cursor.execute(sql)
-            # 如果是SELECT语句，返回结果
-            if sql.strip().upper().startswith("SELECT"):
+            # 有结果集的语句（SELECT、PRAGMA查询等）返回结果，否则返回影响行数
+            if cursor.description is not None:
                 result = cursor.fetchall()
             else:
                 result = cursor.rowcount
-            conn.commit()
+            # 只读语句无需提交
+            if not is_read_sql(sql):
+                conn.commit()
+                # 无法确定自定义SQL修改了哪些表（包括DDL），清空结果缓存
+                self.clear_cache()
             return result
         finally:
             cursor.close()
@@ -75,6 +246,10 @@ class SqLite:
         placeholders = ", ".join(["?"] * len(columns))
         columns_str = ", ".join(columns)
         sql = f"INSERT INTO {table} ({columns_str}) VALUES ({placeholders})"
+        if self.__writer__ is not None:
+            # 事务提交后、Future完成前使该表的结果缓存失效
+            on_commit = None if self.__cache__ is None else lambda: self._invalidate(table)
+            return self.__writer__.submit(sql, values, isinstance(values[0], list), "lastrowid", on_commit)
         conn = self.__pool__.connection()
         cursor = conn.cursor()
         try:
@@ -84,12 +259,24 @@ class SqLite:
             else:
                 cursor.execute(sql, values)
             conn.commit()
+            self._invalidate(table)
             return cursor.lastrowid  # 返回最后插入的行ID
         finally:
             cursor.close()
             conn.close()
 
-    def update(self, table: str, columns_values: dict):
+    def transaction(self):
+        """
+        开启跨多个操作的事务，事务内的insert/select/update/delete等方法共用同一个连接，
+        正常退出with块时提交一次，出现异常时回滚\n
+        with db.transaction() as tx:\n
+            tx.insert("user", ["id", "name"], [1, "Rose"])\n
+            tx.update("user", {"name": "Jack"}).equal("id", 1).run()
+        :return: 事务对象
+        """
+        return Transaction(self)
+
+    def update(self, table: str, columns_values: dict) -> SqLiteSelectConditionsBuilder:
         """
         更新数据
         :param table: 表名
@@ -103,11 +290,14 @@ class SqLite:
         # 构建SET子句
         set_clause = ", ".join([f"{k} = ?" for k in columns_values.keys()])
         head_sql = f"UPDATE {table} SET {set_clause} "
-        conn = self.__pool__.connection()
-        cursor = conn.cursor()
-        return SqLiteSelectConditionsBuilder(head_sql, cursor, conn)
+        if self.__writer__ is not None:
+            from babySql.tools.sqlite_writer import SqLiteWriterConditionsBuilder
+            builder = SqLiteWriterConditionsBuilder(head_sql, self.__writer__, tuple(columns_values.values()))
+            return builder._use_cache(self.__cache__, (table,))
+        builder = SqLiteSelectConditionsBuilder(head_sql, self.__pool__, tuple(columns_values.values()))
+        return builder._use_cache(self.__cache__, (table,))
 
-    def delete(self, table: str):
+    def delete(self, table: str) -> SqLiteSelectConditionsBuilder:
         """
         删除数据
         :param table: 表名
@@ -115,12 +305,15 @@ class SqLite:
         """
         if type(table) is not str:
             raise TypeError("table should be str")
-        conn = self.__pool__.connection()
-        cursor = conn.cursor()
         head_sql = f"DELETE FROM {table}"
-        return SqLiteSelectConditionsBuilder(head_sql, cursor, conn)
+        if self.__writer__ is not None:
+            from babySql.tools.sqlite_writer import SqLiteWriterConditionsBuilder
+            builder = SqLiteWriterConditionsBuilder(head_sql, self.__writer__)
+            return builder._use_cache(self.__cache__, (table,))
+        builder = SqLiteSelectConditionsBuilder(head_sql, self.__pool__)
+        return builder._use_cache(self.__cache__, (table,))
 
-    def select(self, table: str, columns: list = None):
+    def select(self, table: str, columns: list = None) -> SqLiteSelectConditionsBuilder:
         """
         查询数据
         :param table: 表名
@@ -134,9 +327,8 @@ class SqLite:
         # 构建SELECT子句
         columns_str = "*" if columns is None else ", ".join(columns)
         head_sql = f"SELECT {columns_str} FROM {table}"
-        conn = self.__pool__.connection()
-        cursor = conn.cursor()
-        return SqLiteSelectConditionsBuilder(head_sql, cursor, conn)
+        builder = SqLiteSelectConditionsBuilder(head_sql, self.__pool__)
+        return builder._use_cache(self.__cache__, (table,))._use_rows(self.__row_factory__)
 
     def create_table(self, table_name: str):
         """
@@ -158,7 +350,7 @@ class SqLite:
         """
         if type(table_name) is not str:
             raise TypeError("table_name should be str")
-        self.user_defined_sql(f"DROP TABLE IF EXISTS {table_name}")
+        self._ddl(f"DROP TABLE IF EXISTS {table_name}")
 
     def show_tables(self) -> List[str]:
         """
@@ -215,7 +407,7 @@ class SqLite:
         columns_str = ", ".join(columns)
         unique_str = "UNIQUE " if unique else ""
         sql = f"CREATE {unique_str}INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns_str})"
-        self.user_defined_sql(sql)
+        self._ddl(sql)
 
     def drop_index(self, index_name: str):
         """
@@ -225,7 +417,7 @@ class SqLite:
         """
         if type(index_name) is not str:
             raise TypeError("index_name should be str")
-        self.user_defined_sql(f"DROP INDEX IF EXISTS {index_name}")
+        self._ddl(f"DROP INDEX IF EXISTS {index_name}")
 
     def add_column(self, table_name: str, column_name: str, column_type: str,
                    not_null: bool = False, default_value: Any = None):
@@ -254,7 +446,7 @@ class SqLite:
                 sql += f" DEFAULT '{default_value}'"
             else:
                 sql += f" DEFAULT {default_value}"
-        self.user_defined_sql(sql)
+        self._ddl(sql)
 
     def rename_table(self, old_name: str, new_name: str):
         """
@@ -267,13 +459,27 @@ class SqLite:
             raise TypeError("old_name should be str")
         if type(new_name) is not str:
             raise TypeError("new_name should be str")
-        self.user_defined_sql(f"ALTER TABLE {old_name} RENAME TO {new_name}")
+        self._ddl(f"ALTER TABLE {old_name} RENAME TO {new_name}")
+
+    def _ddl(self, sql: str):
+        """
+        执行修改表结构的语句，单写线程模式下等待写队列执行完成
+        :param sql: SQL语句
+        :return:
+        """
+        result = self.user_defined_sql(sql)
+        if self.__writer__ is not None:
+            result.result()
 
     def vacuum(self):
         """
         执行VACUUM操作（优化数据库）
         :return:
         """
+        if self.__writer__ is not None:
+            # VACUUM不能在事务中执行，作为脚本在写线程中单独执行
+            self.execute_script("VACUUM").result()
+            return
         self.user_defined_sql("VACUUM")
 
     def backup(self, backup_file: str):
@@ -308,27 +514,43 @@ class SqLite:
         """
         return self.__pool__.connection()
 
+    def writer_stats(self):
+        """
+        单写线程模式的统计：写操作数、失败数、事务数、批大小以及队列深度
+        :return: 未启用单写线程模式时返回None
+        """
+        if self.__writer__ is None:
+            return None
+        return self.__writer__.stats()
+
     def close(self):
         """
-        关闭连接池
+        关闭连接池，单写线程模式下先等待队列中的写操作全部提交
         :return:
         """
+        if self.__writer__ is not None:
+            self.__writer__.close()
         self.__pool__.close()
 
     def execute_script(self, script: str):
         """
         执行SQL脚本
+
+        单写线程模式下脚本提交到写队列，在写线程中单独执行，返回Future
         :param script: SQL脚本内容
         :return:
         """
         if type(script) is not str:
             raise TypeError("script should be str")
+        if self.__writer__ is not None:
+            return self.__writer__.submit_script(script, on_commit=self.clear_cache)
         conn = self.__pool__.connection()
         try:
             conn.executescript(script)
             conn.commit()
         finally:
             conn.close()
+            self.clear_cache()
 
     def get_last_rowid(self, table: str) -> int:
         """
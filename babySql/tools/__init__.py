@@ -6,3 +6,7 @@ from babySql.tools.select import SqLiteSelectConditionsBuilder
 from babySql.tools.create import SqLiteCreateTable
 from babySql.tools.select import PostgreSQLSelectConditionsBuilder
 from babySql.tools.create import PostgreSQLCreateTable
+from babySql.tools.transaction import Transaction
+from babySql.tools.prepared import Slot, PreparedQuery
+from babySql.tools.events import QueryEvent, QueryListener, SlowQueryLogger
+from babySql.tools.fingerprint import fingerprint, QueryStats
@@ -0,0 +1,114 @@
+import datetime
+import json
+from decimal import Decimal
+
+# 单行在VALUES列表中的固定开销：括号、分隔符等
+_ROW_OVERHEAD = 4
+# 每个值在VALUES列表中的固定开销：引号、逗号与空格
+_VALUE_OVERHEAD = 4
+
+
+def estimate_size(value) -> int:
+    """
+    估算值在SQL语句中占用的字节数
+    :param value: 值
+    :return:
+    """
+    if value is None:
+        return 4
+    if isinstance(value, str):
+        # 非ASCII字符按UTF-8编码后的长度计算
+        return len(value) if value.isascii() else len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        # 二进制值会被转义，按两倍长度估算
+        return 2 * len(value) + 10
+    if isinstance(value, (bool, int, float, Decimal)):
+        return 24
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return 28
+    return len(str(value))
+
+
+def chunk_rows(rows, columns_count: int, max_rows: int, max_bytes: int):
+    """
+    将多行数据按行数和字节预算切分为多个批次，每批的SQL大小不超过max_bytes（单行超过预算时单独成批）
+    :param rows: 行数据的可迭代对象，每行为list或tuple
+    :param columns_count: 字段数，用于校验每行长度
+    :param max_rows: 每批最大行数
+    :param max_bytes: 每批VALUES部分的最大字节数
+    :return: 逐批返回行列表的生成器
+    """
+    chunk = []
+    chunk_bytes = 0
+    for row in rows:
+        if not isinstance(row, (list, tuple)):
+            raise TypeError(f"row {row} type is not list or tuple")
+        if len(row) != columns_count:
+            raise ValueError(f"columns->{columns_count} != {row}->{len(row)}")
+        row_bytes = _ROW_OVERHEAD + sum(estimate_size(value) + _VALUE_OVERHEAD for value in row)
+        if chunk and (len(chunk) >= max_rows or chunk_bytes + row_bytes > max_bytes):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(row)
+        chunk_bytes += row_bytes
+    if chunk:
+        yield chunk
+
+
+def copy_csv_value(value) -> str:
+    """
+    将值转换为PostgreSQL COPY CSV格式的字段
+    None写为未加引号的空字段（即NULL），字符串总是加引号，以区分空字符串与NULL
+    :param value: 值
+    :return:
+    """
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value in (float("inf"), float("-inf")):
+            return "Infinity" if value > 0 else "-Infinity"
+        return repr(value)
+    if isinstance(value, (int, Decimal)):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # bytea的十六进制输入格式
+        return "\\x" + bytes(value).hex()
+    if isinstance(value, (list, tuple)):
+        value = _array_literal(value)
+    elif isinstance(value, dict):
+        value = json.dumps(value, ensure_ascii=False)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _array_literal(values) -> str:
+    """
+    将list/tuple转换为PostgreSQL数组字面量，如{1,2,NULL}、{"a","b \\"c\\""}，嵌套的list为多维数组
+    :param values: 元素列表
+    :return:
+    """
+    elements = []
+    for value in values:
+        if value is None:
+            elements.append("NULL")
+        elif isinstance(value, (list, tuple)):
+            elements.append(_array_literal(value))
+        elif isinstance(value, (bool, int, float, Decimal)):
+            # 数字与布尔值不含需要转义的字符，与COPY字段的写法相同
+            elements.append(copy_csv_value(value))
+        else:
+            if isinstance(value, dict):
+                value = json.dumps(value, ensure_ascii=False)
+            elif isinstance(value, (bytes, bytearray, memoryview)):
+                value = "\\x" + bytes(value).hex()
+            elif isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+                value = value.isoformat()
+            # 其余元素总是加引号，引号与反斜杠用反斜杠转义，避免与NULL、分隔符或空白混淆
+            elements.append('"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"')
+    return "{" + ",".join(elements) + "}"
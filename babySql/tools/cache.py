@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def table_key(table: str):
+    """
+    缓存失效使用的表名：去掉引号并转为小写
+    :param table: 表名
+    :return:
+    """
+    return table.replace("`", "").replace('"', "").strip().lower()
+
+
+class ResultCache:
+    """
+    查询结果缓存：按SQL与参数缓存结果，LRU淘汰，支持TTL以及按表失效
+    只缓存显式调用了cache()的查询，同一实例的insert/update/delete以及修改表结构的方法会使相关表的缓存失效
+    使用示例：
+        db = BabySql(dt_type="mysql", ..., result_cache=1024, result_cache_ttl=60)
+        db.select("city", ["id", "name"]).equal("code", "SH").cache().run()
+        db.select("config").cache(ttl=5).run()
+        print(db.cache_stats())
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = None):
+        """
+        :param max_size: 最多缓存的查询数
+        :param ttl: 默认的缓存时间（秒），None为不过期（只在LRU淘汰或表失效时移除）
+        """
+        if type(max_size) is not int:
+            raise TypeError("max_size should be int")
+        if max_size < 1:
+            raise ValueError("max_size should be greater than 0")
+        self.__ttl__ = self.check_ttl(ttl)
+        self.__max_size__ = max_size
+        # key -> (结果, 过期时间, 表名)
+        self.__entries__ = OrderedDict()
+        # 表名 -> key集合
+        self.__tables__ = {}
+        # 失效代数：表名 -> 该表失效的次数，clear()增加__epoch__；查询执行前后代数不同时不缓存结果
+        self.__generations__ = {}
+        self.__epoch__ = 0
+        self.__lock__ = threading.Lock()
+        self.__stats__ = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0,
+                          "stale": 0}
+
+    @staticmethod
+    def check_ttl(ttl):
+        """
+        校验缓存时间
+        :param ttl: 缓存时间（秒）
+        :return:
+        """
+        if ttl is not None:
+            if type(ttl) not in (int, float):
+                raise TypeError("ttl should be int or float")
+            if ttl <= 0:
+                raise ValueError("ttl should be greater than 0")
+        return ttl
+
+    def get(self, key):
+        """
+        获取缓存的结果
+        :param key: 缓存键
+        :return: (是否命中, 结果)
+        """
+        with self.__lock__:
+            entry = self.__entries__.get(key)
+            if entry is not None:
+                rows, expires, tables = entry
+                if expires is None or expires > time.monotonic():
+                    self.__entries__.move_to_end(key)
+                    self.__stats__["hits"] += 1
+                    return True, rows
+                self._remove(key, tables)
+                self.__stats__["expirations"] += 1
+            self.__stats__["misses"] += 1
+            return False, None
+
+    def generation(self, tables: tuple):
+        """
+        查询涉及的表当前的失效代数，在执行查询前获取并传给set()
+        :param tables: 表名
+        :return:
+        """
+        with self.__lock__:
+            return self._generation(tuple(table_key(table) for table in tables))
+
+    def _generation(self, tables: tuple):
+        """
+        失效代数，调用方需持有锁
+        :param tables: 已规范化的表名
+        :return:
+        """
+        return (self.__epoch__,) + tuple(self.__generations__.get(table, 0) for table in tables)
+
+    def set(self, key, rows, tables: tuple, ttl: float = None, generation: tuple = None):
+        """
+        缓存结果
+        :param key: 缓存键
+        :param rows: 结果
+        :param tables: 查询涉及的表名
+        :param ttl: 缓存时间（秒），None为使用默认值
+        :param generation: 执行查询前generation()的返回值；查询期间相关表已失效时结果可能是旧数据，不缓存
+        :return: 是否已缓存
+        """
+        ttl = self.__ttl__ if ttl is None else ttl
+        expires = None if ttl is None else time.monotonic() + ttl
+        tables = tuple(table_key(table) for table in tables)
+        with self.__lock__:
+            if generation is not None and generation != self._generation(tables):
+                self.__stats__["stale"] += 1
+                return False
+            old = self.__entries__.pop(key, None)
+            if old is not None:
+                self._remove(key, old[2])
+            self.__entries__[key] = (rows, expires, tables)
+            for table in tables:
+                self.__tables__.setdefault(table, set()).add(key)
+            while len(self.__entries__) > self.__max_size__:
+                old_key, (_, _, old_tables) = self.__entries__.popitem(last=False)
+                self._remove(old_key, old_tables)
+                self.__stats__["evictions"] += 1
+        return True
+
+    def _remove(self, key, tables: tuple):
+        """
+        移除缓存项，调用方需持有锁
+        :param key: 缓存键
+        :param tables: 缓存项涉及的表名
+        :return:
+        """
+        self.__entries__.pop(key, None)
+        for table in tables:
+            keys = self.__tables__.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.__tables__[table]
+
+    def invalidate(self, tables):
+        """
+        使涉及这些表的缓存失效
+        :param tables: 表名列表
+        :return: 失效的缓存项数
+        """
+        removed = 0
+        with self.__lock__:
+            for table in tables:
+                table = table_key(table)
+                # 即使没有缓存项也要增加代数，使正在执行的查询不再缓存旧结果
+                self.__generations__[table] = self.__generations__.get(table, 0) + 1
+                for key in list(self.__tables__.get(table, ())):
+                    entry = self.__entries__.get(key)
+                    if entry is not None:
+                        self._remove(key, entry[2])
+                        removed += 1
+            self.__stats__["invalidations"] += removed
+        return removed
+
+    def clear(self):
+        """
+        清空缓存（计数器保留）
+        :return:
+        """
+        with self.__lock__:
+            self.__stats__["invalidations"] += len(self.__entries__)
+            self.__epoch__ += 1
+            self.__entries__.clear()
+            self.__tables__.clear()
+
+    def stats(self):
+        """
+        缓存统计：命中、未命中、LRU淘汰、过期与失效次数、因查询期间表失效而未缓存的次数（stale）以及当前大小
+        :return:
+        """
+        with self.__lock__:
+            stats = dict(self.__stats__)
+            stats["size"] = len(self.__entries__)
+        stats["max_size"] = self.__max_size__
+        stats["ttl"] = self.__ttl__
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0
+        return stats
@@ -0,0 +1,131 @@
+import array
+
+# to_columns()支持的列类型：array为array.array（非数值字段为list），numpy为numpy.ndarray
+COLUMN_KINDS = ("array", "numpy")
+# array.array类型码对应的NumPy dtype；b只用于布尔字段
+NUMPY_DTYPES = {"q": "int64", "d": "float64", "b": "bool"}
+
+
+def column_names(description) -> list:
+    """
+    根据游标描述生成列名，重复的列名（如联表查询）依次加上_1、_2后缀
+    :param description: cursor.description
+    :return: 列名列表
+    """
+    names = []
+    seen = set()
+    for column in description:
+        name = base = str(column[0])
+        i = 0
+        while name in seen:
+            i += 1
+            name = f"{base}_{i}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+class ColumnFiller:
+    """
+    按批将行数据写入各列：数值字段写入array.array，其余字段写入list\n
+    列类型优先由cursor.description的type_code确定（types为驱动类型码到array类型码的映射），
+    驱动不提供类型码时（如sqlite3）根据第一批数据中第一个非NULL值推断\n
+    浮点字段的NULL记为NaN；整数字段出现NULL、超出int64范围或类型不一致时整列退化为list，不丢失数据
+    """
+
+    def __init__(self, description, types: dict):
+        """
+        :param description: cursor.description
+        :param types: 驱动类型码 -> array类型码（q、d、b）
+        """
+        self.names = column_names(description)
+        self.columns = []
+        # 各列的array类型码，None表示list列，False表示待根据数据推断
+        self.typecodes = []
+        for column in description:
+            type_code = column[1]
+            if type_code is None:
+                self.typecodes.append(False)
+            else:
+                self.typecodes.append(types.get(type_code))
+            self.columns.append(None)
+
+    @staticmethod
+    def _infer(values):
+        """
+        根据第一个非NULL值推断列类型
+        :param values: 一批数据中的一列
+        :return: array类型码，无法使用数组时返回None
+        """
+        for value in values:
+            if value is None:
+                continue
+            if type(value) is int:
+                return "q"
+            if type(value) is float:
+                return "d"
+            return None
+        return None
+
+    def add(self, rows: list):
+        """
+        追加一批行数据
+        :param rows: fetchmany()返回的行
+        :return:
+        """
+        if not rows:
+            return
+        for i, values in enumerate(zip(*rows)):
+            typecode = self.typecodes[i]
+            if typecode is False:
+                typecode = self.typecodes[i] = self._infer(values)
+            column = self.columns[i]
+            if column is None:
+                column = self.columns[i] = [] if typecode is None else array.array(typecode)
+            if type(column) is list:
+                column.extend(values)
+                continue
+            if None in values:
+                if typecode != "d":
+                    self._degrade(i, values)
+                    continue
+                values = [float("nan") if value is None else value for value in values]
+            try:
+                column.extend(values)
+            except (TypeError, OverflowError):
+                self._degrade(i, values)
+
+    def _degrade(self, i: int, values):
+        """
+        将数组列转换为list列并追加数据
+        :param i: 列序号
+        :param values: 追加的数据
+        :return:
+        """
+        column = self.columns[i].tolist()
+        column.extend(values)
+        self.columns[i] = column
+        self.typecodes[i] = None
+
+    def result(self, numpy: bool = False) -> dict:
+        """
+        :param numpy: 是否转换为numpy.ndarray（数值列共享array.array的内存，不复制）
+        :return: 列名 -> 列
+        """
+        columns = [[] if column is None else column for column in self.columns]
+        if not numpy:
+            return dict(zip(self.names, columns))
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("numpy is required for kind='numpy', install it with: pip install numpy") from None
+        result = {}
+        for name, typecode, column in zip(self.names, self.typecodes, columns):
+            if type(column) is list:
+                values = np.empty(len(column), dtype=object)
+                values[:] = column
+                result[name] = values
+            else:
+                result[name] = np.frombuffer(column, dtype=NUMPY_DTYPES[typecode]) if len(column) else \
+                    np.empty(0, dtype=NUMPY_DTYPES[typecode])
+        return result
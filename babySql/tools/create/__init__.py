@@ -2,3 +2,4 @@ from babySql.tools.create.c_mysql import MySQLCreateTable
 from babySql.tools.create.c_mariadb import MariaDBCreateTable
 from babySql.tools.create.c_sqlite import SqLiteCreateTable
 from babySql.tools.create.c_postgresql import PostgreSQLCreateTable
+from babySql.tools.create.deferred import DeferredIndexes
@@ -1,3 +1,6 @@
+from babySql.tools.create.deferred import DeferredIndexes
+
+
 class MySQLCreateTable:
     """
     创建MySQL表的封装类，支持列定义、主键、索引、外键等
@@ -194,8 +197,15 @@ class MySQLCreateTable:
         """ 转义SQL值中的特殊字符 """
         return value.replace("'", "''").replace("\\", "\\\\")
 
-    def build(self):
-        """ 构建并执行CREATE TABLE语句 """
+    def build(self, defer_indexes: bool = False):
+        """
+        构建并执行CREATE TABLE语句
+        :param defer_indexes: 是否延迟创建二级索引，为True时建表语句不包含索引，
+                              导入数据后调用返回值的create_deferred_indexes()以一条ALTER TABLE创建所有索引
+        :return: defer_indexes为True时返回DeferredIndexes
+        """
+        if type(defer_indexes) is not bool:
+            raise TypeError("defer_indexes must be a bool")
         if not self.__columns__:
             raise ValueError("No columns defined for table creation")
         # 检查自增列是否在主键中
@@ -232,11 +242,17 @@ class MySQLCreateTable:
         for uc in self.__unique_constraints__:
             columns = ", ".join([f"`{col}`" for col in uc["columns"]])
             column_defs.append(f"CONSTRAINT `{uc['name']}` UNIQUE ({columns})")
-        # 4. 添加索引 (表级)
+        # 4. 添加索引 (表级)，延迟创建时只收集索引定义
+        index_names = []
+        index_defs = []
         for idx in self.__indices__:
             if idx['columns'] not in self.__primary_keys__:
                 columns = "`, `".join([col for col in idx["columns"]])
-                column_defs.append(f"INDEX `{idx['name']}` (`{columns}`)")
+                if defer_indexes:
+                    index_names.append(idx['name'])
+                    index_defs.append(f"ADD INDEX `{idx['name']}` (`{columns}`)")
+                else:
+                    column_defs.append(f"INDEX `{idx['name']}` (`{columns}`)")
         # 5. 添加外键约束
         for fk in self.__foreign_keys__:
             # 生成唯一外键名
@@ -263,3 +279,9 @@ class MySQLCreateTable:
         except Exception as e:
             self.__connect__.rollback()
             raise RuntimeError(f"Failed to create table '{self.__table_name__}': {str(e)}") from e
+        if defer_indexes:
+            # 所有二级索引合并为一条ALTER TABLE，只需扫描一次表数据
+            statements = []
+            if index_defs:
+                statements.append(f"ALTER TABLE `{self.__table_name__}` " + ", ".join(index_defs) + ";")
+            return DeferredIndexes(self.__connect__, self.__cursor__, self.__table_name__, index_names, statements)
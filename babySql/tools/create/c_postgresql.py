@@ -1,3 +1,6 @@
+from babySql.tools.create.deferred import DeferredIndexes
+
+
 class PostgreSQLCreateTable:
     """
     创建PostgreSQL表的封装类，支持列定义、主键、索引、外键等
@@ -12,12 +15,14 @@ class PostgreSQLCreateTable:
         creator.build()
     """
 
-    def __init__(self, connect, cursor, table_name: str, table_comment: str = None):
+    def __init__(self, connect, cursor, table_name: str, table_comment: str = None, pool=None):
         if type(table_name) is not str:
             raise TypeError("table_name must be a str")
         if table_comment is not None and type(table_comment) is not str:
             raise TypeError("table_comment must be a str")
         self.__connect__ = connect
+        # 连接池，用于延迟索引的并行创建
+        self.__pool__ = pool
         self.__cursor__ = cursor
         self.__table_name__ = table_name
         self.__table_comment__ = table_comment
@@ -69,7 +74,7 @@ class PostgreSQLCreateTable:
             """
             if type(column_type) is not str:
                 raise TypeError("column_type must be a str")
-            if type(length) is not int:
+            if length is not None and type(length) is not int:
                 raise TypeError("length must be a int")
             self._column["type"] = column_type.upper()
             # PostgreSQL 中 SERIAL 类型不需要长度
@@ -289,11 +294,15 @@ class PostgreSQLCreateTable:
             raise TypeError("value must be a str")
         return value.replace("'", "''")
 
-    def build(self):
+    def build(self, defer_indexes: bool = False):
         """
         构建并执行CREATE TABLE语句
-        :return:
+        :param defer_indexes: 是否延迟创建二级索引，为True时只建表，
+                              导入数据后调用返回值的create_deferred_indexes(parallel=n)在多个连接上并行创建索引
+        :return: defer_indexes为True时返回DeferredIndexes
         """
+        if type(defer_indexes) is not bool:
+            raise TypeError("defer_indexes must be a bool")
         if not self.__columns__:
             raise ValueError("No columns defined for table creation")
 
@@ -384,7 +393,9 @@ class PostgreSQLCreateTable:
                     comment_sql = f"COMMENT ON COLUMN {table_name}.{col_name} IS '{escaped_comment}';"
                     self.__cursor__.execute(comment_sql)
 
-            # 9. 创建索引（跳过主键和唯一约束自动创建的索引）
+            # 9. 创建索引（跳过主键和唯一约束自动创建的索引），延迟创建时只收集建索引语句
+            index_names = []
+            index_statements = []
             for idx in self.__indices__:
                 # 检查是否由唯一约束自动创建
                 idx_columns_tuple = tuple(idx["columns"])
@@ -403,7 +414,11 @@ class PostgreSQLCreateTable:
 
                 # 创建索引SQL
                 create_index_sql = f"CREATE {index_type} IF NOT EXISTS {index_name} ON {table_name} ({columns});"
-                self.__cursor__.execute(create_index_sql)
+                if defer_indexes:
+                    index_names.append(idx['name'])
+                    index_statements.append(create_index_sql)
+                else:
+                    self.__cursor__.execute(create_index_sql)
 
             # 提交事务
             self.__connect__.commit()
@@ -414,3 +429,6 @@ class PostgreSQLCreateTable:
         finally:
             # 恢复自动提交设置
             self.__connect__.autocommit = True
+        if defer_indexes:
+            return DeferredIndexes(self.__connect__, self.__cursor__, self.__table_name__, index_names,
+                                   index_statements, pool=self.__pool__)
@@ -1,3 +1,6 @@
+from babySql.tools.create.deferred import DeferredIndexes
+
+
 class SqLiteCreateTable:
     """
     创建SQLite表的封装类，支持列定义、主键、索引、外键等
@@ -219,11 +222,14 @@ class SqLiteCreateTable:
                     "name": index_name
                 })
 
-    def build(self):
+    def build(self, defer_indexes: bool = False):
         """
         构建并执行CREATE TABLE语句
-        :return:
+        :param defer_indexes: 是否延迟创建索引，为True时只建表，导入数据后调用返回值的create_deferred_indexes()创建索引
+        :return: defer_indexes为True时返回DeferredIndexes
         """
+        if type(defer_indexes) is not bool:
+            raise TypeError("defer_indexes must be a bool")
         if not self.__columns__:
             raise ValueError("No columns defined for table creation")
         # 检查自增列是否在主键中
@@ -274,6 +280,12 @@ class SqLiteCreateTable:
             self.__connect__.rollback()
             raise RuntimeError(f"Failed to create table '{self.__table_name__}': {str(e)}") from e
         # 7. 创建索引 (SQLite索引需要单独创建)
+        if defer_indexes:
+            # SQLite同一时间只允许一个写连接，延迟的索引在建表连接上串行创建
+            names = [idx['name'] for idx in self.__indices__]
+            statements = [f"CREATE INDEX IF NOT EXISTS {idx['name']} ON {self.__table_name__} "
+                          f"({', '.join(idx['columns'])});" for idx in self.__indices__]
+            return DeferredIndexes(self.__connect__, self.__cursor__, self.__table_name__, names, statements)
         for idx in self.__indices__:
             columns = ", ".join([col for col in idx["columns"]])
             idx_sql = f"CREATE INDEX IF NOT EXISTS {idx['name']} ON {self.__table_name__} ({columns});"
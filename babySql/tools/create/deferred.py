@@ -0,0 +1,106 @@
+class DeferredIndexes:
+    """
+    延迟创建的二级索引，由CreateTable.build(defer_indexes=True)返回
+    适用于大批量导入：先建表并导入数据，最后一次性创建所有二级索引
+    使用示例：
+        creator = db.create_table("users")
+        creator.column("id").type("INT").primary_key()
+        creator.column("name").type("VARCHAR", 50)
+        creator.add_index(["name"])
+        deferred = creator.build(defer_indexes=True)
+        db.bulk_insert("users", ["id", "name"], rows)
+        deferred.create_deferred_indexes()
+    """
+
+    def __init__(self, connect, cursor, table_name: str, names: list, statements: list, pool=None):
+        """
+        :param connect: 建表使用的连接，串行创建索引时复用
+        :param cursor: 建表使用的游标
+        :param table_name: 表名
+        :param names: 待创建的索引名
+        :param statements: 建索引的SQL，一条SQL可以创建多个索引
+        :param pool: 连接池，提供时可以在多个连接上并行执行建索引的SQL
+        """
+        self.__connect__ = connect
+        self.__cursor__ = cursor
+        self.__table_name__ = table_name
+        self.__names__ = names
+        self.__statements__ = statements
+        self.__pool__ = pool
+        self.__created__ = False
+
+    @property
+    def names(self):
+        """
+        待创建的索引名
+        :return:
+        """
+        return list(self.__names__)
+
+    @property
+    def statements(self):
+        """
+        待执行的SQL
+        :return:
+        """
+        return list(self.__statements__)
+
+    def __len__(self):
+        return len(self.__names__)
+
+    def create_deferred_indexes(self, parallel: int = 1):
+        """
+        创建所有延迟的索引，只能调用一次
+        :param parallel: 并行创建的连接数，需要连接池支持；为1或没有连接池时在建表连接上串行创建
+        :return: 已创建的索引名
+        """
+        if type(parallel) is not int:
+            raise TypeError("parallel should be int")
+        if parallel < 1:
+            raise ValueError("parallel should be greater than 0")
+        if self.__created__:
+            raise RuntimeError(f"Deferred indexes of table '{self.__table_name__}' have already been created")
+        self.__created__ = True
+        try:
+            if parallel > 1 and self.__pool__ is not None and len(self.__statements__) > 1:
+                # 只有并行建索引时才需要线程池，在此导入避免每个数据库模块都加载concurrent.futures
+                from concurrent.futures import ThreadPoolExecutor
+                with ThreadPoolExecutor(max_workers=min(parallel, len(self.__statements__))) as executor:
+                    # list()等待所有任务完成，并抛出第一个失败任务的异常
+                    list(executor.map(self._create_on_pool, self.__statements__))
+            else:
+                for sql in self.__statements__:
+                    self._create(self.__connect__, self.__cursor__, sql)
+        finally:
+            self.__cursor__.close()
+            self.__connect__.close()
+        return self.names
+
+    def _create_on_pool(self, sql: str):
+        """
+        从连接池获取一个连接创建索引
+        :param sql: 建索引的SQL
+        :return:
+        """
+        connect = self.__pool__.connection()
+        cursor = connect.cursor()
+        try:
+            self._create(connect, cursor, sql)
+        finally:
+            cursor.close()
+            connect.close()
+
+    def _create(self, connect, cursor, sql: str):
+        """
+        执行单条建索引的SQL
+        :param connect: 连接
+        :param cursor: 游标
+        :param sql: 建索引的SQL
+        :return:
+        """
+        try:
+            cursor.execute(sql)
+            connect.commit()
+        except Exception as e:
+            connect.rollback()
+            raise RuntimeError(f"Failed to create indexes on table '{self.__table_name__}': {str(e)}") from e
@@ -0,0 +1,228 @@
+import time
+
+
+class QueryEvent:
+    """
+    一条语句的执行信息，传给监听器的before/after/error
+    sql: SQL；params: 参数（executemany时为参数列表）；many: 是否为executemany
+    wait_seconds: 该语句所在连接从连接池取出时的等待时间，同一连接上只有第一条语句记录，之后为0
+    seconds: 执行耗时，包括读取结果集的时间；rowcount: 返回的行数，无结果集的语句为影响行数
+    error: 执行失败时的异常；started: 开始执行的时间戳
+    """
+    __slots__ = ("sql", "params", "many", "wait_seconds", "seconds", "rowcount", "error", "started")
+
+    def __init__(self, sql: str, params, many: bool, wait_seconds: float):
+        self.sql = sql
+        self.params = params
+        self.many = many
+        self.wait_seconds = wait_seconds
+        self.seconds = 0.0
+        self.rowcount = None
+        self.error = None
+        self.started = time.time()
+
+    def __repr__(self):
+        return f"QueryEvent(sql={self.sql!r}, seconds={self.seconds:.6f}, rowcount={self.rowcount})"
+
+
+class QueryListener:
+    """
+    语句执行监听器基类，按需重写before/after/error
+    使用示例：
+        class Printer(QueryListener):
+            def after(self, event):
+                print(event.sql, event.seconds, event.rowcount)
+
+        db.add_listener(Printer())
+    """
+
+    def before(self, event: QueryEvent):
+        """
+        语句执行前
+        :param event: 执行信息，seconds与rowcount尚未设置
+        :return:
+        """
+        pass
+
+    def after(self, event: QueryEvent):
+        """
+        语句执行完成（有结果集时在结果集读取完或游标关闭后）
+        :param event: 执行信息
+        :return:
+        """
+        pass
+
+    def error(self, event: QueryEvent):
+        """
+        语句执行失败
+        :param event: 执行信息，error为异常
+        :return:
+        """
+        pass
+
+
+class SlowQueryLogger(QueryListener):
+    """
+    慢查询日志：耗时（包括等待连接的时间）达到阈值的语句以WARNING级别写入日志
+    使用示例：
+        db.add_listener(SlowQueryLogger(threshold=0.5))
+    """
+
+    def __init__(self, threshold: float = 1.0, log=None, with_params: bool = False):
+        """
+        :param threshold: 阈值（秒）
+        :param log: 日志记录器，默认为logging.getLogger("babySql.slow_query")
+        :param with_params: 是否记录参数，参数可能包含敏感数据，默认不记录
+        """
+        if type(threshold) not in (int, float):
+            raise TypeError("threshold should be int or float")
+        if threshold < 0:
+            raise ValueError("threshold should not be less than 0")
+        if type(with_params) is not bool:
+            raise TypeError("with_params should be bool")
+        self.threshold = threshold
+        if log is None:
+            import logging
+            log = logging.getLogger("babySql.slow_query")
+        self.log = log
+        self.with_params = with_params
+
+    def after(self, event: QueryEvent):
+        total = event.seconds + event.wait_seconds
+        if total < self.threshold:
+            return
+        if self.with_params:
+            self.log.warning("slow query %.3fs (wait %.3fs, rows %s): %s params=%r", total, event.wait_seconds,
+                             event.rowcount, event.sql, event.params)
+        else:
+            self.log.warning("slow query %.3fs (wait %.3fs, rows %s): %s", total, event.wait_seconds,
+                             event.rowcount, event.sql)
+
+
+def emit(listeners: tuple, name: str, event: QueryEvent):
+    """
+    通知监听器，监听器的异常只记录日志，不影响语句执行
+    :param listeners: 监听器
+    :param name: 事件名：before、after、error
+    :param event: 执行信息
+    :return:
+    """
+    for listener in listeners:
+        try:
+            getattr(listener, name)(event)
+        except Exception:
+            # 导入logging较慢，只在监听器出错时导入
+            import logging
+            logging.getLogger("babySql").exception("query listener %r failed on %s", listener, name)
+
+
+class _InstrumentedCursor:
+    """
+    游标代理，记录execute/executemany的耗时与行数并通知监听器，其余属性转发给真实游标
+    """
+
+    def __init__(self, cursor, connection):
+        self._cursor = cursor
+        self._connection = connection
+        # 有结果集、尚未读取完的语句
+        self._event = None
+
+    def execute(self, sql, *args, **kwargs):
+        return self._run(self._cursor.execute, sql, args, kwargs, False)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._run(self._cursor.executemany, sql, args, kwargs, True)
+
+    def _run(self, method, sql, args, kwargs, many):
+        self._finish()
+        listeners = self._connection._listeners
+        event = QueryEvent(sql, args[0] if args else None, many, self._connection._take_wait())
+        emit(listeners, "before", event)
+        start = time.perf_counter()
+        try:
+            result = method(sql, *args, **kwargs)
+        except Exception as e:
+            event.seconds = time.perf_counter() - start
+            event.error = e
+            emit(listeners, "error", event)
+            raise
+        event.seconds = time.perf_counter() - start
+        if self._cursor.description is None:
+            event.rowcount = self._cursor.rowcount
+            emit(listeners, "after", event)
+        else:
+            event.rowcount = 0
+            self._event = event
+        # sqlite3的execute返回游标本身，返回代理使链式调用的读取也被记录
+        return self if result is self._cursor else result
+
+    def _fetched(self, rows: int, seconds: float, done: bool):
+        event = self._event
+        if event is None:
+            return
+        event.rowcount += rows
+        event.seconds += seconds
+        if done:
+            self._finish()
+
+    def _finish(self):
+        event = self._event
+        if event is not None:
+            self._event = None
+            emit(self._connection._listeners, "after", event)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(0 if row is None else 1, time.perf_counter() - start, row is None)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._fetched(len(rows), time.perf_counter() - start, not rows)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(len(rows), time.perf_counter() - start, True)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _InstrumentedConnection:
+    """
+    连接池连接代理，创建的游标都会被记录，其余属性转发给真实连接
+    """
+
+    def __init__(self, connect, listeners: tuple, wait_seconds: float):
+        self._connect = connect
+        self._listeners = listeners
+        self._wait = wait_seconds
+
+    def _take_wait(self):
+        wait, self._wait = self._wait, 0.0
+        return wait
+
+    def cursor(self, *args, **kwargs):
+        return _InstrumentedCursor(self._connect.cursor(*args, **kwargs), self)
+
+    def __getattr__(self, name):
+        return getattr(self._connect, name)
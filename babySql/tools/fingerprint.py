@@ -0,0 +1,267 @@
+import functools
+import json
+import random
+import re
+import threading
+
+from babySql.tools.events import QueryEvent, QueryListener
+
+# 注释、字符串、数字与参数占位符（%s、%(name)s、$1、?）；双引号在PostgreSQL/SQLite中为标识符，保留
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+# PostgreSQL的美元引用字符串（$$...$$、$tag$...$tag$），标签不能以数字开头，与$1占位符区分
+_DOLLAR_STRING = re.compile(r"\$((?:[A-Za-z_]\w*)?)\$.*?\$\1\$", re.S)
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r"(?<![\w$.`\"])\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|\?")
+# 负号：前面是运算符、逗号、括号或关键字（而不是字段、值或右括号）时为一元负号，与数字一起折叠为?
+_NEGATIVE = re.compile(r"(^|[(,=<>+\-*/%|&^~!]|\b(?:select|where|and|or|not|in|is|values|set|then|else|when|case"
+                       r"|between|like|having|on|by|limit|offset|return|returning)\b)(\s*)-\s*\?", re.I)
+# 展开后的占位符列表（IN列表、多行VALUES），单个元素的IN列表与单字段的多行VALUES同样折叠
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SINGLE = re.compile(r"\b(in|values)\s*\(\s*\?\s*\)", re.I)
+_ROWS = re.compile(r"\(\?\+?\)(?:\s*,\s*\(\?\+?\))+")
+_SPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=4096)
+def fingerprint(sql: str) -> str:
+    """
+    SQL指纹：去掉注释与字面量（包括负数与美元引用字符串），占位符统一为?，任意长度的IN列表与多行VALUES折叠为一项，
+    空白合并，关键字转为小写
+    如"SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'Rose'" -> "select * from t where id in (?+) and name = ?"
+    :param sql: SQL
+    :return: 指纹
+    """
+    # 美元引用字符串中可能出现--、/*与单引号，先于注释和普通字符串处理
+    sql = _DOLLAR_STRING.sub("?", sql)
+    sql = _COMMENT.sub(" ", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _NEGATIVE.sub(r"\1\2?", sql)
+    sql = _LIST.sub("(?+)", sql)
+    sql = _SINGLE.sub(r"\1 (?+)", sql)
+    sql = _ROWS.sub("(?+)", sql)
+    sql = _SPACE.sub(" ", sql).strip().rstrip(";").strip()
+    return sql.lower()
+
+
+class _Entry:
+    """
+    单个指纹的统计
+    """
+    __slots__ = ("count", "errors", "total", "max", "rows", "samples", "seen")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        # 耗时样本（蓄水池抽样），用于估算p95
+        self.samples = []
+        self.seen = 0
+
+
+class QueryStats(QueryListener):
+    """
+    按SQL指纹汇总语句的执行次数、总耗时、平均耗时、p95耗时与行数，内存占用有上限
+    使用示例：
+        stats = QueryStats()
+        db.add_listener(stats)
+        ...
+        print(stats.dump(n=10))
+        stats.start_reporter(60, print)  # 每60秒输出一次
+    """
+
+    def __init__(self, max_fingerprints: int = 1000, samples: int = 256):
+        """
+        :param max_fingerprints: 最多保存的指纹数（不含"<other>"），超出时将总耗时最少的指纹合并到"<other>"
+        :param samples: 每个指纹保留的耗时样本数
+        """
+        if type(max_fingerprints) is not int:
+            raise TypeError("max_fingerprints should be int")
+        if max_fingerprints < 1:
+            raise ValueError("max_fingerprints should be greater than 0")
+        if type(samples) is not int:
+            raise TypeError("samples should be int")
+        if samples < 1:
+            raise ValueError("samples should be greater than 0")
+        self.__max_fingerprints__ = max_fingerprints
+        self.__samples__ = samples
+        self.__entries__ = {}
+        self.__lock__ = threading.Lock()
+        self.__reporter__ = None
+        self.__stop__ = threading.Event()
+
+    def after(self, event: QueryEvent):
+        self._add(event, False)
+
+    def error(self, event: QueryEvent):
+        self._add(event, True)
+
+    def _add(self, event: QueryEvent, failed: bool):
+        """
+        记录一次执行
+        :param event: 执行信息
+        :param failed: 是否失败
+        :return:
+        """
+        key = fingerprint(event.sql)
+        seconds = event.seconds
+        with self.__lock__:
+            entry = self.__entries__.get(key)
+            if entry is None:
+                if len(self.__entries__) - ("<other>" in self.__entries__) >= self.__max_fingerprints__:
+                    self._evict()
+                entry = self.__entries__[key] = _Entry()
+            entry.count += 1
+            entry.total += seconds
+            if seconds > entry.max:
+                entry.max = seconds
+            if failed:
+                entry.errors += 1
+            elif event.rowcount is not None and event.rowcount > 0:
+                entry.rows += event.rowcount
+            entry.seen += 1
+            if len(entry.samples) < self.__samples__:
+                entry.samples.append(seconds)
+            else:
+                i = random.randrange(entry.seen)
+                if i < self.__samples__:
+                    entry.samples[i] = seconds
+
+    def _evict(self):
+        """
+        指纹数达到上限时，将总耗时最少的指纹合并到"<other>"，调用方需持有锁
+        :return:
+        """
+        other = self.__entries__.get("<other>")
+        victim = min((k for k in self.__entries__ if k != "<other>"), key=lambda k: self.__entries__[k].total)
+        entry = self.__entries__.pop(victim)
+        if other is None:
+            other = self.__entries__["<other>"] = _Entry()
+        other.count += entry.count
+        other.errors += entry.errors
+        other.total += entry.total
+        other.max = max(other.max, entry.max)
+        other.rows += entry.rows
+        other.seen += entry.seen
+        other.samples = (other.samples + entry.samples)[-self.__samples__:]
+
+    @staticmethod
+    def _percentile(samples: list, percent: float):
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent))]
+
+    def top(self, n: int = 10, by: str = "total"):
+        """
+        按指标排序的前n个指纹
+        :param n: 数量
+        :param by: 排序指标：total（总耗时）、count（次数）、mean（平均耗时）、p95、rows（行数）
+        :return: 字典列表，耗时单位为毫秒
+        """
+        if type(n) is not int:
+            raise TypeError("n should be int")
+        if by not in ("total", "count", "mean", "p95", "rows"):
+            raise ValueError("by should be one of ['total', 'count', 'mean', 'p95', 'rows']")
+        with self.__lock__:
+            items = [(key, entry.count, entry.errors, entry.total, entry.max, entry.rows, list(entry.samples))
+                     for key, entry in self.__entries__.items()]
+        grand_total = sum(item[3] for item in items) or 1.0
+        rows = []
+        for key, count, errors, total, maximum, row_count, samples in items:
+            rows.append({
+                "fingerprint": key,
+                "count": count,
+                "errors": errors,
+                "total_ms": round(total * 1000, 3),
+                "mean_ms": round(total / count * 1000, 3),
+                "p95_ms": round(self._percentile(samples, 0.95) * 1000, 3),
+                "max_ms": round(maximum * 1000, 3),
+                "rows": row_count,
+                "time_percent": round(total / grand_total * 100, 2),
+            })
+        metric = {"total": "total_ms", "mean": "mean_ms", "p95": "p95_ms"}.get(by, by)
+        rows.sort(key=lambda row: row[metric], reverse=True)
+        return rows[:n]
+
+    def dump(self, n: int = 10, by: str = "total", format: str = "table"):
+        """
+        输出前n个指纹的统计
+        :param n: 数量
+        :param by: 排序指标，与top()相同
+        :param format: "table"为文本表格，"json"为JSON
+        :return: 字符串
+        """
+        rows = self.top(n, by)
+        if format == "json":
+            return json.dumps(rows, ensure_ascii=False)
+        if format != "table":
+            raise ValueError("format should be 'table' or 'json'")
+        columns = ["count", "errors", "total_ms", "mean_ms", "p95_ms", "max_ms", "rows", "time_percent"]
+        headers = ["count", "errors", "total_ms", "mean_ms", "p95_ms", "max_ms", "rows", "%time", "fingerprint"]
+        table = [[str(row[column]) for column in columns] + [row["fingerprint"]] for row in rows]
+        widths = [max([len(headers[i])] + [len(line[i]) for line in table]) for i in range(len(columns))]
+        lines = ["  ".join(header.rjust(width) for header, width in zip(headers, widths)) + "  " + headers[-1]]
+        for line in table:
+            lines.append("  ".join(value.rjust(width) for value, width in zip(line, widths)) + "  " + line[-1])
+        return "\n".join(lines)
+
+    def reset(self):
+        """
+        清空统计
+        :return:
+        """
+        with self.__lock__:
+            self.__entries__.clear()
+
+    def start_reporter(self, interval: float, sink=print, n: int = 10, by: str = "total", format: str = "table",
+                       reset: bool = False):
+        """
+        启动后台线程，每隔interval秒将dump()的结果传给sink
+        :param interval: 间隔（秒）
+        :param sink: 接收字符串的函数，如print或logger.info
+        :param n: 数量
+        :param by: 排序指标
+        :param format: 输出格式
+        :param reset: 每次输出后是否清空统计（输出每个周期内的统计）
+        :return:
+        """
+        if type(interval) not in (int, float):
+            raise TypeError("interval should be int or float")
+        if interval <= 0:
+            raise ValueError("interval should be greater than 0")
+        if not callable(sink):
+            raise TypeError("sink should be callable")
+        if self.__reporter__ is not None:
+            raise RuntimeError("reporter is already running")
+        self.__stop__.clear()
+
+        def run():
+            while not self.__stop__.wait(interval):
+                try:
+                    sink(self.dump(n, by, format))
+                except Exception:
+                    # sink出错（如日志handler不可用）时记录日志并继续，不清空统计，下个周期一并输出
+                    import logging
+                    logging.getLogger("babySql").exception("query stats reporter failed")
+                    continue
+                if reset:
+                    self.reset()
+
+        self.__reporter__ = threading.Thread(target=run, name="babysql-query-stats", daemon=True)
+        self.__reporter__.start()
+
+    def stop_reporter(self):
+        """
+        停止后台输出线程
+        :return:
+        """
+        if self.__reporter__ is None:
+            return
+        self.__stop__.set()
+        self.__reporter__.join()
+        self.__reporter__ = None
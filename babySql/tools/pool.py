@@ -0,0 +1,262 @@
+import threading
+import time
+
+from dbutils.pooled_db import PooledDB, TooManyConnectionsError
+
+from babySql.tools.events import _InstrumentedConnection
+
+# 等待连接耗时直方图的区间上限（秒）
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def check_pool_options(mincached, maxcached, blocking, maxusage, ping, setsession, reset):
+    """
+    校验连接池参数
+    :param mincached: 启动时创建的空闲连接数
+    :param maxcached: 最多保留的空闲连接数，0为不限制
+    :param blocking: 连接数达到上限时是否阻塞等待，False时抛出TooManyConnectionsError
+    :param maxusage: 单个连接最多使用次数，达到后重新连接，None或0为不限制
+    :param ping: 何时检查连接是否可用（dbutils的ping参数，0为从不检查，1为从连接池取出时检查）
+    :param setsession: 新建连接时执行的SQL列表
+    :param reset: 归还连接时是否回滚，None为使用各数据库的默认值
+    :return:
+    """
+    if type(mincached) is not int:
+        raise TypeError("mincached should be int")
+    if type(maxcached) is not int:
+        raise TypeError("maxcached should be int")
+    if type(blocking) is not bool:
+        raise TypeError("blocking should be bool")
+    if maxusage is not None and type(maxusage) is not int:
+        raise TypeError("maxusage should be int")
+    if type(ping) is not int:
+        raise TypeError("ping should be int")
+    if setsession is not None and type(setsession) is not list:
+        raise TypeError("setsession should be list")
+    if reset is not None and type(reset) is not bool:
+        raise TypeError("reset should be bool")
+
+
+def warm_size(warm, mincached: int, max_connections: int) -> int:
+    """
+    校验warm参数并返回预热的连接数：warm为整数时为该值，为True时为mincached（不能为0），为False时为mincached
+
+    不使用连接池上限作为默认值，避免启动时（包括每个只读实例）打开大量连接
+    :param warm: 是否预热或预热的连接数
+    :param mincached: 启动时创建的空闲连接数
+    :param max_connections: 最大连接数
+    :return: warmup()默认的预热连接数
+    """
+    if type(warm) is bool:
+        if warm and mincached < 1:
+            raise ValueError("warm=True requires mincached > 0, or pass the number of connections as warm=n")
+        return mincached
+    if type(warm) is not int:
+        raise TypeError("warm should be bool or int")
+    if warm < 1:
+        raise ValueError("warm should be greater than 0")
+    if max_connections and warm > max_connections:
+        raise ValueError("warm should not be greater than max_connections")
+    return warm
+
+
+class StatsPooledDB(PooledDB):
+    """
+    带统计的PooledDB：记录连接获取次数、等待次数与等待耗时直方图、新建与关闭的连接数以及当前占用情况
+    只统计连接池自身新建/关闭的连接，SteadyDB在连接失效时的自动重连不计入created
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.__stats_lock__ = threading.Lock()
+        self.__local__ = threading.local()
+        self.__stats__ = {
+            "checkouts": 0,
+            "returns": 0,
+            "created": 0,
+            "closed": 0,
+            "rejected": 0,
+            "waits": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+        self.__histogram__ = [0] * (len(WAIT_BUCKETS) + 1)
+        self.__warmup__ = None
+        # 语句执行监听器，为空时直接返回连接池连接，不增加任何开销
+        self.__listeners__ = ()
+        # mincached的连接在PooledDB.__init__中通过取出再归还创建，不计入checkouts/returns
+        self.__started__ = False
+        super().__init__(*args, **kwargs)
+        self.__started__ = True
+
+    def steady_connection(self):
+        con = super().steady_connection()
+        with self.__stats_lock__:
+            self.__stats__["created"] += 1
+        return con
+
+    def connection(self, shareable=True):
+        if not self.__started__:
+            return super().connection(shareable)
+        self.__local__.waited = 0.0
+        try:
+            con = super().connection(shareable)
+        except TooManyConnectionsError:
+            with self.__stats_lock__:
+                self.__stats__["rejected"] += 1
+            raise
+        waited = self.__local__.waited
+        bucket = len(WAIT_BUCKETS)
+        for i, bound in enumerate(WAIT_BUCKETS):
+            if waited <= bound:
+                bucket = i
+                break
+        with self.__stats_lock__:
+            self.__stats__["checkouts"] += 1
+            self.__histogram__[bucket] += 1
+            if waited:
+                self.__stats__["waits"] += 1
+                self.__stats__["wait_seconds_total"] += waited
+                if waited > self.__stats__["wait_seconds_max"]:
+                    self.__stats__["wait_seconds_max"] = waited
+        listeners = self.__listeners__
+        if listeners:
+            return _InstrumentedConnection(con, listeners, waited)
+        return con
+
+    def add_listener(self, listener):
+        """
+        添加语句执行监听器，之后取出的连接上执行的语句都会通知该监听器
+        :param listener: 具有before/after/error方法的对象，如QueryListener的子类
+        :return:
+        """
+        for name in ("before", "after", "error"):
+            if not callable(getattr(listener, name, None)):
+                raise TypeError(f"listener should have a callable {name}() method")
+        # 替换为新的元组，执行中的语句继续使用取出连接时的监听器
+        self.__listeners__ = self.__listeners__ + (listener,)
+
+    def remove_listener(self, listener):
+        """
+        移除语句执行监听器
+        :param listener: 监听器
+        :return:
+        """
+        if listener not in self.__listeners__:
+            raise ValueError("listener is not registered")
+        self.__listeners__ = tuple(item for item in self.__listeners__ if item is not listener)
+
+    def _wait_lock(self):
+        start = time.perf_counter()
+        try:
+            super()._wait_lock()
+        finally:
+            self.__local__.waited = getattr(self.__local__, "waited", 0.0) + time.perf_counter() - start
+
+    def cache(self, con):
+        if not self.__started__:
+            return super().cache(con)
+        with self._lock:
+            # 空闲连接已满时super().cache会直接关闭连接
+            full = bool(self._maxcached) and len(self._idle_cache) >= self._maxcached
+            super().cache(con)
+        with self.__stats_lock__:
+            self.__stats__["returns"] += 1
+            if full:
+                self.__stats__["closed"] += 1
+
+    def close(self):
+        with self._lock:
+            idle = len(self._idle_cache)
+            super().close()
+        with self.__stats_lock__:
+            self.__stats__["closed"] += idle
+
+    def stats(self):
+        """
+        连接池统计
+        :return:
+        """
+        with self._lock:
+            in_use = self._connections
+            idle = len(self._idle_cache)
+        with self.__stats_lock__:
+            stats = dict(self.__stats__)
+            histogram = list(self.__histogram__)
+        stats["wait_seconds_total"] = round(stats["wait_seconds_total"], 6)
+        stats["wait_seconds_max"] = round(stats["wait_seconds_max"], 6)
+        labels = [f"le_{bound * 1000:g}ms" for bound in WAIT_BUCKETS] + [f"gt_{WAIT_BUCKETS[-1] * 1000:g}ms"]
+        stats["wait_histogram"] = dict(zip(labels, histogram))
+        stats["in_use"] = in_use
+        stats["idle"] = idle
+        stats["max_connections"] = self._maxconnections
+        stats["warmup"] = self.__warmup__
+        return stats
+
+    def warmup(self, n: int):
+        """
+        并行新建并验证n个连接（执行setsession和SELECT 1）后放入空闲连接，已有的空闲连接计入n
+        数量受maxcached和maxconnections限制
+        :param n: 预热后的空闲连接数
+        :return: 预热报告：请求数、新建数、耗时以及单个连接最长的建立耗时
+        """
+        if type(n) is not int:
+            raise TypeError("n should be int")
+        if n < 0:
+            raise ValueError("n should not be less than 0")
+        start = time.perf_counter()
+        with self._lock:
+            limit = n
+            if self._maxcached:
+                limit = min(limit, self._maxcached)
+            if self._maxconnections:
+                limit = min(limit, self._maxconnections - self._connections)
+            missing = max(limit - len(self._idle_cache), 0)
+        opened = []
+        errors = []
+        if missing:
+            # concurrent.futures会导入logging，只在预热时导入
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(missing, 32), thread_name_prefix="babysql-warmup") as executor:
+                futures = [executor.submit(self._warm_connection) for _ in range(missing)]
+            for future in futures:
+                try:
+                    opened.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+        with self._lock:
+            for con, _ in opened:
+                self._idle_cache.append(con)
+            self._lock.notify_all()
+        report = {
+            "requested": n,
+            "opened": len(opened),
+            "failed": len(errors),
+            "idle": len(self._idle_cache),
+            "seconds": round(time.perf_counter() - start, 6),
+            "connect_seconds_max": round(max((seconds for _, seconds in opened), default=0.0), 6),
+        }
+        self.__warmup__ = report
+        if errors:
+            raise RuntimeError(f"Failed to warm up {len(errors)} of {missing} connections: {errors[0]}") from errors[0]
+        return report
+
+    def _warm_connection(self):
+        """
+        新建并验证一个连接
+        :return: (连接, 建立耗时)
+        """
+        start = time.perf_counter()
+        con = self.steady_connection()
+        try:
+            cursor = con.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            # 结束验证查询可能开启的事务，使连接以空闲状态进入连接池
+            con.rollback()
+        except Exception:
+            con.close()
+            raise
+        return con, time.perf_counter() - start
@@ -0,0 +1,180 @@
+import threading
+from collections import OrderedDict
+
+from babySql.tools.columnar import COLUMN_KINDS
+
+
+class Slot:
+    """
+    预编译查询中的命名占位符，执行时按名称传入值
+    使用示例：
+        query = db.select("user", ["id", "name"]).equal("name", Slot("name")).prepare()
+        query.run(name="Rose")
+    """
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        if type(name) is not str:
+            raise TypeError("name should be str")
+        if not name.isidentifier():
+            raise ValueError(f"invalid slot name: {name!r}")
+        self.name = name
+
+    def __repr__(self):
+        return f"Slot({self.name!r})"
+
+    def __eq__(self, other):
+        return type(other) is Slot and other.name == self.name
+
+    def __hash__(self):
+        return hash((Slot, self.name))
+
+
+class _Compiled:
+    """
+    编译结果：SQL、参数模板以及命名占位符在参数中的位置
+    """
+    __slots__ = ("sql", "params", "slots", "names")
+
+    def __init__(self, sql: str, params: list):
+        self.sql = sql
+        self.params = tuple(params)
+        self.slots = tuple((i, param.name) for i, param in enumerate(params) if type(param) is Slot)
+        self.names = frozenset(name for _, name in self.slots)
+
+
+# 按查询结构缓存编译结果，结构相同的构建器链prepare()时不再重新拼接SQL
+_CACHE_SIZE = 256
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def compile_query(key, build):
+    """
+    获取查询结构对应的编译结果，未命中时调用build编译并放入LRU缓存
+    :param key: 查询结构
+    :param build: 返回(sql, params)的无参函数
+    :return: _Compiled
+    """
+    with _cache_lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            return compiled
+        _cache_stats["misses"] += 1
+    compiled = _Compiled(*build())
+    with _cache_lock:
+        _cache[key] = compiled
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def prepared_cache_info():
+    """
+    编译缓存的命中、未命中次数与当前大小
+    :return:
+    """
+    with _cache_lock:
+        return {"hits": _cache_stats["hits"], "misses": _cache_stats["misses"], "size": len(_cache),
+                "max_size": _CACHE_SIZE}
+
+
+def clear_prepared_cache():
+    """
+    清空编译缓存
+    :return:
+    """
+    with _cache_lock:
+        _cache.clear()
+        _cache_stats["hits"] = 0
+        _cache_stats["misses"] = 0
+
+
+class PreparedQuery:
+    """
+    由条件构建器prepare()得到的预编译查询，SQL只编译一次，每次执行只绑定命名占位符的值
+    不保存执行状态，可以在多个线程中共享
+    """
+
+    def __init__(self, builder, compiled: _Compiled):
+        self.__builder__ = builder
+        self.__compiled__ = compiled
+        self.__readonly__ = builder._is_readonly()
+
+    @property
+    def sql(self):
+        """
+        编译后的SQL
+        :return:
+        """
+        return self.__compiled__.sql
+
+    @property
+    def names(self):
+        """
+        命名占位符名称
+        :return:
+        """
+        return set(self.__compiled__.names)
+
+    def _bind(self, values: dict):
+        """
+        将命名占位符替换为传入的值
+        :param values: 占位符名称 -> 值
+        :return: 参数列表
+        """
+        compiled = self.__compiled__
+        if values.keys() != compiled.names:
+            missing = compiled.names - values.keys()
+            if missing:
+                raise TypeError(f"missing value for slot {sorted(missing)}")
+            raise TypeError(f"unexpected slot {sorted(values.keys() - compiled.names)}")
+        params = list(compiled.params)
+        builder = self.__builder__
+        for i, name in compiled.slots:
+            value = values[name]
+            builder._check_value(name, value)
+            params[i] = builder._adapt_param(value)
+        return params
+
+    def run(self, **values):
+        """
+        绑定值并执行\n
+        query.run(name="Rose")
+        :param values: 命名占位符的值
+        :return: 与构建器run()相同
+        """
+        return self.__builder__._execute(self.__compiled__.sql, self._bind(values), self.__readonly__)
+
+    def stream(self, batch_size: int = 1000, **values):
+        """
+        绑定值并流式执行
+        :param batch_size: 每批读取的记录数
+        :param values: 命名占位符的值
+        :return: 逐行返回结果的生成器
+        """
+        if type(batch_size) is not int:
+            raise TypeError('batch_size should be int')
+        if batch_size <= 0:
+            raise ValueError('batch_size must be greater than 0')
+        return self.__builder__._stream(self.__compiled__.sql, self._bind(values), batch_size)
+
+    def to_columns(self, batch_size: int = 10000, kind: str = "array", **values):
+        """
+        绑定值并按列返回结果
+        :param batch_size: 每批读取的记录数
+        :param kind: 列类型：array或numpy
+        :param values: 命名占位符的值
+        :return: 与构建器to_columns()相同
+        """
+        if type(batch_size) is not int:
+            raise TypeError('batch_size should be int')
+        if batch_size <= 0:
+            raise ValueError('batch_size must be greater than 0')
+        if kind not in COLUMN_KINDS:
+            raise ValueError(f"kind should be one of {list(COLUMN_KINDS)}")
+        filler = self.__builder__._columns(self.__compiled__.sql, self._bind(values), batch_size)
+        return filler.result(kind == "numpy")
@@ -0,0 +1,222 @@
+import itertools
+import threading
+import time
+
+# 读请求的负载均衡策略
+STRATEGIES = ("round_robin", "least_busy")
+# 单次调用可以指定的路由
+ROUTES = ("primary", "replica")
+# 只读实例配置中可以覆盖的连接参数，未设置的参数与主库相同
+REPLICA_KEYS = ("host", "port", "user", "passwd", "db")
+
+
+def replica_configs(replicas: list, defaults: dict):
+    """
+    校验只读实例配置并补全与主库相同的连接参数
+    :param replicas: 只读实例配置列表，如[{"host": "10.0.0.2"}, {"host": "10.0.0.3", "port": 3307}]
+    :param defaults: 主库的连接参数
+    :return: 完整的连接参数列表
+    """
+    if type(replicas) is not list:
+        raise TypeError("replicas should be list")
+    configs = []
+    for replica in replicas:
+        if type(replica) is not dict:
+            raise TypeError("replica should be dict")
+        unknown = set(replica) - set(REPLICA_KEYS)
+        if unknown:
+            raise ValueError(f"unknown replica option {sorted(unknown)}, should be in {list(REPLICA_KEYS)}")
+        config = dict(defaults)
+        config.update(replica)
+        if type(config["host"]) is not str:
+            raise TypeError("host should be str")
+        if type(config["port"]) is not int:
+            raise TypeError("port should be int")
+        configs.append(config)
+    return configs
+
+
+class _WriteConnection:
+    """
+    主库连接代理，归还连接时记录写入时间，用于read-your-writes窗口
+    """
+
+    def __init__(self, connect, router):
+        self._connect = connect
+        self._router = router
+
+    def cursor(self, *args, **kwargs):
+        return self._connect.cursor(*args, **kwargs)
+
+    def close(self):
+        try:
+            self._connect.close()
+        finally:
+            self._router.mark_write()
+
+    def __getattr__(self, name):
+        return getattr(self._connect, name)
+
+
+class _ReadPool:
+    """
+    读连接池代理，每次获取连接时按路由选择主库或只读实例
+    """
+
+    def __init__(self, router, route: str = None):
+        self._router = router
+        self._route = route
+
+    def connection(self, *args, **kwargs):
+        return self._router._read_connection(self._route, *args, **kwargs)
+
+
+class _WritePool:
+    """
+    写连接池代理，从主库获取连接
+    """
+
+    def __init__(self, router):
+        self._router = router
+
+    def connection(self, *args, **kwargs):
+        return _WriteConnection(self._router.primary.connection(*args, **kwargs), self._router)
+
+
+class ReplicaRouter:
+    """
+    主从读写分离：写操作与事务使用主库，查询按策略分配到只读实例
+    read_your_writes大于0时，写操作完成后的该时间内（秒）本实例的查询也使用主库，避免读到复制延迟前的旧数据
+    使用示例：
+        router = ReplicaRouter(primary_pool, [replica_pool_1, replica_pool_2], strategy="least_busy",
+                               read_your_writes=1.0)
+        connect = router.reader().connection()
+    """
+
+    def __init__(self, primary, replicas: list, strategy: str = "round_robin", read_your_writes: float = 0):
+        """
+        :param primary: 主库连接池
+        :param replicas: 只读实例连接池列表
+        :param strategy: 负载均衡策略，"round_robin"轮询，"least_busy"选择占用连接最少的实例
+        :param read_your_writes: 写操作后查询使用主库的时间（秒），0为不启用
+        """
+        if type(replicas) is not list or not replicas:
+            raise ValueError("replicas should be a non-empty list")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"strategy should be one of {list(STRATEGIES)}")
+        if type(read_your_writes) not in (int, float):
+            raise TypeError("read_your_writes should be int or float")
+        if read_your_writes < 0:
+            raise ValueError("read_your_writes should not be less than 0")
+        self.__primary__ = primary
+        self.__replicas__ = replicas
+        self.__strategy__ = strategy
+        self.__read_your_writes__ = read_your_writes
+        self.__counter__ = itertools.count()
+        self.__last_write__ = None
+        self.__lock__ = threading.Lock()
+        self.__stats__ = {"primary_reads": 0, "replica_reads": [0] * len(replicas), "fallbacks": 0, "writes": 0}
+
+    @property
+    def primary(self):
+        """
+        主库连接池
+        :return:
+        """
+        return self.__primary__
+
+    @property
+    def replicas(self):
+        """
+        只读实例连接池
+        :return:
+        """
+        return list(self.__replicas__)
+
+    def reader(self, route: str = None):
+        """
+        读连接池
+        :param route: None按策略选择（read-your-writes窗口内使用主库），"primary"主库，"replica"只读实例
+        :return: 具有connection()方法的连接池代理
+        """
+        if route is not None and route not in ROUTES:
+            raise ValueError(f"route should be one of {list(ROUTES)}")
+        return _ReadPool(self, route)
+
+    def writer(self):
+        """
+        写连接池
+        :return: 具有connection()方法的连接池代理
+        """
+        return _WritePool(self)
+
+    def mark_write(self):
+        """
+        记录一次写操作，开始read-your-writes窗口
+        :return:
+        """
+        self.__last_write__ = time.monotonic()
+        with self.__lock__:
+            self.__stats__["writes"] += 1
+
+    def _replica_index(self):
+        """
+        按策略选择只读实例
+        :return: 实例下标
+        """
+        start = next(self.__counter__) % len(self.__replicas__)
+        if self.__strategy__ == "round_robin":
+            return start
+        # 从轮询位置开始比较，占用相同时依次分配
+        count = len(self.__replicas__)
+        order = [(start + i) % count for i in range(count)]
+        return min(order, key=lambda i: self.__replicas__[i]._connections)
+
+    def _read_connection(self, route: str, *args, **kwargs):
+        """
+        获取读连接
+        :param route: 路由
+        :return:
+        """
+        if route is None:
+            last_write = self.__last_write__
+            if last_write is not None and time.monotonic() - last_write < self.__read_your_writes__:
+                route = "primary"
+        if route == "primary":
+            with self.__lock__:
+                self.__stats__["primary_reads"] += 1
+            return self.__primary__.connection(*args, **kwargs)
+        index = self._replica_index()
+        try:
+            connect = self.__replicas__[index].connection(*args, **kwargs)
+        except Exception:
+            # 自动路由时只读实例不可用（连接失败或连接数已满）则使用主库；指定"replica"时直接抛出
+            if route == "replica":
+                raise
+            with self.__lock__:
+                self.__stats__["fallbacks"] += 1
+                self.__stats__["primary_reads"] += 1
+            return self.__primary__.connection(*args, **kwargs)
+        with self.__lock__:
+            self.__stats__["replica_reads"][index] += 1
+        return connect
+
+    def stats(self):
+        """
+        路由统计：主库与各只读实例的读次数、只读实例不可用时回退到主库的次数以及写操作次数
+        :return:
+        """
+        with self.__lock__:
+            stats = dict(self.__stats__)
+            stats["replica_reads"] = list(stats["replica_reads"])
+        stats["strategy"] = self.__strategy__
+        stats["read_your_writes"] = self.__read_your_writes__
+        return stats
+
+    def close(self):
+        """
+        关闭只读实例连接池，主库连接池由数据库实例关闭
+        :return:
+        """
+        for pool in self.__replicas__:
+            pool.close()
@@ -0,0 +1,64 @@
+import collections
+import functools
+
+from babySql.tools.columnar import column_names
+
+# select()返回的行格式：tuple为驱动返回的元组；named为按查询字段生成的元组子类，可按属性、字段名或下标访问；
+# dict为驱动的字典游标（pymysql的DictCursor、psycopg2的RealDictCursor）；row为sqlite3.Row，仅SQLite支持
+ROW_FACTORIES = ("tuple", "named", "dict")
+SQLITE_ROW_FACTORIES = ROW_FACTORIES + ("row",)
+
+
+def check_row_factory(row_factory: str, factories: tuple = ROW_FACTORIES):
+    """
+    检查行格式参数
+    :param row_factory: 行格式
+    :param factories: 支持的行格式
+    :return:
+    """
+    if type(row_factory) is not str:
+        raise TypeError("row_factory should be str")
+    if row_factory not in factories:
+        raise ValueError(f"row_factory should be one of {list(factories)}")
+
+
+@functools.lru_cache(maxsize=256)
+def named_row(names: tuple):
+    """
+    按字段名生成行类型，同一组字段名只生成一次\n
+    行是tuple的子类，没有实例字典：row.name、row["name"]、row[0]均可访问，dict(row)转换为字典\n
+    不是合法标识符的字段名（如count(*)）只能通过row["count(*)"]或下标访问
+    :param names: 字段名，不能重复
+    :return: 行类型
+    """
+    base = collections.namedtuple("Row", names, rename=True)
+    index = {name: i for i, name in enumerate(names)}
+    getitem = tuple.__getitem__
+
+    class Row(base):
+        __slots__ = ()
+
+        def __getitem__(self, key):
+            if type(key) is str:
+                return getitem(self, index[key])
+            return getitem(self, key)
+
+        def keys(self):
+            return names
+
+        def _asdict(self):
+            return dict(zip(names, self))
+
+        def __repr__(self):
+            return "Row(" + ", ".join(f"{name}={value!r}" for name, value in zip(names, self)) + ")"
+
+    return Row
+
+
+def row_maker(description):
+    """
+    根据游标描述获取named行的构造函数
+    :param description: cursor.description
+    :return: 以元组为参数、返回行对象的函数
+    """
+    return functools.partial(tuple.__new__, named_row(tuple(column_names(description))))
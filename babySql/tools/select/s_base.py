@@ -1,29 +1,74 @@
 import abc
+import datetime
+import re
 from abc import ABC
+from decimal import Decimal
+from typing import Union
+
+from babySql.tools.cache import ResultCache
+from babySql.tools.columnar import COLUMN_KINDS, ColumnFiller
+from babySql.tools.prepared import Slot, PreparedQuery, compile_query
+from babySql.tools.rows import row_maker
+
+# 条件值支持的类型，均以原生类型绑定参数，避免数值、日期等字段因隐式类型转换而无法使用索引
+VALUE_TYPES = (str, int, float, Decimal, datetime.datetime, datetime.date, bytes)
+ConditionValue = Union[str, int, float, Decimal, datetime.datetime, datetime.date, bytes, None]
+# 只读语句的起始关键字，这些语句执行后不需要提交
+READ_PREFIXES = ("SELECT", "SHOW", "DESCRIBE", "DESC", "EXPLAIN")
+# 以只读关键字开头但需要在主库执行的语句：加锁读取、SELECT INTO、修改序列或依赖会话状态的函数以及咨询锁
+WRITE_PATTERN = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+)?UPDATE\b|\bFOR\s+(?:KEY\s+)?SHARE\b|\bLOCK\s+IN\s+SHARE\s+MODE\b|\bINTO\b"
+    r"|\b(?:NEXTVAL|SETVAL|CURRVAL|LASTVAL|LAST_INSERT_ID|GET_LOCK|RELEASE_LOCK|PG_ADVISORY_\w*)\s*\(",
+    re.IGNORECASE)
+
+
+def is_read_sql(sql: str) -> bool:
+    """
+    判断SQL是否为只读语句，字符串常量中出现锁子句等关键字时也按写语句处理（使用主库并提交，结果不受影响）
+    :param sql: SQL
+    :return:
+    """
+    words = sql.lstrip(" \t\r\n(").split(None, 1)
+    return bool(words) and words[0].upper() in READ_PREFIXES and WRITE_PATTERN.search(sql) is None
 
 
 class SQLSelectConditionsBuilderBase(ABC):
-    def __init__(self, head_sql, cursor, connect):
+    # 参数占位符与标识符引号，由各数据库子类覆盖
+    _PLACEHOLDER = "%s"
+    _IDENTIFIER_QUOTE = "`"
+    # 列式结果中使用数组存储的字段：驱动的cursor.description类型码 -> array类型码，由各数据库子类覆盖
+    _ARRAY_TYPES = {}
+
+    def __init__(self, head_sql, pool, head_params: tuple = ()):
         """
         初始化SQL查询条件构建器基类
 
         Args:
             head_sql: SQL查询语句的头部部分（SELECT子句和FROM子句）
-            cursor: 数据库游标对象，用于执行SQL语句
-            connect: 数据库连接对象，用于提交事务和关闭连接
+            pool: 连接池，构建器本身不持有连接，只在run()/stream()/pages()执行时获取连接并在结束后归还
+            head_params: 头部SQL中占位符对应的参数（如UPDATE的SET子句）
         """
-        self.__cursor__ = cursor
-        self.__connect__ = connect
+        self.__pool__ = pool
         self.__head_sql__ = head_sql
+        self.__head_params__ = tuple(self._adapt_param(param) for param in head_params)
         self.__sort_sql__ = ""
         self.__group_by_sql__ = ""
         self.__limit_sql__ = ""
+        self.__limit_params__ = []
         self.__having_sql__ = ""
         self.__and_where_clauses__ = []
         self.__or_where_clauses__ = []
+        self.__seek__ = None
+        self.__readonly__ = None
+        # 结果缓存：由数据库实例设置；__cache_ttl__为False表示本查询未调用cache()
+        self.__cache__ = None
+        self.__cache_tables__ = ()
+        self.__cache_ttl__ = False
+        # 行格式：由数据库实例设置，见babySql.tools.rows.ROW_FACTORIES
+        self.__row_factory__ = "tuple"
 
     @abc.abstractmethod
-    def between_and(self, column: str, start: str, end: str, condition_mode: str = "and"):
+    def between_and(self, column: str, start: ConditionValue, end: ConditionValue, condition_mode: str = "and"):
         """
         构建介于两者之间的单表并列查询条件
         :param column: 字段名
@@ -35,29 +80,29 @@ class SQLSelectConditionsBuilderBase(ABC):
         pass
 
     @abc.abstractmethod
-    def equal(self, column: str, value: str, condition_mode: str = "and"):
+    def equal(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         """
         构建等于的单表并列查询条件
         :param column: 字段名
-        :param value: 值
+        :param value: 值，为None时构建IS NULL条件
         :param condition_mode: 条件类型：and，or
         :return:
         """
         pass
 
     @abc.abstractmethod
-    def unequal(self, column: str, value: str, condition_mode: str = "and"):
+    def unequal(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         """
         构建不等于的单表并列查询条件
         :param column: 字段名
-        :param value: 值
+        :param value: 值，为None时构建IS NOT NULL条件
         :param condition_mode: 条件类型：and，or
         :return:
         """
         pass
 
     @abc.abstractmethod
-    def equal_greater(self, column: str, value: str, condition_mode: str = "and"):
+    def equal_greater(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         """
         构建大于等于的单表并列查询条件
         :param column: 字段名
@@ -68,7 +113,7 @@ class SQLSelectConditionsBuilderBase(ABC):
         pass
 
     @abc.abstractmethod
-    def equal_less(self, column: str, value: str, condition_mode: str = "and"):
+    def equal_less(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         """
         构建小于等于的单表并列查询条件
         :param column: 字段名
@@ -79,7 +124,7 @@ class SQLSelectConditionsBuilderBase(ABC):
         pass
 
     @abc.abstractmethod
-    def greater(self, column: str, value: str, condition_mode: str = "and"):
+    def greater(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         """
         构建大于的单表并列查询条件
         :param column: 字段名
@@ -90,7 +135,7 @@ class SQLSelectConditionsBuilderBase(ABC):
         pass
 
     @abc.abstractmethod
-    def less(self, column: str, value: str, condition_mode: str = "and"):
+    def less(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         """
         构建小于的单表并列查询条件
         :param column: 字段名
@@ -246,10 +291,37 @@ class SQLSelectConditionsBuilderBase(ABC):
         """
         pass
 
-    def _add_sql(self, sql: str, condition_mode: str = "and"):
+    @staticmethod
+    def _check_value(name: str, value, allow_none: bool = False):
         """
-        将构建的SQL添加到指定列表
+        校验条件值类型
+        :param name: 参数名
+        :param value: 值
+        :param allow_none: 是否允许为None
+        :return:
+        """
+        if value is None and allow_none:
+            return
+        # 命名占位符在PreparedQuery执行时才校验实际的值
+        if type(value) is Slot:
+            return
+        if not isinstance(value, VALUE_TYPES):
+            raise TypeError(f'{name} should be str, int, float, Decimal, datetime, date or bytes')
+
+    @staticmethod
+    def _adapt_param(value):
+        """
+        将参数转换为驱动可直接绑定的值，各数据库可按需重写
+        :param value: 值
+        :return:
+        """
+        return value
+
+    def _add_sql(self, sql: str, params: tuple = (), condition_mode: str = "and"):
+        """
+        将构建的SQL及其绑定参数添加到指定列表，SQL中只包含占位符，值通过参数绑定
         :param sql: SQL语句
+        :param params: 占位符对应的参数
         :param condition_mode: 条件类型：and，or
         :return:
         """
@@ -257,10 +329,13 @@ class SQLSelectConditionsBuilderBase(ABC):
             raise TypeError('condition_mode should be str')
         if type(sql) is not str:
             raise TypeError('sql should be str')
+        if type(params) is not tuple:
+            raise TypeError('params should be tuple')
+        params = tuple(self._adapt_param(param) for param in params)
         if condition_mode.lower() == "and":
-            self.__and_where_clauses__.append(sql)
+            self.__and_where_clauses__.append((sql, params))
         elif condition_mode.lower() == "or":
-            self.__or_where_clauses__.append(sql)
+            self.__or_where_clauses__.append((sql, params))
         else:
             raise ValueError("condition_mode must be 'and' or 'or'")
 
@@ -277,6 +352,213 @@ class SQLSelectConditionsBuilderBase(ABC):
             raise TypeError('page_size should be int')
         return self.limit(page * page_size, page_size)
 
+    def readonly(self, readonly: bool = True):
+        """
+        显式标记查询是否只读，只读查询以autocommit方式执行，结束后不再提交事务\n
+        默认根据SQL自动判断（SELECT等语句为只读）
+        :param readonly: 是否只读
+        :return:
+        """
+        if type(readonly) is not bool:
+            raise TypeError('readonly should be bool')
+        self.__readonly__ = readonly
+        return self
+
+    def _is_readonly(self):
+        """
+        当前查询是否只读
+        :return:
+        """
+        if self.__readonly__ is not None:
+            return self.__readonly__
+        return is_read_sql(self.__head_sql__)
+
+    def _begin_readonly(self, connect, cursor):
+        """
+        只读查询执行前的会话设置，各数据库可重写（如切换为autocommit）
+        :param connect: 连接
+        :param cursor: 游标
+        :return: 是否修改了会话设置
+        """
+        return False
+
+    def _end_readonly(self, connect, cursor):
+        """
+        只读查询结束后恢复会话设置，仅在_begin_readonly返回True时调用
+        :param connect: 连接
+        :param cursor: 游标
+        :return:
+        """
+        pass
+
+    def _use_cache(self, cache: ResultCache, tables: tuple):
+        """
+        设置数据库实例的结果缓存，查询在调用cache()后使用缓存，写语句执行后使相关表的缓存失效
+        :param cache: 结果缓存
+        :param tables: 语句涉及的表名
+        :return:
+        """
+        self.__cache__ = cache
+        self.__cache_tables__ = tables
+        return self
+
+    def _use_rows(self, row_factory: str):
+        """
+        设置数据库实例的行格式，作用于run()、stream()与pages()，to_columns()不受影响
+        :param row_factory: 行格式
+        :return:
+        """
+        self.__row_factory__ = row_factory
+        return self
+
+    def cache(self, ttl: float = None):
+        """
+        缓存本查询的结果，需要数据库实例启用result_cache，未启用时不缓存\n
+        db.select("city").equal("code", "SH").cache(ttl=60).run()
+        :param ttl: 缓存时间（秒），默认为result_cache_ttl
+        :return:
+        """
+        self.__cache_ttl__ = ResultCache.check_ttl(ttl)
+        return self
+
+    def seek(self, after: dict = None, order: list = None, size: int = 1000, direction: str = "ASC"):
+        """
+        键集（seek）分页：以上一页最后一行的排序键为起点读取下一页，
+        生成 WHERE (k1, k2) > (...) ORDER BY k1, k2 LIMIT n，每页的代价与页的深度无关\n
+        db.select("test_table").seek(after={"id": last_id}, order=["id"], size=1000).run()
+        :param after: 上一页最后一行的排序键值，如{"id": 100}；为None时从第一页开始
+        :param order: 排序键（应能唯一确定一行，如主键），默认为after的键
+        :param size: 每页记录数
+        :param direction: 排序方向，ASC或DESC
+        :return:
+        """
+        if after is not None and type(after) is not dict:
+            raise TypeError('after should be dict')
+        if order is None:
+            if not after:
+                raise ValueError("order is required when after is not given")
+            order = list(after.keys())
+        if type(order) is not list:
+            raise TypeError('order should be list')
+        if not order:
+            raise ValueError("order should not be empty")
+        for column in order:
+            if type(column) is not str:
+                raise TypeError(f"Column element {column} is not a string")
+        if type(size) is not int:
+            raise TypeError('size should be int')
+        if size <= 0:
+            raise ValueError('size must be greater than 0')
+        if type(direction) is not str:
+            raise TypeError('direction should be str')
+        if direction.upper() not in ("ASC", "DESC"):
+            raise ValueError(f"Invalid direction: {direction}, must be ASC or DESC")
+        values = None
+        if after is not None:
+            if set(after.keys()) != set(order):
+                raise ValueError("after must contain exactly the order columns")
+            for column in order:
+                self._check_value(column, after[column])
+            values = tuple(self._adapt_param(after[column]) for column in order)
+        self.__seek__ = {"order": order, "after": values, "size": size, "direction": direction.upper()}
+        return self
+
+    def pages(self):
+        """
+        按seek()设置的排序键逐页读取，每次返回一页结果，直到最后一页\n
+        for rows in db.select("test_table").seek(order=["id"], size=1000).pages(): ...\n
+        所有页在同一个连接上执行，迭代结束或生成器被关闭时归还连接
+        :return: 逐页返回结果的生成器
+        """
+        if self.__seek__ is None:
+            raise ValueError("seek() must be called before pages()")
+        return self._pages()
+
+    def _pages(self):
+        """
+        键集分页的生成器实现
+        :return:
+        """
+        seek = self.__seek__
+        readonly = self._is_readonly()
+        row_factory = self.__row_factory__
+        connect = self.__pool__.connection()
+        cursor = None
+        changed = False
+        try:
+            cursor = self._cursor(connect, row_factory)
+            changed = readonly and self._begin_readonly(connect, cursor)
+            positions = None
+            # 当前页的起点只保存在本次迭代中，不写回构建器，pages()/run()可重复执行
+            after = seek["after"]
+            while True:
+                sql, params = self._build_sql(after)
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+                if positions is None and rows:
+                    positions = self._seek_positions(cursor.description, seek["order"])
+                    # dict行按字段名取排序键
+                    if row_factory == "dict":
+                        positions = [cursor.description[i][0] for i in positions]
+                if len(rows) == seek["size"]:
+                    after = tuple(rows[-1][i] for i in positions)
+                if rows:
+                    yield list(map(row_maker(cursor.description), rows)) if row_factory == "named" else rows
+                if len(rows) < seek["size"]:
+                    break
+            if not readonly:
+                connect.commit()
+        finally:
+            if changed:
+                self._end_readonly(connect, cursor)
+            if cursor is not None:
+                cursor.close()
+            connect.close()
+
+    @staticmethod
+    def _seek_positions(description, order: list):
+        """
+        根据游标描述定位排序键在结果行中的位置
+        :param description: cursor.description
+        :param order: 排序键
+        :return:
+        """
+        names = [str(column[0]) for column in description]
+        lower_names = [name.lower() for name in names]
+        positions = []
+        for column in order:
+            if column in names:
+                positions.append(names.index(column))
+            elif column.lower() in lower_names:
+                positions.append(lower_names.index(column.lower()))
+            else:
+                raise ValueError(f"Seek column '{column}' must be included in the selected columns")
+        return positions
+
+    def _build_seek_clause(self, after: tuple = None):
+        """
+        构建键集分页的条件、排序和LIMIT子句
+        :param after: 起点的排序键值，默认为seek()设置的after
+        :return: 条件SQL、条件参数、ORDER BY子句、LIMIT子句、LIMIT参数
+        """
+        seek = self.__seek__
+        if after is None:
+            after = seek["after"]
+        quote = self._IDENTIFIER_QUOTE
+        columns = [f"{quote}{column}{quote}" for column in seek["order"]]
+        condition, condition_params = "", []
+        if after is not None:
+            operator = ">" if seek["direction"] == "ASC" else "<"
+            if len(columns) == 1:
+                condition = f"{columns[0]} {operator} {self._PLACEHOLDER}"
+            else:
+                placeholders = ", ".join([self._PLACEHOLDER] * len(columns))
+                condition = f"({', '.join(columns)}) {operator} ({placeholders})"
+            condition_params = list(after)
+        sort_sql = "ORDER BY " + ", ".join([f"{column} {seek['direction']}" for column in columns])
+        limit_sql = f"LIMIT {self._PLACEHOLDER}"
+        return condition, condition_params, sort_sql, limit_sql, [seek["size"]]
+
     def _build_where_clause(self):
         """
         构建WHERE子句
@@ -295,24 +577,275 @@ class SQLSelectConditionsBuilderBase(ABC):
         where_clause = " AND ".join(conditions) if conditions else ""
         return where_clause, params
 
-    def run(self):
+    def _build_sql(self, after: tuple = None):
+        """
+        构建完整SQL语句
+        :param after: 键集分页的起点，默认为seek()设置的after，由pages()逐页传入
+        :return: SQL语句和参数列表
+        """
+        where_clause, where_params = self._build_where_clause()
+        sort_sql, limit_sql, limit_params = self.__sort_sql__, self.__limit_sql__, self.__limit_params__
+        if self.__seek__ is not None:
+            if sort_sql or limit_sql:
+                raise ValueError("seek() cannot be combined with sort(), limit() or page()")
+            condition, condition_params, sort_sql, limit_sql, limit_params = self._build_seek_clause(after)
+            if condition:
+                where_clause = f"{where_clause} AND {condition}" if where_clause else condition
+                where_params = where_params + condition_params
+        # 按 WHERE、GROUP BY、HAVING、ORDER BY、LIMIT 的顺序拼接，值全部以占位符绑定，同结构查询的SQL文本保持不变
+        parts = [self.__head_sql__.strip()]
+        if where_clause:
+            parts.append(f"WHERE {where_clause}")
+        for clause in (self.__group_by_sql__, self.__having_sql__, sort_sql, limit_sql):
+            if clause:
+                parts.append(clause.strip())
+        sql = " ".join(parts) + ";"
+        params = list(self.__head_params__) + where_params + limit_params
+        return sql, params
+
+    def _cursor(self, connect, row_factory: str = "tuple"):
+        """
+        创建游标，各数据库重写以支持驱动自带的行格式（如dict）
+        :param connect: 连接
+        :param row_factory: 行格式，named由构建器在读取后转换，不需要在游标上设置
+        :return: 游标
+        """
+        return connect.cursor()
+
+    def _stream_cursor(self, connect, row_factory: str = "tuple"):
+        """
+        创建用于流式读取的游标，各数据库可重写为服务端游标
+        :param connect: 连接
+        :param row_factory: 行格式
+        :return: 游标
+        """
+        return self._cursor(connect, row_factory)
+
+    def prepare(self):
+        """
+        将构建器链编译为可重复执行的PreparedQuery，条件值可以使用Slot命名占位符
+
+        query = db.select("test_table", ["id", "name"]).equal("name", Slot("name")).prepare()
+
+        query.run(name="Rose")
+
+        编译结果按查询结构缓存，结构相同的构建器链再次prepare()时不再重新拼接SQL
+        :return: PreparedQuery
+        """
+        seek = self.__seek__
+        if seek is not None:
+            seek = (tuple(seek["order"]), self._shape(seek["after"] or ()), seek["size"], seek["direction"])
+        key = (
+            type(self), self.__head_sql__, self._shape(self.__head_params__),
+            tuple((sql, self._shape(params)) for sql, params in self.__and_where_clauses__),
+            tuple((sql, self._shape(params)) for sql, params in self.__or_where_clauses__),
+            self.__group_by_sql__, self.__having_sql__, self.__sort_sql__,
+            self.__limit_sql__, self._shape(self.__limit_params__), seek,
+        )
+        return PreparedQuery(self, compile_query(key, self._build_sql))
+
+    @staticmethod
+    def _shape(params):
+        """
+        参数的缓存键，包含类型以区分1、1.0与True等相等但绑定结果不同的值
+        :param params: 参数
+        :return:
+        """
+        return tuple((type(param), param) for param in params)
+
+    def run(self, format: str = "rows"):
         """
         执行构建好的SQL查询
+        :param format: 结果格式：rows为行列表；columnar为按列存储的字典，等同于to_columns()
         :return: 查询结果集
         """
-        where_clause, params = self._build_where_clause()
-        where_clause = f"WHERE {where_clause}" if where_clause else ""
-        # 构建完整SQL语句
-        if self.__sort_sql__ != "":
-            sql = f"{self.__head_sql__} {where_clause} {self.__sort_sql__} {self.__limit_sql__};"
-        elif self.__group_by_sql__ != "":
-            sql = f"{self.__head_sql__} {where_clause} {self.__group_by_sql__} {self.__limit_sql__};"
-        else:
-            sql = f"{self.__head_sql__} {where_clause} {self.__limit_sql__};"
-        # 执行SQL
-        self.__cursor__.execute(sql, params)
-        row = self.__cursor__.fetchall()
-        self.__connect__.commit()
-        self.__cursor__.close()
-        self.__connect__.close()
-        return row
\ No newline at end of file
+        if format == "columnar":
+            return self.to_columns()
+        if format != "rows":
+            raise ValueError("format should be 'rows' or 'columnar'")
+        sql, params = self._build_sql()
+        return self._execute(sql, params, self._is_readonly())
+
+    def to_columns(self, batch_size: int = 10000, kind: str = "array"):
+        """
+        执行查询并按列返回结果，按批读取并直接写入各列，不生成完整的行列表\n
+        cols = db.select("test_table", ["id", "score"]).to_columns(kind="numpy")\n
+        数值字段为array.array（kind="numpy"时为numpy.ndarray），其余字段为list（numpy时为object数组）；
+        浮点字段的NULL为NaN，含NULL的整数字段退化为list；不使用结果缓存
+        :param batch_size: 每批读取的记录数
+        :param kind: 列类型：array或numpy
+        :return: 列名 -> 列
+        """
+        if type(batch_size) is not int:
+            raise TypeError('batch_size should be int')
+        if batch_size <= 0:
+            raise ValueError('batch_size must be greater than 0')
+        if kind not in COLUMN_KINDS:
+            raise ValueError(f"kind should be one of {list(COLUMN_KINDS)}")
+        sql, params = self._build_sql()
+        return self._columns(sql, params, batch_size).result(kind == "numpy")
+
+    def to_dataframe(self, batch_size: int = 10000):
+        """
+        执行查询并返回pandas.DataFrame，数值列由to_columns(kind="numpy")的数组直接构造
+        :param batch_size: 每批读取的记录数
+        :return: pandas.DataFrame
+        """
+        try:
+            import pandas
+        except ImportError:
+            raise ImportError("pandas is required for to_dataframe(), install it with: pip install pandas") from None
+        return pandas.DataFrame(self.to_columns(batch_size, "numpy"), copy=False)
+
+    def _columns(self, sql: str, params: list, batch_size: int):
+        """
+        获取连接并按批读取结果写入各列
+        :param sql: SQL语句
+        :param params: 参数列表
+        :param batch_size: 每批读取的记录数
+        :return: ColumnFiller
+        """
+        readonly = self._is_readonly()
+        connect = self.__pool__.connection()
+        cursor = None
+        try:
+            cursor = self._stream_cursor(connect)
+            cursor.execute(sql, params)
+            rows = cursor.fetchmany(batch_size)
+            # 服务端游标在第一次读取后才有description
+            if cursor.description is None:
+                raise ValueError("to_columns() requires a statement that returns rows")
+            filler = ColumnFiller(cursor.description, self._ARRAY_TYPES)
+            while rows:
+                filler.add(rows)
+                rows = cursor.fetchmany(batch_size)
+            if not readonly:
+                connect.commit()
+        finally:
+            if cursor is not None:
+                cursor.close()
+            connect.close()
+        return filler
+
+    def _execute(self, sql: str, params: list, readonly: bool):
+        """
+        获取连接并执行SQL
+        :param sql: SQL语句
+        :param params: 参数列表
+        :param readonly: 是否只读
+        :return: 查询结果集
+        """
+        cache = self.__cache__
+        cached = cache is not None and readonly and self.__cache_ttl__ is not False
+        if cached:
+            key = (sql, self._shape(params))
+            hit, rows = cache.get(key)
+            if hit:
+                # 返回副本，调用方修改结果列表（或dict行）不影响缓存
+                if self.__row_factory__ == "dict":
+                    return [dict(item) for item in rows]
+                return list(rows) if type(rows) is list else rows
+            # 执行查询前取失效代数，执行期间相关表被修改时不缓存这次（可能是旧数据）的结果
+            generation = cache.generation(self.__cache_tables__)
+        row_factory = self.__row_factory__
+        # 执行时才从连接池获取连接，无论成功与否都归还
+        connect = self.__pool__.connection()
+        cursor = None
+        changed = False
+        try:
+            cursor = self._cursor(connect, row_factory)
+            changed = readonly and self._begin_readonly(connect, cursor)
+            cursor.execute(sql, params)
+            if row_factory == "named" and cursor.description is not None:
+                row = self._fetch_named(cursor)
+            else:
+                row = cursor.fetchall()
+            # 只读查询不需要在结束后提交
+            if not readonly:
+                connect.commit()
+        finally:
+            if changed:
+                self._end_readonly(connect, cursor)
+            if cursor is not None:
+                cursor.close()
+            connect.close()
+        if cached:
+            if row_factory == "dict":
+                stored = [dict(item) for item in row]
+            else:
+                stored = list(row) if type(row) is list else row
+            cache.set(key, stored, self.__cache_tables__, self.__cache_ttl__, generation)
+        elif cache is not None and not is_read_sql(self.__head_sql__):
+            cache.invalidate(self.__cache_tables__)
+        return row
+
+    @staticmethod
+    def _fetch_named(cursor, batch_size: int = 10000):
+        """
+        按批读取并转换为named行，避免同时持有完整的元组列表与行对象列表
+        :param cursor: 已执行查询的游标
+        :param batch_size: 每批读取的记录数
+        :return: 行列表
+        """
+        make = row_maker(cursor.description)
+        rows = []
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return rows
+            rows.extend(map(make, batch))
+
+    def stream(self, batch_size: int = 1000):
+        """
+        流式执行构建好的SQL查询，按批从数据库读取并逐行返回，内存占用与batch_size相关而与结果集大小无关\n
+        for row in db.select("test_table").stream(batch_size=500): ...\n
+        迭代结束或生成器被关闭时归还连接
+        :param batch_size: 每批读取的记录数
+        :return: 逐行返回结果的生成器
+        """
+        if type(batch_size) is not int:
+            raise TypeError('batch_size should be int')
+        if batch_size <= 0:
+            raise ValueError('batch_size must be greater than 0')
+        sql, params = self._build_sql()
+        return self._stream(sql, params, batch_size)
+
+    def iter(self, batch_size: int = 1000):
+        """
+        stream的别名
+        :param batch_size: 每批读取的记录数
+        :return: 逐行返回结果的生成器
+        """
+        return self.stream(batch_size)
+
+    def _stream(self, sql, params, batch_size: int):
+        """
+        流式读取的生成器实现
+        :param sql: SQL语句
+        :param params: 参数列表
+        :param batch_size: 每批读取的记录数
+        :return:
+        """
+        row_factory = self.__row_factory__
+        connect = self.__pool__.connection()
+        cursor = None
+        try:
+            cursor = self._stream_cursor(connect, row_factory)
+            cursor.execute(sql, params)
+            make = None
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if row_factory == "named":
+                    if make is None:
+                        make = row_maker(cursor.description)
+                    yield from map(make, rows)
+                else:
+                    yield from rows
+            if not self._is_readonly():
+                connect.commit()
+        finally:
+            if cursor is not None:
+                cursor.close()
+            connect.close()
@@ -1,80 +1,82 @@
-from babySql.tools.select.s_base import SQLSelectConditionsBuilderBase
+from babySql.tools.prepared import Slot
+from babySql.tools.select.s_base import SQLSelectConditionsBuilderBase, ConditionValue
 
 
 class MySQLSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
-    def __init__(self, head_sql, cursor, connect):
-        super().__init__(head_sql, cursor, connect)
+    # pymysql的FIELD_TYPE：TINY、SHORT、LONG、LONGLONG、INT24、YEAR为整数，FLOAT、DOUBLE为浮点数；DECIMAL保持为Decimal
+    _ARRAY_TYPES = {1: "q", 2: "q", 3: "q", 8: "q", 9: "q", 13: "q", 4: "d", 5: "d"}
 
-    def between_and(self, column: str, start: str, end: str, condition_mode: str = "and"):
+    def __init__(self, head_sql, pool, head_params: tuple = ()):
+        super().__init__(head_sql, pool, head_params)
+
+    def between_and(self, column: str, start: ConditionValue, end: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(start) is not str:
-            raise TypeError('start should be str')
-        if type(end) is not str:
-            raise TypeError('end should be str')
+        self._check_value('start', start)
+        self._check_value('end', end)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` BETWEEN '{start}' AND '{end}'", condition_mode)
+        self._add_sql(f"`{column}` BETWEEN %s AND %s", (start, end), condition_mode)
         return self
 
-    def equal(self, column: str, value: str, condition_mode: str = "and"):
+    def equal(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(value) is not str:
-            raise TypeError('value should be str')
+        self._check_value('value', value, allow_none=True)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` = '{value}'", condition_mode)
+        if value is None:
+            self._add_sql(f"`{column}` IS NULL", (), condition_mode)
+            return self
+        self._add_sql(f"`{column}` = %s", (value,), condition_mode)
         return self
 
-    def unequal(self, column: str, value: str, condition_mode: str = "and"):
+    def unequal(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(value) is not str:
-            raise TypeError('value should be str')
+        self._check_value('value', value, allow_none=True)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` != '{value}'", condition_mode)
+        if value is None:
+            self._add_sql(f"`{column}` IS NOT NULL", (), condition_mode)
+            return self
+        self._add_sql(f"`{column}` != %s", (value,), condition_mode)
         return self
 
-    def equal_greater(self, column: str, value: str, condition_mode: str = "and"):
+    def equal_greater(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(value) is not str:
-            raise TypeError('value should be str')
+        self._check_value('value', value)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` >= '{value}'", condition_mode)
+        self._add_sql(f"`{column}` >= %s", (value,), condition_mode)
         return self
 
-    def equal_less(self, column: str, value: str, condition_mode: str = "and"):
+    def equal_less(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(value) is not str:
-            raise TypeError('value should be str')
+        self._check_value('value', value)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` <= '{value}'", condition_mode)
+        self._add_sql(f"`{column}` <= %s", (value,), condition_mode)
         return self
 
-    def greater(self, column: str, value: str, condition_mode: str = "and"):
+    def greater(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(value) is not str:
-            raise TypeError('value should be str')
+        self._check_value('value', value)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` > '{value}'", condition_mode)
+        self._add_sql(f"`{column}` > %s", (value,), condition_mode)
         return self
 
-    def less(self, column: str, value: str, condition_mode: str = "and"):
+    def less(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(value) is not str:
-            raise TypeError('value should be str')
+        self._check_value('value', value)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` < '{value}'", condition_mode)
+        self._add_sql(f"`{column}` < %s", (value,), condition_mode)
         return self
 
     def like_start(self, column: str, value: str, condition_mode: str = "and"):
@@ -84,7 +86,7 @@ class MySQLSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('value should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` like '{value}%'", condition_mode)
+        self._add_sql(f"`{column}` like %s", (f"{value}%",), condition_mode)
         return self
 
     def like_end(self, column: str, value: str, condition_mode: str = "and"):
@@ -94,7 +96,7 @@ class MySQLSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('value should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` like '%{value}'", condition_mode)
+        self._add_sql(f"`{column}` like %s", (f"%{value}",), condition_mode)
         return self
 
     def like(self, column: str, value: str, condition_mode: str = "and"):
@@ -104,7 +106,7 @@ class MySQLSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('value should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` like '%{value}%'", condition_mode)
+        self._add_sql(f"`{column}` like %s", (f"%{value}%",), condition_mode)
         return self
 
     def not_like_start(self, column: str, value: str, condition_mode: str = "and"):
@@ -114,7 +116,7 @@ class MySQLSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('value should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` not like '{value}%'", condition_mode)
+        self._add_sql(f"`{column}` not like %s", (f"{value}%",), condition_mode)
         return self
 
     def not_like_end(self, column: str, value: str, condition_mode: str = "and"):
@@ -124,7 +126,7 @@ class MySQLSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('value should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` not like '%{value}'", condition_mode)
+        self._add_sql(f"`{column}` not like %s", (f"%{value}",), condition_mode)
         return self
 
     def not_like(self, column: str, value: str, condition_mode: str = "and"):
@@ -134,7 +136,7 @@ class MySQLSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('value should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` not like '%{value}%'", condition_mode)
+        self._add_sql(f"`{column}` not like %s", (f"%{value}%",), condition_mode)
         return self
 
     def in_(self, column: str, value: list, condition_mode: str = "and"):
@@ -146,9 +148,12 @@ class MySQLSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('condition_mode should be str')
         if type(value) is not list:
             raise TypeError("value must be list")
-        dt = "', '".join(value)
-        sql = "('" + f"{dt}" + "')"
-        self._add_sql(f"`{column}` IN {sql}", condition_mode)
+        if not value:
+            raise ValueError("value should not be empty")
+        for item in value:
+            self._check_value('value item', item)
+        sql = "(" + ", ".join(["%s"] * len(value)) + ")"
+        self._add_sql(f"`{column}` IN {sql}", tuple(value), condition_mode)
         return self
 
     def not_in(self, column: str, value: list, condition_mode: str = "and"):
@@ -160,9 +165,12 @@ class MySQLSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('condition_mode should be str')
         if type(value) is not list:
             raise TypeError("value must be list")
-        dt = "', '".join(value)
-        sql = "('" + f"{dt}" + "')"
-        self._add_sql(f"`{column}` NOT IN {sql}", condition_mode)
+        if not value:
+            raise ValueError("value should not be empty")
+        for item in value:
+            self._check_value('value item', item)
+        sql = "(" + ", ".join(["%s"] * len(value)) + ")"
+        self._add_sql(f"`{column}` NOT IN {sql}", tuple(value), condition_mode)
         return self
 
     def is_null(self, column: str, condition_mode: str = "and"):
@@ -170,7 +178,7 @@ class MySQLSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('column should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"{column} IS NULL", condition_mode)
+        self._add_sql(f"{column} IS NULL", (), condition_mode)
         return self
 
     def is_not_null(self, column: str, condition_mode: str = "and"):
@@ -178,7 +186,7 @@ class MySQLSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('column should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"{column} IS NOT NULL", condition_mode)
+        self._add_sql(f"{column} IS NOT NULL", (), condition_mode)
         return self
 
     def sort(self, column: str or list, direction: str or list = "ASC"):
@@ -234,9 +242,21 @@ class MySQLSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
         return self
 
     def limit(self, offset: int, limit: int):
-        if type(offset) is not int:
+        if type(offset) is not int and type(offset) is not Slot:
             raise TypeError('offset should be int')
-        if type(limit) is not int:
+        if type(limit) is not int and type(limit) is not Slot:
             raise TypeError('limit should be int')
-        self.__limit_sql__ = f" LIMIT {limit} OFFSET {offset}"
+        self.__limit_sql__ = " LIMIT %s OFFSET %s"
+        self.__limit_params__ = [limit, offset]
         return self
+
+    def _cursor(self, connect, row_factory: str = "tuple"):
+        if row_factory == "dict":
+            from pymysql.cursors import DictCursor
+            return connect.cursor(DictCursor)
+        return connect.cursor()
+
+    def _stream_cursor(self, connect, row_factory: str = "tuple"):
+        # 使用pymysql的无缓冲游标，结果集按需从服务端读取；在此导入使构建器模块不依赖数据库驱动
+        from pymysql.cursors import SSCursor, SSDictCursor
+        return connect.cursor(SSDictCursor if row_factory == "dict" else SSCursor)
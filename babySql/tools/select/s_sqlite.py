@@ -1,80 +1,95 @@
-from babySql.tools.select.s_base import SQLSelectConditionsBuilderBase
+import datetime
+import functools
+from decimal import Decimal
+from babySql.tools.prepared import Slot
+from babySql.tools.select.s_base import SQLSelectConditionsBuilderBase, ConditionValue
 
 
 class SqLiteSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
-    def __init__(self, head_sql, cursor, connect):
-        super().__init__(head_sql, cursor, connect)
+    _PLACEHOLDER = "?"
 
-    def between_and(self, column: str, start: str, end: str, condition_mode: str = "and"):
+    def __init__(self, head_sql, pool, head_params: tuple = ()):
+        super().__init__(head_sql, pool, head_params)
+
+    @staticmethod
+    def _adapt_param(value):
+        # sqlite3不支持Decimal，日期类型的默认适配器在Python 3.12中已弃用，统一转换为与默认适配器一致的文本
+        if isinstance(value, Decimal):
+            return str(value)
+        if isinstance(value, datetime.datetime):
+            return value.isoformat(" ")
+        if isinstance(value, datetime.date):
+            return value.isoformat()
+        return value
+
+    def between_and(self, column: str, start: ConditionValue, end: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(start) is not str:
-            raise TypeError('start should be str')
-        if type(end) is not str:
-            raise TypeError('end should be str')
+        self._check_value('start', start)
+        self._check_value('end', end)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` BETWEEN '{start}' AND '{end}'", condition_mode)
+        self._add_sql(f"`{column}` BETWEEN ? AND ?", (start, end), condition_mode)
         return self
 
-    def equal(self, column: str, value: str, condition_mode: str = "and"):
+    def equal(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(value) is not str:
-            raise TypeError('value should be str')
+        self._check_value('value', value, allow_none=True)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` = '{value}'", condition_mode)
+        if value is None:
+            self._add_sql(f"`{column}` IS NULL", (), condition_mode)
+            return self
+        self._add_sql(f"`{column}` = ?", (value,), condition_mode)
         return self
 
-    def unequal(self, column: str, value: str, condition_mode: str = "and"):
+    def unequal(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(value) is not str:
-            raise TypeError('value should be str')
+        self._check_value('value', value, allow_none=True)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` != '{value}'", condition_mode)
+        if value is None:
+            self._add_sql(f"`{column}` IS NOT NULL", (), condition_mode)
+            return self
+        self._add_sql(f"`{column}` != ?", (value,), condition_mode)
         return self
 
-    def equal_greater(self, column: str, value: str, condition_mode: str = "and"):
+    def equal_greater(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(value) is not str:
-            raise TypeError('value should be str')
+        self._check_value('value', value)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` >= '{value}'", condition_mode)
+        self._add_sql(f"`{column}` >= ?", (value,), condition_mode)
         return self
 
-    def equal_less(self, column: str, value: str, condition_mode: str = "and"):
+    def equal_less(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(value) is not str:
-            raise TypeError('value should be str')
+        self._check_value('value', value)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` <= '{value}'", condition_mode)
+        self._add_sql(f"`{column}` <= ?", (value,), condition_mode)
         return self
 
-    def greater(self, column: str, value: str, condition_mode: str = "and"):
+    def greater(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(value) is not str:
-            raise TypeError('value should be str')
+        self._check_value('value', value)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` > '{value}'", condition_mode)
+        self._add_sql(f"`{column}` > ?", (value,), condition_mode)
         return self
 
-    def less(self, column: str, value: str, condition_mode: str = "and"):
+    def less(self, column: str, value: ConditionValue, condition_mode: str = "and"):
         if type(column) is not str:
             raise TypeError('column should be str')
-        if type(value) is not str:
-            raise TypeError('value should be str')
+        self._check_value('value', value)
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` < '{value}'", condition_mode)
+        self._add_sql(f"`{column}` < ?", (value,), condition_mode)
         return self
 
     def like_start(self, column: str, value: str, condition_mode: str = "and"):
@@ -84,7 +99,7 @@ class SqLiteSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('value should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` like '{value}%'", condition_mode)
+        self._add_sql(f"`{column}` like ?", (f"{value}%",), condition_mode)
         return self
 
     def like_end(self, column: str, value: str, condition_mode: str = "and"):
@@ -94,7 +109,7 @@ class SqLiteSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('value should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` like '%{value}'", condition_mode)
+        self._add_sql(f"`{column}` like ?", (f"%{value}",), condition_mode)
         return self
 
     def like(self, column: str, value: str, condition_mode: str = "and"):
@@ -104,7 +119,7 @@ class SqLiteSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('value should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` like '%{value}%'", condition_mode)
+        self._add_sql(f"`{column}` like ?", (f"%{value}%",), condition_mode)
         return self
 
     def not_like_start(self, column: str, value: str, condition_mode: str = "and"):
@@ -114,7 +129,7 @@ class SqLiteSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('value should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` not like '{value}%'", condition_mode)
+        self._add_sql(f"`{column}` not like ?", (f"{value}%",), condition_mode)
         return self
 
     def not_like_end(self, column: str, value: str, condition_mode: str = "and"):
@@ -124,7 +139,7 @@ class SqLiteSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('value should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` not like '%{value}'", condition_mode)
+        self._add_sql(f"`{column}` not like ?", (f"%{value}",), condition_mode)
         return self
 
     def not_like(self, column: str, value: str, condition_mode: str = "and"):
@@ -134,7 +149,7 @@ class SqLiteSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('value should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"`{column}` not like '%{value}%'", condition_mode)
+        self._add_sql(f"`{column}` not like ?", (f"%{value}%",), condition_mode)
         return self
 
     def in_(self, column: str, value: list, condition_mode: str = "and"):
@@ -146,9 +161,12 @@ class SqLiteSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('condition_mode should be str')
         if type(value) is not list:
             raise TypeError("value must be list")
-        dt = "', '".join(value)
-        sql = "('" + f"{dt}" + "')"
-        self._add_sql(f"`{column}` IN {sql}", condition_mode)
+        if not value:
+            raise ValueError("value should not be empty")
+        for item in value:
+            self._check_value('value item', item)
+        sql = "(" + ", ".join(["?"] * len(value)) + ")"
+        self._add_sql(f"`{column}` IN {sql}", tuple(value), condition_mode)
         return self
 
     def not_in(self, column: str, value: list, condition_mode: str = "and"):
@@ -160,9 +178,12 @@ class SqLiteSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('condition_mode should be str')
         if type(value) is not list:
             raise TypeError("value must be list")
-        dt = "', '".join(value)
-        sql = "('" + f"{dt}" + "')"
-        self._add_sql(f"`{column}` NOT IN {sql}", condition_mode)
+        if not value:
+            raise ValueError("value should not be empty")
+        for item in value:
+            self._check_value('value item', item)
+        sql = "(" + ", ".join(["?"] * len(value)) + ")"
+        self._add_sql(f"`{column}` NOT IN {sql}", tuple(value), condition_mode)
         return self
 
     def is_null(self, column: str, condition_mode: str = "and"):
@@ -170,7 +191,7 @@ class SqLiteSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('column should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"{column} IS NULL", condition_mode)
+        self._add_sql(f"{column} IS NULL", (), condition_mode)
         return self
 
     def is_not_null(self, column: str, condition_mode: str = "and"):
@@ -178,7 +199,7 @@ class SqLiteSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
             raise TypeError('column should be str')
         if type(condition_mode) is not str:
             raise TypeError('condition_mode should be str')
-        self._add_sql(f"{column} IS NOT NULL", condition_mode)
+        self._add_sql(f"{column} IS NOT NULL", (), condition_mode)
         return self
 
     def sort(self, column: str or list, direction: str or list = "ASC"):
@@ -234,9 +255,41 @@ class SqLiteSelectConditionsBuilder(SQLSelectConditionsBuilderBase):
         return self
 
     def limit(self, offset: int, limit: int):
-        if type(offset) is not int:
+        if type(offset) is not int and type(offset) is not Slot:
             raise TypeError('offset should be int')
-        if type(limit) is not int:
+        if type(limit) is not int and type(limit) is not Slot:
             raise TypeError('limit should be int')
-        self.__limit_sql__ = f" LIMIT {limit} OFFSET {offset}"
+        self.__limit_sql__ = " LIMIT ? OFFSET ?"
+        self.__limit_params__ = [limit, offset]
         return self
+
+    def _cursor(self, connect, row_factory: str = "tuple"):
+        # 以游标类设置行格式：连接池返回的游标是包装对象，直接设置row_factory属性不会作用到sqlite3游标上
+        if row_factory in ("row", "dict"):
+            return connect.cursor(_cursor_class(row_factory))
+        return connect.cursor()
+
+
+def _dict_row(cursor, row):
+    """
+    sqlite3的row_factory：将行转换为字段名到值的字典
+    """
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+@functools.lru_cache(maxsize=None)
+def _cursor_class(row_factory: str):
+    """
+    设置了row_factory的sqlite3游标类，第一次使用时才导入sqlite3，其它数据库不会加载sqlite3
+    :param row_factory: row或dict
+    :return: sqlite3.Cursor的子类
+    """
+    import sqlite3
+    factory = sqlite3.Row if row_factory == "row" else _dict_row
+
+    class RowFactoryCursor(sqlite3.Cursor):
+        def __init__(self, connection):
+            super().__init__(connection)
+            self.row_factory = factory
+
+    return RowFactoryCursor
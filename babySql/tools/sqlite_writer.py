@@ -0,0 +1,307 @@
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+from babySql.tools.select.s_sqlite import SqLiteSelectConditionsBuilder
+
+
+class SQLiteWriter:
+    """
+    SQLite单写线程：所有写操作进入队列，由一个专用连接按批执行，每批一个事务（group commit）
+    每个写操作在独立的SAVEPOINT中执行，单个操作失败只回滚该操作，不影响同批的其他操作
+    使用示例：
+        writer = SQLiteWriter("test.db")
+        future = writer.submit("INSERT INTO user (id, name) VALUES (?, ?)", (1, "Rose"), result="lastrowid")
+        future.result()
+        writer.close()
+    """
+    # 关闭写线程的队列标记
+    _STOP = object()
+
+    def __init__(self, database: str, setsession: list = None, max_batch: int = 1000, max_queue: int = 0):
+        """
+        :param database: SQLite数据库文件路径
+        :param setsession: 写连接创建后执行的SQL（如PRAGMA）
+        :param max_batch: 每个事务最多合并的写操作数
+        :param max_queue: 队列最大长度，队列满时submit阻塞；0表示不限制
+        """
+        if type(database) is not str:
+            raise TypeError("database should be str")
+        if database == ":memory:":
+            raise ValueError("writer mode requires a database file, ':memory:' is private to each connection")
+        if type(max_batch) is not int:
+            raise TypeError("max_batch should be int")
+        if max_batch < 1:
+            raise ValueError("max_batch should be greater than 0")
+        if type(max_queue) is not int:
+            raise TypeError("max_queue should be int")
+        self.__database__ = database
+        self.__setsession__ = list(setsession or [])
+        self.__max_batch__ = max_batch
+        self.__queue__ = queue.Queue(max_queue)
+        self.__lock__ = threading.Condition()
+        self.__closed__ = False
+        # 已通过关闭检查、正在放入队列的submit()数，close()等待其归零后再放入停止标记
+        self.__submitting__ = 0
+        self.__stats__ = {
+            "jobs": 0,
+            "failed": 0,
+            "batches": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "max_queue_depth": 0,
+        }
+        # 写连接在写线程中创建，连接建立失败时在这里抛出
+        self.__ready__ = Future()
+        self.__thread__ = threading.Thread(target=self._run, name="babysql-sqlite-writer", daemon=True)
+        self.__thread__.start()
+        self.__ready__.result()
+
+    def submit(self, sql: str, params=(), many: bool = False, result: str = "rowcount",
+               on_commit=None) -> Future:
+        """
+        提交写操作
+        :param sql: SQL
+        :param params: 参数，many为True时为参数列表
+        :param many: 是否使用executemany
+        :param result: Future的结果，"rowcount"为影响行数，"lastrowid"为最后插入的行ID
+        :param on_commit: 事务提交后、Future完成前在写线程中调用的无参函数（如使结果缓存失效）
+        :return: Future，所在事务提交后完成
+        """
+        if type(sql) is not str:
+            raise TypeError("sql should be str")
+        if result not in ("rowcount", "lastrowid"):
+            raise ValueError("result should be 'rowcount' or 'lastrowid'")
+        return self._put(("executemany" if many else "execute", sql, params, result, on_commit))
+
+    def submit_script(self, script: str, on_commit=None) -> Future:
+        """
+        提交SQL脚本，脚本由sqlite3的executescript()执行，不能放在批事务中，在写线程中单独执行
+        （先提交之前合并的写操作），脚本中的语句各自提交，失败时已执行的语句不会回滚
+        :param script: SQL脚本
+        :param on_commit: 脚本执行完成后、Future完成前在写线程中调用的无参函数
+        :return: Future，脚本执行完成后结果为None
+        """
+        if type(script) is not str:
+            raise TypeError("script should be str")
+        return self._put(("executescript", script, None, None, on_commit))
+
+    def _put(self, job: tuple) -> Future:
+        """
+        放入写队列
+        :param job: (执行方法, SQL, 参数, 结果, on_commit)
+        :return: Future
+        """
+        future = Future()
+        with self.__lock__:
+            if self.__closed__:
+                raise RuntimeError("writer is closed")
+            self.__submitting__ += 1
+        # 队列满时put会阻塞，不能持有锁：写线程更新统计时也需要这把锁
+        try:
+            self.__queue__.put(job + (future,))
+        finally:
+            with self.__lock__:
+                self.__submitting__ -= 1
+                depth = self.__queue__.qsize()
+                if depth > self.__stats__["max_queue_depth"]:
+                    self.__stats__["max_queue_depth"] = depth
+                self.__lock__.notify_all()
+        return future
+
+    def stats(self):
+        """
+        写队列统计：提交的写操作数、失败数、事务（批次）数、批大小以及队列深度
+        :return:
+        """
+        with self.__lock__:
+            stats = dict(self.__stats__)
+        stats["queue_depth"] = self.__queue__.qsize()
+        stats["mean_batch_size"] = round(stats["jobs"] / stats["batches"], 3) if stats["batches"] else 0
+        return stats
+
+    def close(self):
+        """
+        停止接收新的写操作，等待队列中的写操作全部提交后关闭写连接
+        :return:
+        """
+        with self.__lock__:
+            if self.__closed__:
+                return
+            self.__closed__ = True
+            # 停止标记必须在所有已接受的写操作之后
+            self.__lock__.wait_for(lambda: self.__submitting__ == 0)
+        self.__queue__.put(self._STOP)
+        self.__thread__.join()
+
+    def _run(self):
+        """
+        写线程主循环：阻塞等待第一个写操作，再取出队列中已有的写操作合并为一个事务
+        :return:
+        """
+        try:
+            # isolation_level=None：由写线程显式控制事务
+            connect = sqlite3.connect(self.__database__, isolation_level=None, check_same_thread=False)
+            for sql in self.__setsession__:
+                connect.execute(sql)
+        except Exception as e:
+            self.__ready__.set_exception(e)
+            return
+        self.__ready__.set_result(True)
+        stop = False
+        try:
+            while not stop:
+                batch = [self.__queue__.get()]
+                while len(batch) < self.__max_batch__:
+                    try:
+                        batch.append(self.__queue__.get_nowait())
+                    except queue.Empty:
+                        break
+                if batch[-1] is self._STOP:
+                    stop = True
+                    batch.pop()
+                group = []
+                for job in batch:
+                    if job[0] != "executescript":
+                        group.append(job)
+                        continue
+                    # 脚本不能在批事务中执行，先提交之前的写操作
+                    if group:
+                        self._execute(connect, group)
+                        group = []
+                    self._execute_script(connect, job)
+                if group:
+                    self._execute(connect, group)
+        finally:
+            connect.close()
+
+    def _execute(self, connect, batch: list):
+        """
+        在一个事务中执行一批写操作
+        :param connect: 写连接
+        :param batch: 写操作列表
+        :return:
+        """
+        cursor = connect.cursor()
+        done = []
+        # 失败的写操作与异常，与成功的写操作一样在更新统计之后再完成Future
+        failures = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for method, sql, params, result, on_commit, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                cursor.execute("SAVEPOINT babysql_job")
+                try:
+                    getattr(cursor, method)(sql, params)
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT babysql_job")
+                    cursor.execute("RELEASE SAVEPOINT babysql_job")
+                    failures.append((future, e))
+                    continue
+                # RELEASE会重置rowcount，需在之前读取结果
+                value = getattr(cursor, result)
+                cursor.execute("RELEASE SAVEPOINT babysql_job")
+                done.append((future, value, on_commit))
+            cursor.execute("COMMIT")
+        except Exception as e:
+            # 事务本身失败（如BEGIN或COMMIT失败），本批所有未完成的写操作都失败
+            if connect.in_transaction:
+                connect.rollback()
+            handled = {future for future, _ in failures}
+            for *_, future in batch:
+                if not future.done() and future not in handled:
+                    failures.append((future, e))
+            done = []
+        finally:
+            cursor.close()
+        self._finish(len(batch), failures, done)
+
+    def _execute_script(self, connect, job: tuple):
+        """
+        单独执行一个SQL脚本
+        :param connect: 写连接
+        :param job: 写操作
+        :return:
+        """
+        _, script, _, _, on_commit, future = job
+        if not future.set_running_or_notify_cancel():
+            self._finish(1, [], [])
+            return
+        try:
+            connect.executescript(script)
+        except Exception as e:
+            # 脚本中显式开启的事务未结束时回滚，避免影响之后的批事务
+            if connect.in_transaction:
+                connect.rollback()
+            self._finish(1, [(future, e)], [])
+        else:
+            self._finish(1, [], [(future, None, on_commit)])
+
+    def _finish(self, size: int, failures: list, done: list):
+        """
+        更新统计后完成本批写操作的Future
+        :param size: 本批写操作数
+        :param failures: 失败的写操作：(Future, 异常)
+        :param done: 成功的写操作：(Future, 结果, on_commit)
+        :return:
+        """
+        with self.__lock__:
+            self.__stats__["jobs"] += size
+            self.__stats__["failed"] += len(failures)
+            self.__stats__["batches"] += 1
+            self.__stats__["last_batch_size"] = size
+            if size > self.__stats__["max_batch_size"]:
+                self.__stats__["max_batch_size"] = size
+        for future, error in failures:
+            future.set_exception(error)
+        for future, value, on_commit in done:
+            if on_commit is not None:
+                try:
+                    on_commit()
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+            future.set_result(value)
+
+
+class SqLiteWriterConditionsBuilder(SqLiteSelectConditionsBuilder):
+    """
+    写队列模式下update/delete返回的条件构建器，run()（包括prepare()后的run()）将语句提交给写线程并返回Future；
+    写语句没有结果集，stream()、pages()、to_columns()等读取结果的方法不可用
+    """
+
+    def __init__(self, head_sql, writer: SQLiteWriter, head_params: tuple = ()):
+        super().__init__(head_sql, None, head_params)
+        self.__writer__ = writer
+
+    def run(self, format: str = "rows"):
+        """
+        提交到写队列
+        :param format: 只支持rows
+        :return: Future，事务提交后结果为影响行数
+        """
+        if format != "rows":
+            raise TypeError("writer mode update/delete only support run() without a result format")
+        sql, params = self._build_sql()
+        return self._execute(sql, params, False)
+
+    def _execute(self, sql: str, params: list, readonly: bool):
+        """
+        提交到写队列，PreparedQuery.run()也经过这里
+        :param sql: SQL语句
+        :param params: 参数列表
+        :param readonly: 不使用，写语句总是提交
+        :return: Future，事务提交后结果为影响行数
+        """
+        cache = self.__cache__
+        # 写操作提交后、Future完成前使相关表的缓存失效
+        on_commit = None if cache is None else lambda: cache.invalidate(self.__cache_tables__)
+        return self.__writer__.submit(sql, params, on_commit=on_commit)
+
+    def _unsupported(self, *args, **kwargs):
+        raise TypeError("writer mode update/delete only support run(), results cannot be streamed or paged")
+
+    # 读取结果的实现（stream()、pages()、to_columns()以及PreparedQuery的对应方法）需要连接池，写队列模式下不可用
+    _stream = _pages = _columns = _unsupported
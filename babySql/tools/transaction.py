@@ -0,0 +1,147 @@
+import contextlib
+import copy
+import itertools
+
+
+class _TransactionConnection:
+    """
+    事务内共享的连接代理，commit、rollback、close与begin由Transaction统一控制，其余属性转发给真实连接
+    """
+    in_transaction = True
+
+    def __init__(self, connect):
+        self._connect = connect
+
+    def cursor(self, *args, **kwargs):
+        return self._connect.cursor(*args, **kwargs)
+
+    def begin(self, *args, **kwargs):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._connect, name)
+
+
+class _TransactionPool:
+    """
+    只包含一个连接的连接池，事务内的所有操作都从这里获取同一个连接
+    """
+
+    def __init__(self, connect):
+        self._connect = _TransactionConnection(connect)
+
+    def connection(self, *args, **kwargs):
+        return self._connect
+
+    def close(self):
+        pass
+
+
+class Transaction:
+    """
+    跨多个操作的事务，事务内的操作共用同一个连接池连接，正常退出时提交一次，出现异常时回滚
+    使用示例：
+        with db.transaction() as tx:
+            tx.insert("user", ["id", "name"], [1, "Rose"])
+            tx.update("user", {"name": "Jack"}).equal("id", 1).run()
+            with tx.savepoint():
+                tx.delete("user").equal("id", 2).run()
+    """
+
+    def __init__(self, db):
+        self.__db__ = db
+        self.__connect__ = None
+        self.__view__ = None
+        self.__savepoint_ids__ = itertools.count(1)
+
+    def __enter__(self):
+        if self.__connect__ is not None:
+            raise RuntimeError("Transaction is already active")
+        connect = self.__db__.__pool__.connection()
+        try:
+            connect.begin()
+        except Exception:
+            connect.close()
+            raise
+        # 复制一个绑定到当前连接的数据库实例，事务内的方法与原实例完全一致
+        view = copy.copy(self.__db__)
+        view.__pool__ = _TransactionPool(connect)
+        # SQLite单写线程模式下，事务内的写操作直接在事务连接上执行，不进入写队列
+        if "__writer__" in view.__dict__:
+            view.__writer__ = None
+        # 读写分离时事务内的查询也使用事务连接（主库）
+        if "__router__" in view.__dict__:
+            view.__router__ = None
+        # 事务内不读写结果缓存（可能读到未提交的数据），提交后清空
+        if "__cache__" in view.__dict__:
+            view.__cache__ = None
+        self.__connect__ = connect
+        self.__view__ = view
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        connect = self.__connect__
+        self.__connect__ = None
+        self.__view__ = None
+        try:
+            if exc_type is None:
+                connect.commit()
+                # 事务提交后开始read-your-writes窗口
+                router = self.__db__.__dict__.get("__router__")
+                if router is not None:
+                    router.mark_write()
+                cache = self.__db__.__dict__.get("__cache__")
+                if cache is not None:
+                    cache.clear()
+            else:
+                connect.rollback()
+        finally:
+            connect.close()
+        return False
+
+    def __getattr__(self, name):
+        view = self.__dict__.get("__view__")
+        if view is None:
+            raise RuntimeError("Transaction is not active, use it inside a with block")
+        return getattr(view, name)
+
+    @contextlib.contextmanager
+    def savepoint(self, name: str = None):
+        """
+        嵌套的保存点，块内出现异常时只回滚到保存点，异常继续向外抛出
+        :param name: 保存点名称，默认自动生成
+        :return:
+        """
+        if self.__connect__ is None:
+            raise RuntimeError("Transaction is not active, use it inside a with block")
+        if name is not None and type(name) is not str:
+            raise TypeError("name should be str")
+        if name is None:
+            name = f"babysql_sp_{next(self.__savepoint_ids__)}"
+        cursor = self.__connect__.cursor()
+        try:
+            cursor.execute(f"SAVEPOINT {name}")
+            try:
+                yield self
+            except BaseException:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+                raise
+            cursor.execute(f"RELEASE SAVEPOINT {name}")
+        finally:
+            cursor.close()
+
+    def transaction(self):
+        """
+        事务内再次开启事务时使用保存点实现嵌套
+        :return:
+        """
+        return self.savepoint()
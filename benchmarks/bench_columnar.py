@@ -0,0 +1,89 @@
+"""
+列式结果基准测试
+
+读取ROWS行×4列（整数、浮点、整数、文本）并得到按列存储的数据，对比：
+    rows_pivot：run()得到行列表后用zip(*rows)转置为列（报表任务的常见写法）
+    to_columns：to_columns()按批直接写入array.array
+    to_columns_numpy：to_columns(kind="numpy")，未安装NumPy时跳过
+记录耗时与tracemalloc统计的峰值内存。
+SQLite 离线运行；MySQL/MariaDB/PostgreSQL 需要设置对应的 BABYSQL_BENCH_* 环境变量，未设置时跳过。
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+from common import execute, report, server_config
+
+ROWS = 200000
+CHUNK = 5000
+
+
+def prepare(db):
+    execute(db, "DROP TABLE IF EXISTS bench_columnar")
+    execute(db, "CREATE TABLE bench_columnar (id INTEGER PRIMARY KEY, score DOUBLE PRECISION, age INTEGER, "
+                "name VARCHAR(64))")
+    for i in range(0, ROWS, CHUNK):
+        db.insert("bench_columnar", ["id", "score", "age", "name"],
+                  [[j, j / 7, j % 90, f"name{j % 1000}"] for j in range(i, i + CHUNK)])
+
+
+def profile(func):
+    """
+    运行一次并统计耗时与峰值内存
+    :param func: 无参可调用对象
+    :return:
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return {"seconds": round(elapsed, 3), "peak_mb": round(peak / 1024 / 1024, 1)}
+
+
+def compare(db):
+    def pivot():
+        rows = db.select("bench_columnar", ["id", "score", "age", "name"]).run()
+        return dict(zip(["id", "score", "age", "name"], (list(column) for column in zip(*rows))))
+
+    results = {
+        "rows_pivot": profile(pivot),
+        "to_columns": profile(lambda: db.select("bench_columnar", ["id", "score", "age", "name"]).to_columns()),
+    }
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        results["to_columns_numpy"] = {"skipped": "numpy is not installed"}
+    else:
+        results["to_columns_numpy"] = profile(
+            lambda: db.select("bench_columnar", ["id", "score", "age", "name"]).to_columns(kind="numpy"))
+    return results
+
+
+def main():
+    from babySql import BabySql
+
+    results = {"rows": ROWS}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = BabySql(dt_type="sqlite", db=os.path.join(tmp, "bench.db"), max_connections=2)
+        prepare(db)
+        results["sqlite"] = compare(db)
+        db.close()
+    for dt_type in ("mysql", "mariadb", "postgresql"):
+        config = server_config(dt_type)
+        if config is None:
+            results[dt_type] = {"skipped": f"BABYSQL_BENCH_{dt_type.upper()} is not set"}
+            continue
+        db = BabySql(dt_type=dt_type, max_connections=2, **config)
+        prepare(db)
+        results[dt_type] = compare(db)
+        execute(db, "DROP TABLE IF EXISTS bench_columnar")
+        db.close()
+    return report("columnar", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+核心路径基准测试
+
+覆盖最常用的执行路径，单位均为微秒/次：
+    insert：单行插入、每次1000行的批量插入（insert_bulk为每次调用的耗时）
+    select：select().equal().run()按索引字段点查
+    page：page()在不同偏移量下的耗时，与相同深度的seek()对比
+    update/delete：按主键的update()/delete()构建器
+    create_table：create_table()...build()建表
+    pool：THREADS个线程争用MAX_CONNECTIONS个连接时每次取出/归还连接的耗时与连接池统计
+SQLite 离线运行；MySQL/MariaDB/PostgreSQL 需要设置对应的 BABYSQL_BENCH_* 环境变量，未设置时跳过。
+"""
+import os
+import tempfile
+import threading
+import time
+
+from common import execute, measure, report, server_config
+
+ROWS = 100000
+BULK = 1000
+PAGE_SIZE = 100
+OFFSETS = (0, 1000, 10000, 90000)
+THREADS = 16
+MAX_CONNECTIONS = 4
+CHECKOUTS = 2000
+# 各数据库建表使用的字段类型参数
+COLUMN_TYPES = {
+    "sqlite": [("id", ("INTEGER",)), ("name", ("TEXT",)), ("age", ("INTEGER",))],
+    "mysql": [("id", ("INT",)), ("name", ("VARCHAR", 64)), ("age", ("INT",))],
+    "mariadb": [("id", ("INT",)), ("name", ("VARCHAR", 64)), ("age", ("INT",))],
+    "postgresql": [("id", ("INTEGER",)), ("name", ("VARCHAR", 64)), ("age", ("INTEGER",))],
+}
+
+
+def prepare(db):
+    execute(db, "DROP TABLE IF EXISTS bench_core")
+    execute(db, "CREATE TABLE bench_core (id INTEGER PRIMARY KEY, name VARCHAR(64), age INTEGER)")
+    execute(db, "CREATE INDEX idx_bench_core_name ON bench_core (name)")
+    for i in range(0, ROWS, BULK):
+        db.insert("bench_core", ["id", "name", "age"], [[j, f"name{j}", j % 90] for j in range(i, i + BULK)])
+
+
+def bench_insert(db):
+    execute(db, "DROP TABLE IF EXISTS bench_core_insert")
+    execute(db, "CREATE TABLE bench_core_insert (id INTEGER PRIMARY KEY, name VARCHAR(64), age INTEGER)")
+    ids = iter(range(10 ** 9))
+
+    def single():
+        i = next(ids)
+        db.insert("bench_core_insert", ["id", "name", "age"], [[i, f"name{i}", i % 90]])
+
+    def bulk():
+        start = next(ids) * BULK + 10 ** 8
+        rows = [[i, f"name{i}", i % 90] for i in range(start, start + BULK)]
+        db.insert("bench_core_insert", ["id", "name", "age"], rows)
+
+    results = {
+        "insert_single": measure(single, number=500),
+        "insert_bulk": measure(bulk, number=10),
+    }
+    execute(db, "DROP TABLE IF EXISTS bench_core_insert")
+    return results
+
+
+def bench_select(db):
+    keys = iter(range(10 ** 9))
+
+    def by_name():
+        db.select("bench_core", ["id", "age"]).equal("name", f"name{next(keys) % ROWS}").run()
+
+    return {"select_equal": measure(by_name, number=2000)}
+
+
+def bench_page(db):
+    results = {}
+    for offset in OFFSETS:
+        last = offset - 1
+        results[f"page_offset_{offset}"] = measure(
+            lambda: db.select("bench_core", ["id", "name"]).sort("id").page(offset // PAGE_SIZE, PAGE_SIZE).run(),
+            number=50)
+        after = {"id": last} if offset else None
+        results[f"seek_offset_{offset}"] = measure(
+            lambda: db.select("bench_core", ["id", "name"]).seek(after, ["id"], PAGE_SIZE).run(), number=50)
+    return results
+
+
+def bench_update_delete(db):
+    keys = iter(range(10 ** 9))
+
+    def update():
+        db.update("bench_core", {"age": 1}).equal("id", next(keys) % ROWS).run()
+
+    # 每次删除一行不同的数据，从表尾开始
+    victims = iter(range(ROWS - 1, -1, -1))
+
+    def delete():
+        db.delete("bench_core").equal("id", next(victims)).run()
+
+    return {
+        "update_equal": measure(update, number=500),
+        "delete_equal": measure(delete, number=500),
+    }
+
+
+def bench_create_table(db, dt_type: str):
+    names = []
+
+    def create():
+        name = f"bench_core_ct_{len(names)}"
+        names.append(name)
+        creator = db.create_table(name)
+        for column, type_args in COLUMN_TYPES[dt_type]:
+            creator.column(column).type(*type_args)
+        creator.add_primary_key(["id"])
+        creator.add_index(["name"])
+        creator.build()
+
+    result = measure(create, number=20, repeat=3)
+    for name in names:
+        execute(db, f"DROP TABLE IF EXISTS {name}")
+    return {"create_table": result}
+
+
+def bench_pool(db):
+    """
+    THREADS个线程各自取出并归还连接CHECKOUTS次
+    :param db: babySql实例，最大连接数为MAX_CONNECTIONS
+    :return: 每次取出+归还的平均耗时（微秒，墙钟时间/总次数）与连接池统计
+    """
+    barrier = threading.Barrier(THREADS + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(CHECKOUTS):
+            connect = db.get_connection()
+            connect.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stats = db.pool_stats()
+    return {
+        "pool_checkout": {
+            "threads": THREADS,
+            "max_connections": MAX_CONNECTIONS,
+            "checkouts": THREADS * CHECKOUTS,
+            "per_checkout_us": round(elapsed / (THREADS * CHECKOUTS) * 1e6, 3),
+            "waits": stats.get("waits"),
+            "wait_seconds_max": stats.get("wait_seconds_max"),
+        }
+    }
+
+
+def run(db, dt_type: str):
+    results = {}
+    results.update(bench_insert(db))
+    prepare(db)
+    results.update(bench_select(db))
+    results.update(bench_page(db))
+    results.update(bench_update_delete(db))
+    results.update(bench_create_table(db, dt_type))
+    execute(db, "DROP TABLE IF EXISTS bench_core")
+    return results
+
+
+def main():
+    from babySql import BabySql
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        db = BabySql(dt_type="sqlite", db=path, max_connections=MAX_CONNECTIONS, blocking=True)
+        results["sqlite"] = run(db, "sqlite")
+        results["sqlite"].update(bench_pool(db))
+        db.close()
+    for dt_type in ("mysql", "mariadb", "postgresql"):
+        config = server_config(dt_type)
+        if config is None:
+            results[dt_type] = {"skipped": f"BABYSQL_BENCH_{dt_type.upper()} is not set"}
+            continue
+        db = BabySql(dt_type=dt_type, max_connections=MAX_CONNECTIONS, blocking=True, **config)
+        results[dt_type] = run(db, dt_type)
+        results[dt_type].update(bench_pool(db))
+        db.close()
+    return report("core", results)
+
+
+if __name__ == "__main__":
+    main()
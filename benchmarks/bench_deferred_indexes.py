@@ -0,0 +1,75 @@
+"""
+延迟创建索引基准测试
+
+对比向带3个二级索引的表批量导入数据时，建表即创建索引（inline）与
+build(defer_indexes=True) 导入后再创建索引（deferred，计入建索引耗时）的总耗时。
+SQLite 离线运行；PostgreSQL 需要设置 BABYSQL_BENCH_POSTGRESQL，并额外对比并行建索引。
+"""
+import os
+import random
+import tempfile
+import time
+
+from common import execute, report, server_config
+
+ROWS = 200000
+CHUNK = 1000
+# 各数据库的字段类型参数
+COLUMN_TYPES = {
+    "sqlite": [("id", ("INTEGER",)), ("name", ("TEXT",)), ("age", ("INTEGER",)), ("score", ("REAL",))],
+    "postgresql": [("id", ("INTEGER",)), ("name", ("VARCHAR", 64)), ("age", ("INTEGER",)),
+                   ("score", ("DOUBLE PRECISION",))],
+}
+
+
+def rows(count: int):
+    rnd = random.Random(0)
+    return [[i, f"name{rnd.randrange(count)}", rnd.randrange(100), rnd.random()] for i in range(count)]
+
+
+def load(db, dt_type: str, data, defer: bool, parallel: int = 1):
+    execute(db, "DROP TABLE IF EXISTS bench_deferred")
+    creator = db.create_table("bench_deferred")
+    for name, type_args in COLUMN_TYPES[dt_type]:
+        creator.column(name).type(*type_args)
+    creator.add_primary_key(["id"])
+    creator.add_index(["name", "age", "score"])
+    start = time.perf_counter()
+    deferred = creator.build(defer_indexes=defer)
+    columns = ["id", "name", "age", "score"]
+    for i in range(0, len(data), CHUNK):
+        db.insert("bench_deferred", columns, data[i:i + CHUNK])
+    if defer:
+        deferred.create_deferred_indexes(parallel=parallel)
+    return round(time.perf_counter() - start, 3)
+
+
+def main():
+    from babySql import BabySql
+
+    data = rows(ROWS)
+    results = {"rows": ROWS}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = BabySql(dt_type="sqlite", db=os.path.join(tmp, "bench.db"), max_connections=4)
+        results["sqlite"] = {
+            "inline_seconds": load(db, "sqlite", data, False),
+            "deferred_seconds": load(db, "sqlite", data, True),
+        }
+        db.close()
+    config = server_config("postgresql")
+    if config is None:
+        results["postgresql"] = {"skipped": "BABYSQL_BENCH_POSTGRESQL is not set"}
+    else:
+        db = BabySql(dt_type="postgresql", max_connections=6, **config)
+        results["postgresql"] = {
+            "inline_seconds": load(db, "postgresql", data, False),
+            "deferred_seconds": load(db, "postgresql", data, True),
+            "deferred_parallel_3_seconds": load(db, "postgresql", data, True, parallel=3),
+        }
+        execute(db, "DROP TABLE IF EXISTS bench_deferred")
+        db.close()
+    return report("deferred_indexes", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+导入耗时基准测试
+
+每个场景在新的解释器中以 python -X importtime 运行，统计 babySql 相关导入的累计耗时（微秒）
+以及导入结束后已加载的数据库驱动，用于跟踪短生命周期任务的启动开销。
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+from common import report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPEAT = 7
+DRIVERS = ("pymysql", "psycopg2", "dbutils", "sqlite3")
+SCENARIOS = {
+    "import babySql": "import babySql",
+    "from babySql import SqLite": "from babySql import SqLite",
+    "BabySql(dt_type='sqlite')": "from babySql import BabySql; BabySql(dt_type='sqlite', db=':memory:')",
+    "from babySql import MySQL": "from babySql import MySQL",
+    "all backends": "from babySql import MySQL, MariaDB, SqLite, PostgreSQL",
+}
+
+
+def run(code: str):
+    probe = f"{code}\nimport sys\nprint(','.join(m for m in {DRIVERS!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    total = 0
+    started = False
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package，只统计顶层导入避免重复计算
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("  "):
+            continue
+        # site及之前的导入属于解释器启动，不计入
+        if not started:
+            started = name.strip() == "site"
+            continue
+        total += int(cumulative)
+    return total, result.stdout.strip()
+
+
+def main():
+    results = {}
+    for name, code in SCENARIOS.items():
+        samples = []
+        drivers = ""
+        for _ in range(REPEAT):
+            total, drivers = run(code)
+            samples.append(total)
+        results[name] = {
+            "best_us": min(samples),
+            "median_us": statistics.median(samples),
+            "drivers": drivers.split(",") if drivers else [],
+        }
+    return report("import_time", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+MySQL/MariaDB 关键字缓存基准测试
+
+对比两种情况下 select(...).run() 的耗时：
+    uncached: 每次查询前清空进程级关键字注册表与实例内缓存的关键字，相当于每次select都获取服务端版本并查询mysql.help_keyword
+    cached:   关键字按服务端版本在进程内缓存、并在实例内保存，select不再额外执行SQL
+未配置数据库时只运行离线的关键字匹配测试（list与frozenset的对比）。
+"""
+from common import measure, report, server_config
+
+from babySql.tools.keywords import MYSQL_KEYWORDS, clear_keywords
+
+COLUMNS = ["id", "name", "age", "order", "desc", "group", "key", "value"]
+
+
+def bench_lookup():
+    keyword_list = sorted(MYSQL_KEYWORDS)
+    return {
+        "list": measure(lambda: [c for c in COLUMNS if c.upper() in keyword_list], number=20000),
+        "frozenset": measure(lambda: [c for c in COLUMNS if c.upper() in MYSQL_KEYWORDS], number=20000),
+    }
+
+
+def bench_select(dt_type: str, config: dict):
+    from babySql import BabySql
+
+    db = BabySql(dt_type=dt_type, max_connections=4, **config)
+    db.user_defined_sql("DROP TABLE IF EXISTS bench_keywords")
+    db.user_defined_sql("CREATE TABLE bench_keywords (id INT PRIMARY KEY, name VARCHAR(32), age INT, "
+                        "`order` INT, `desc` VARCHAR(32), `group` INT, `key` INT, `value` INT)")
+    db.insert("bench_keywords", ["id", "name", "age", "`order`", "`desc`", "`group`", "`key`", "`value`"],
+              [[i, f"name{i}", i, i, "d", i, i, i] for i in range(10)])
+
+    def uncached():
+        # 实例在第一次select时缓存关键字集合，两级缓存都清空才会重新加载
+        clear_keywords()
+        db.__keywords__ = None
+        db.select("bench_keywords", COLUMNS).run()
+
+    def cached():
+        db.select("bench_keywords", COLUMNS).run()
+
+    results = {
+        "uncached": measure(uncached, number=200),
+        "cached": measure(cached, number=200),
+    }
+    db.user_defined_sql("DROP TABLE IF EXISTS bench_keywords")
+    db.close()
+    return results
+
+
+def main():
+    results = {"lookup": bench_lookup()}
+    for dt_type in ("mysql", "mariadb"):
+        config = server_config(dt_type)
+        if config is not None:
+            results[dt_type] = bench_select(dt_type, config)
+    return report("keywords", results)
+
+
+if __name__ == "__main__":
+    main()
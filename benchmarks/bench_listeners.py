@@ -0,0 +1,79 @@
+"""
+语句监听器开销基准测试
+
+主键点查在以下情况下的单次耗时：直接使用sqlite3连接（基线）、babySql未注册监听器、注册一个空监听器、
+注册未达到阈值的SlowQueryLogger。未注册监听器时连接池直接返回原始连接，与引入监听器之前的执行路径相同。
+SQLite 离线运行；MySQL/MariaDB/PostgreSQL 需要设置对应的 BABYSQL_BENCH_* 环境变量，未设置时跳过。
+"""
+import os
+import sqlite3
+import tempfile
+
+from common import execute, measure, report, server_config
+
+ROWS = 1000
+NUMBER = 5000
+
+
+def prepare(db):
+    execute(db, "DROP TABLE IF EXISTS bench_listeners")
+    execute(db, "CREATE TABLE bench_listeners (id INTEGER PRIMARY KEY, name VARCHAR(64))")
+    db.insert("bench_listeners", ["id", "name"], [[i, f"name{i}"] for i in range(ROWS)])
+
+
+def compare(db):
+    from babySql.tools import QueryListener, SlowQueryLogger
+
+    keys = iter(range(10 ** 9))
+
+    def query():
+        db.select("bench_listeners", ["name"]).equal("id", next(keys) % ROWS).run()
+
+    results = {"no_listener": measure(query, number=NUMBER)}
+    listener = QueryListener()
+    db.add_listener(listener)
+    results["noop_listener"] = measure(query, number=NUMBER)
+    db.remove_listener(listener)
+    listener = SlowQueryLogger(threshold=1.0)
+    db.add_listener(listener)
+    results["slow_query_logger"] = measure(query, number=NUMBER)
+    db.remove_listener(listener)
+    return results
+
+
+def main():
+    from babySql import BabySql
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        db = BabySql(dt_type="sqlite", db=path, max_connections=2)
+        prepare(db)
+        raw = sqlite3.connect(path)
+        keys = iter(range(10 ** 9))
+
+        def baseline():
+            cursor = raw.cursor()
+            cursor.execute("SELECT name FROM bench_listeners WHERE (id = ?);", (next(keys) % ROWS,))
+            cursor.fetchall()
+            cursor.close()
+
+        results["sqlite"] = {"raw_sqlite3": measure(baseline, number=NUMBER)}
+        results["sqlite"].update(compare(db))
+        raw.close()
+        db.close()
+    for dt_type in ("mysql", "mariadb", "postgresql"):
+        config = server_config(dt_type)
+        if config is None:
+            results[dt_type] = {"skipped": f"BABYSQL_BENCH_{dt_type.upper()} is not set"}
+            continue
+        db = BabySql(dt_type=dt_type, max_connections=2, **config)
+        prepare(db)
+        results[dt_type] = compare(db)
+        execute(db, "DROP TABLE IF EXISTS bench_listeners")
+        db.close()
+    return report("listeners", results)
+
+
+if __name__ == "__main__":
+    main()
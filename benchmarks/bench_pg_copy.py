@@ -0,0 +1,46 @@
+"""
+PostgreSQL COPY 批量导入基准测试
+
+对比 PostgreSQL.insert（多行VALUES，客户端参数绑定）与 PostgreSQL.copy_insert（COPY ... FROM STDIN）
+导入相同数据的耗时。需要设置 BABYSQL_BENCH_POSTGRESQL，未设置时跳过。
+"""
+import time
+
+from common import execute, report, server_config
+
+ROWS = 100000
+
+
+def rows(count: int):
+    return [[i, f"name{i}", i % 100, i * 0.5] for i in range(count)]
+
+
+def main():
+    config = server_config("postgresql")
+    if config is None:
+        return report("pg_copy", {"skipped": "BABYSQL_BENCH_POSTGRESQL is not set"})
+    from babySql import BabySql
+
+    db = BabySql(dt_type="postgresql", max_connections=2, **config)
+    columns = ["id", "name", "age", "score"]
+    results = {"rows": ROWS}
+    for name in ("insert", "copy_insert"):
+        execute(db, "DROP TABLE IF EXISTS bench_copy")
+        execute(db, "CREATE TABLE bench_copy (id INTEGER PRIMARY KEY, name TEXT, age INTEGER, "
+                            "score DOUBLE PRECISION)")
+        data = rows(ROWS)
+        start = time.perf_counter()
+        if name == "insert":
+            for i in range(0, ROWS, 1000):
+                db.insert("bench_copy", columns, data[i:i + 1000])
+        else:
+            db.copy_insert("bench_copy", columns, data)
+        elapsed = time.perf_counter() - start
+        results[name] = {"seconds": round(elapsed, 3), "rows_per_second": round(ROWS / elapsed)}
+    execute(db, "DROP TABLE IF EXISTS bench_copy")
+    db.close()
+    return report("pg_copy", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+预编译查询基准测试
+
+对比每次调用都构建条件链（select().equal().greater().sort().limit()）与 PreparedQuery 绑定命名占位符
+的Python开销（不访问数据库），以及在SQLite上端到端执行的单次耗时。
+"""
+import os
+import tempfile
+
+from common import measure, report
+
+from babySql.tools import Slot
+
+ROWS = 1000
+
+
+def main():
+    from babySql import BabySql
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = BabySql(dt_type="sqlite", db=os.path.join(tmp, "bench.db"), max_connections=2)
+        db.user_defined_sql("CREATE TABLE bench_prepared (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)")
+        db.insert("bench_prepared", ["id", "name", "age"], [[i, f"name{i}", i % 90] for i in range(ROWS)])
+
+        def chain():
+            return db.select("bench_prepared", ["id", "name"]).equal("name", "name10").greater("age", 5) \
+                .sort("id").limit(0, 10)
+
+        query = db.select("bench_prepared", ["id", "name"]).equal("name", Slot("name")) \
+            .greater("age", Slot("age")).sort("id").limit(0, 10).prepare()
+        results = {
+            "overhead": {
+                "builder": measure(lambda: chain()._build_sql(), number=20000),
+                "prepared": measure(lambda: query._bind({"name": "name10", "age": 5}), number=20000),
+            },
+            "sqlite_run": {
+                "builder": measure(lambda: chain().run(), number=5000),
+                "prepared": measure(lambda: query.run(name="name10", age=5), number=5000),
+            },
+        }
+        db.close()
+    return report("prepared", results)
+
+
+if __name__ == "__main__":
+    main()
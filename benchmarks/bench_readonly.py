@@ -0,0 +1,61 @@
+"""
+只读查询免提交基准测试
+
+对比主键点查在只读路径（默认，SELECT不再提交，PostgreSQL切换为autocommit执行）与
+.readonly(False)（旧行为，每次查询后COMMIT）下的单次耗时。
+SQLite 离线运行；MySQL/MariaDB/PostgreSQL 需要设置对应的 BABYSQL_BENCH_* 环境变量，未设置时跳过。
+"""
+import os
+import tempfile
+
+from common import execute, measure, report, server_config
+
+ROWS = 1000
+NUMBER = 2000
+
+
+def prepare(db, dt_type: str):
+    execute(db, "DROP TABLE IF EXISTS bench_readonly")
+    execute(db, "CREATE TABLE bench_readonly (id INTEGER PRIMARY KEY, name VARCHAR(64))")
+    db.insert("bench_readonly", ["id", "name"], [[i, f"name{i}"] for i in range(ROWS)])
+
+
+def compare(db):
+    keys = iter(range(10 ** 9))
+
+    def readonly():
+        db.select("bench_readonly", ["name"]).equal("id", next(keys) % ROWS).run()
+
+    def commit():
+        db.select("bench_readonly", ["name"]).equal("id", next(keys) % ROWS).readonly(False).run()
+
+    return {
+        "readonly": measure(readonly, number=NUMBER),
+        "commit": measure(commit, number=NUMBER),
+    }
+
+
+def main():
+    from babySql import BabySql
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = BabySql(dt_type="sqlite", db=os.path.join(tmp, "bench.db"), max_connections=2)
+        prepare(db, "sqlite")
+        results["sqlite"] = compare(db)
+        db.close()
+    for dt_type in ("mysql", "mariadb", "postgresql"):
+        config = server_config(dt_type)
+        if config is None:
+            results[dt_type] = {"skipped": f"BABYSQL_BENCH_{dt_type.upper()} is not set"}
+            continue
+        db = BabySql(dt_type=dt_type, max_connections=2, **config)
+        prepare(db, dt_type)
+        results[dt_type] = compare(db)
+        execute(db, "DROP TABLE IF EXISTS bench_readonly")
+        db.close()
+    return report("readonly", results)
+
+
+if __name__ == "__main__":
+    main()
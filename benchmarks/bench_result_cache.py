@@ -0,0 +1,62 @@
+"""
+结果缓存基准测试
+
+对比小型字典表按编码查询在不使用缓存与cache()命中缓存时的单次耗时，并输出缓存统计。
+SQLite 离线运行；MySQL/MariaDB/PostgreSQL 需要设置对应的 BABYSQL_BENCH_* 环境变量，未设置时跳过。
+"""
+import os
+import tempfile
+
+from common import execute, measure, report, server_config
+
+ROWS = 200
+NUMBER = 5000
+
+
+def prepare(db):
+    execute(db, "DROP TABLE IF EXISTS bench_cache")
+    execute(db, "CREATE TABLE bench_cache (id INTEGER PRIMARY KEY, code VARCHAR(16), name VARCHAR(64))")
+    db.insert("bench_cache", ["id", "code", "name"], [[i, f"C{i}", f"name{i}"] for i in range(ROWS)])
+
+
+def compare(db):
+    keys = iter(range(10 ** 9))
+
+    def uncached():
+        db.select("bench_cache", ["id", "name"]).equal("code", f"C{next(keys) % ROWS}").run()
+
+    def cached():
+        db.select("bench_cache", ["id", "name"]).equal("code", f"C{next(keys) % ROWS}").cache().run()
+
+    results = {
+        "uncached": measure(uncached, number=NUMBER),
+        "cached": measure(cached, number=NUMBER),
+    }
+    results["cache_stats"] = db.cache_stats()
+    return results
+
+
+def main():
+    from babySql import BabySql
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = BabySql(dt_type="sqlite", db=os.path.join(tmp, "bench.db"), max_connections=2, result_cache=ROWS)
+        prepare(db)
+        results["sqlite"] = compare(db)
+        db.close()
+    for dt_type in ("mysql", "mariadb", "postgresql"):
+        config = server_config(dt_type)
+        if config is None:
+            results[dt_type] = {"skipped": f"BABYSQL_BENCH_{dt_type.upper()} is not set"}
+            continue
+        db = BabySql(dt_type=dt_type, max_connections=2, result_cache=ROWS, **config)
+        prepare(db)
+        results[dt_type] = compare(db)
+        execute(db, "DROP TABLE IF EXISTS bench_cache")
+        db.close()
+    return report("result_cache", results)
+
+
+if __name__ == "__main__":
+    main()
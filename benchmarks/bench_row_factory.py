@@ -0,0 +1,96 @@
+"""
+行格式基准测试
+
+读取ROWS行×4列，对比各行格式下run()的耗时与执行期间的峰值内存（tracemalloc统计）：
+    tuple：驱动返回的元组（基线）
+    dict_wrap：取得元组后按cursor.description逐行构造dict（调用方自行包装的常见写法）
+    named：row_factory="named"，同一查询结构共用一个元组子类
+    dict：row_factory="dict"（SQLite为row_factory函数，MySQL/MariaDB为DictCursor，PostgreSQL为RealDictCursor）
+    row：row_factory="row"，sqlite3.Row，仅SQLite
+SQLite 离线运行；MySQL/MariaDB/PostgreSQL 需要设置对应的 BABYSQL_BENCH_* 环境变量，未设置时跳过。
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+from common import execute, report, server_config
+
+ROWS = 200000
+CHUNK = 5000
+COLUMNS = ["id", "score", "age", "name"]
+
+
+def prepare(db):
+    execute(db, "DROP TABLE IF EXISTS bench_rows")
+    execute(db, "CREATE TABLE bench_rows (id INTEGER PRIMARY KEY, score DOUBLE PRECISION, age INTEGER, "
+                "name VARCHAR(64))")
+    for i in range(0, ROWS, CHUNK):
+        db.insert("bench_rows", COLUMNS, [[j, j / 7, j % 90, f"name{j % 1000}"] for j in range(i, i + CHUNK)])
+
+
+def profile(func, repeat: int = 3):
+    """
+    统计耗时（repeat次中最快的一次，不开启tracemalloc）与结果的峰值内存
+    :param func: 无参可调用对象
+    :param repeat: 计时次数
+    :return:
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+        del result
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return {"seconds": round(min(samples), 3), "peak_mb": round(peak / 1024 / 1024, 1)}
+
+
+def compare(make_db, factories: tuple):
+    """
+    :param make_db: 以row_factory为参数创建babySql实例的函数
+    :param factories: 要对比的行格式
+    :return:
+    """
+    results = {}
+    db = make_db("tuple")
+    prepare(db)
+    results["tuple"] = profile(lambda: db.select("bench_rows", COLUMNS).run())
+    results["dict_wrap"] = profile(lambda: [dict(zip(COLUMNS, row)) for row in db.select("bench_rows", COLUMNS).run()])
+    db.close()
+    for row_factory in factories:
+        db = make_db(row_factory)
+        results[row_factory] = profile(lambda: db.select("bench_rows", COLUMNS).run())
+        db.close()
+    db = make_db("tuple")
+    execute(db, "DROP TABLE IF EXISTS bench_rows")
+    db.close()
+    return results
+
+
+def main():
+    from babySql import BabySql
+
+    results = {"rows": ROWS}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        results["sqlite"] = compare(
+            lambda row_factory: BabySql(dt_type="sqlite", db=path, max_connections=2, row_factory=row_factory),
+            ("named", "dict", "row"))
+    for dt_type in ("mysql", "mariadb", "postgresql"):
+        config = server_config(dt_type)
+        if config is None:
+            results[dt_type] = {"skipped": f"BABYSQL_BENCH_{dt_type.upper()} is not set"}
+            continue
+        results[dt_type] = compare(
+            lambda row_factory: BabySql(dt_type=dt_type, max_connections=2, row_factory=row_factory, **config),
+            ("named", "dict"))
+    return report("row_factory", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+SQLite PRAGMA配置并发读写基准测试
+
+多个读线程持续执行主键点查，同时多个写线程持续插入小批量数据，
+对比默认配置（回滚日志）与 profile="throughput"（WAL等）在相同时间内完成的读写次数
+以及 "database is locked" 错误数。
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from common import report
+
+ROWS = 10000
+READERS = 4
+WRITERS = 2
+SECONDS = 3.0
+
+
+def run(profile):
+    from babySql import BabySql
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = BabySql(dt_type="sqlite", db=os.path.join(tmp, "bench.db"), max_connections=READERS + WRITERS + 1,
+                     profile=profile)
+        db.user_defined_sql("CREATE TABLE bench_profile (id INTEGER PRIMARY KEY, name TEXT)")
+        db.insert("bench_profile", ["id", "name"], [[i, f"name{i}"] for i in range(ROWS)])
+        counters = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def count(name):
+            with lock:
+                counters[name] += 1
+
+        def reader(seed):
+            key = seed
+            while not stop.is_set():
+                key = (key * 7919 + 1) % ROWS
+                try:
+                    db.select("bench_profile", ["name"]).equal("id", key).run()
+                    count("reads")
+                except sqlite3.OperationalError:
+                    count("locked")
+
+        def writer(seed):
+            key = ROWS + seed * 10 ** 7
+            while not stop.is_set():
+                try:
+                    db.insert("bench_profile", ["id", "name"], [[key + i, "new"] for i in range(10)])
+                    count("writes")
+                except sqlite3.OperationalError:
+                    count("locked")
+                key += 10
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(READERS)]
+        threads += [threading.Thread(target=writer, args=(i,)) for i in range(WRITERS)]
+        for thread in threads:
+            thread.start()
+        time.sleep(SECONDS)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        db.close()
+    return {
+        "reads_per_second": round(counters["reads"] / SECONDS),
+        "writes_per_second": round(counters["writes"] / SECONDS),
+        "locked_errors": counters["locked"],
+    }
+
+
+def main():
+    return report("sqlite_profile", {
+        "readers": READERS,
+        "writers": WRITERS,
+        "seconds": SECONDS,
+        "default": run(None),
+        "throughput": run("throughput"),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+SQLite单写线程基准测试
+
+多个线程各自逐条插入数据（每次插入等待提交完成），对比连接池直接写入与 writer=True
+（写队列合并提交）在相同时间内完成的写入数、"database is locked" 错误数以及写队列的批大小。
+两种模式都使用 profile="throughput"，并分别在 synchronous=NORMAL 与 synchronous=FULL（每次提交fsync）下运行。
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from common import report
+
+THREADS = 8
+SECONDS = 3.0
+
+
+def run(writer: bool, synchronous: str):
+    from babySql import BabySql
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = BabySql(dt_type="sqlite", db=os.path.join(tmp, "bench.db"), max_connections=THREADS + 1,
+                     profile="throughput", pragmas={"synchronous": synchronous}, writer=writer)
+        db.user_defined_sql("CREATE TABLE bench_writer (id INTEGER PRIMARY KEY, name TEXT)")
+        counters = {"writes": 0, "locked": 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def worker(seed):
+            key = seed * 10 ** 7
+            writes = locked = 0
+            while not stop.is_set():
+                key += 1
+                try:
+                    result = db.insert("bench_writer", ["id", "name"], [key, "name"])
+                    if writer:
+                        result.result()
+                    writes += 1
+                except sqlite3.OperationalError:
+                    locked += 1
+            with lock:
+                counters["writes"] += writes
+                counters["locked"] += locked
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        time.sleep(SECONDS)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        stats = db.writer_stats()
+        db.close()
+    result = {"writes_per_second": round(counters["writes"] / SECONDS), "locked_errors": counters["locked"]}
+    if stats is not None:
+        result["transactions"] = stats["batches"]
+        result["mean_batch_size"] = stats["mean_batch_size"]
+        result["max_batch_size"] = stats["max_batch_size"]
+        result["max_queue_depth"] = stats["max_queue_depth"]
+    return result
+
+
+def main():
+    return report("sqlite_writer", {
+        "threads": THREADS,
+        "seconds": SECONDS,
+        "synchronous_normal": {"pool": run(False, "NORMAL"), "writer": run(True, "NORMAL")},
+        "synchronous_full": {"pool": run(False, "FULL"), "writer": run(True, "FULL")},
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+SQLite 语句缓存命中率基准测试
+
+sqlite3 模块为每个连接维护一个按SQL文本索引的预编译语句LRU缓存（cached_statements，默认128）。
+对比两种SQL形式在相同查询序列下的缓存命中率与耗时：
+    inline:        值直接拼接进SQL文本（参数化之前构建器的做法），每个不同的值都是一条新SQL
+    parameterized: 构建器生成的占位符SQL，SQL文本只与查询结构有关
+命中率按与sqlite3相同容量的LRU模型计算。
+"""
+import random
+import sqlite3
+from collections import OrderedDict
+
+from common import measure, report
+
+from babySql.tools import SqLiteSelectConditionsBuilder
+
+ROWS = 10000
+QUERIES = 2000
+CACHE_SIZE = 128
+
+
+def hit_rate(sqls, size: int = CACHE_SIZE):
+    cache = OrderedDict()
+    hits = 0
+    for sql in sqls:
+        if sql in cache:
+            hits += 1
+            cache.move_to_end(sql)
+        else:
+            cache[sql] = True
+            if len(cache) > size:
+                cache.popitem(last=False)
+    return round(hits / len(sqls), 4)
+
+
+def main():
+    conn = sqlite3.connect(":memory:", cached_statements=CACHE_SIZE)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)")
+    conn.execute("CREATE INDEX idx_t_name ON t (name)")
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?)", [(i, f"name{i}", i % 90) for i in range(ROWS)])
+    conn.commit()
+    rnd = random.Random(0)
+    names = [f"name{rnd.randrange(ROWS)}" for _ in range(QUERIES)]
+
+    inline = [f"SELECT * FROM t WHERE (`name` = '{name}');" for name in names]
+    parameterized = []
+    for name in names:
+        builder = SqLiteSelectConditionsBuilder("SELECT * FROM t", None).equal("name", name)
+        parameterized.append(builder._build_sql())
+
+    def run_inline():
+        for sql in inline:
+            conn.execute(sql).fetchall()
+
+    def run_parameterized():
+        for sql, params in parameterized:
+            conn.execute(sql, params).fetchall()
+
+    inline_time = measure(run_inline, number=1, repeat=5)
+    parameterized_time = measure(run_parameterized, number=1, repeat=5)
+    conn.close()
+    return report("statement_cache", {
+        "queries": QUERIES,
+        "cache_size": CACHE_SIZE,
+        "inline": {
+            "distinct_sql": len(set(inline)),
+            "hit_rate": hit_rate(inline),
+            "per_query_us": round(inline_time["median_us"] / QUERIES, 3),
+        },
+        "parameterized": {
+            "distinct_sql": len(set(sql for sql, _ in parameterized)),
+            "hit_rate": hit_rate([sql for sql, _ in parameterized]),
+            "per_query_us": round(parameterized_time["median_us"] / QUERIES, 3),
+        },
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+连接池预热基准测试
+
+启动后立即由CONCURRENCY个线程同时发起一次主键点查，统计这一批请求的p50/p99耗时：
+cold为惰性建立连接（默认），warm为warm=CONCURRENCY（启动时并行预热与并发数相同的连接），steady为同一连接池已经运行一段时间后的同一批请求。
+SQLite 离线运行（建立连接只有打开文件与执行PRAGMA的开销，差距远小于需要TCP/认证的服务器）；
+MySQL/MariaDB/PostgreSQL 需要设置对应的 BABYSQL_BENCH_* 环境变量，未设置时跳过。
+"""
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from common import execute, report, server_config
+
+ROWS = 1000
+CONCURRENCY = 16
+
+
+def prepare(db):
+    execute(db, "DROP TABLE IF EXISTS bench_warmup")
+    execute(db, "CREATE TABLE bench_warmup (id INTEGER PRIMARY KEY, name VARCHAR(64))")
+    db.insert("bench_warmup", ["id", "name"], [[i, f"name{i}"] for i in range(ROWS)])
+
+
+def burst(db):
+    """
+    CONCURRENCY个线程同时执行一次查询
+    :param db: babySql实例
+    :return: 耗时统计（毫秒）
+    """
+    barrier = threading.Barrier(CONCURRENCY)
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(i):
+        barrier.wait()
+        start = time.perf_counter()
+        db.select("bench_warmup", ["name"]).equal("id", i % ROWS).run()
+        with lock:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(CONCURRENCY)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3),
+    }
+
+
+def compare(open_db):
+    results = {}
+    db = open_db(False)
+    results["cold"] = burst(db)
+    for _ in range(10):
+        burst(db)
+    results["steady"] = burst(db)
+    db.close()
+    start = time.perf_counter()
+    db = open_db(CONCURRENCY)
+    results["warm_startup_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    results["warm"] = burst(db)
+    db.close()
+    return results
+
+
+def main():
+    from babySql import BabySql
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        db = BabySql(dt_type="sqlite", db=path)
+        prepare(db)
+        db.close()
+        results["sqlite"] = compare(lambda warm: BabySql(dt_type="sqlite", db=path, max_connections=CONCURRENCY,
+                                                         profile="throughput", blocking=True, warm=warm))
+    for dt_type in ("mysql", "mariadb", "postgresql"):
+        config = server_config(dt_type)
+        if config is None:
+            results[dt_type] = {"skipped": f"BABYSQL_BENCH_{dt_type.upper()} is not set"}
+            continue
+        db = BabySql(dt_type=dt_type, **config)
+        prepare(db)
+        db.close()
+        results[dt_type] = compare(lambda warm: BabySql(dt_type=dt_type, max_connections=CONCURRENCY,
+                                                        blocking=True, warm=warm, **config))
+        db = BabySql(dt_type=dt_type, **config)
+        execute(db, "DROP TABLE IF EXISTS bench_warmup")
+        db.close()
+    return report("warmup", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+基准测试公共工具
+
+MySQL/MariaDB/PostgreSQL 的基准测试通过环境变量提供连接参数，未设置时自动跳过：
+    BABYSQL_BENCH_MYSQL="host=127.0.0.1 port=3306 user=root passwd=root123 db=test"
+    BABYSQL_BENCH_MARIADB="host=127.0.0.1 port=3307 user=root passwd=root123 db=test"
+    BABYSQL_BENCH_POSTGRESQL="host=127.0.0.1 port=5432 user=postgres passwd=postgres db=test"
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def server_config(dt_type: str):
+    """
+    读取数据库连接参数
+    :param dt_type: 数据库类型
+    :return: 连接参数字典，未配置时返回None
+    """
+    raw = os.environ.get(f"BABYSQL_BENCH_{dt_type.upper()}")
+    if not raw:
+        return None
+    config = dict(item.split("=", 1) for item in raw.split())
+    if "port" in config:
+        config["port"] = int(config["port"])
+    return config
+
+
+def execute(db, sql: str):
+    """
+    在新的连接上执行不返回结果集的SQL（DDL等）
+    :param db: babySql实例
+    :param sql: SQL
+    :return:
+    """
+    connect = db.get_connection()
+    cursor = connect.cursor()
+    cursor.execute(sql)
+    connect.commit()
+    cursor.close()
+    connect.close()
+
+
+def measure(func, number: int = 1000, repeat: int = 5):
+    """
+    计时函数，返回单次调用耗时统计（微秒）
+    :param func: 无参可调用对象
+    :param number: 每轮调用次数
+    :param repeat: 轮数
+    :return:
+    """
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+    return {
+        "number": number,
+        "repeat": repeat,
+        "best_us": round(min(samples), 3),
+        "median_us": round(statistics.median(samples), 3),
+    }
+
+
+def report(name: str, results: dict):
+    """
+    以JSON格式输出基准测试结果
+    :param name: 基准测试名称
+    :param results: 结果
+    :return:
+    """
+    print(json.dumps({"benchmark": name, "results": results}, ensure_ascii=False, indent=2))
+    return results
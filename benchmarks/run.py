@@ -0,0 +1,128 @@
+"""
+运行基准测试并将结果保存为JSON，可与之前保存的结果对比，找出变慢的项目
+
+    python benchmarks/run.py                                  # 运行全部 bench_*.py
+    python benchmarks/run.py core prepared -o new.json        # 只运行bench_core.py与bench_prepared.py
+    python benchmarks/run.py core -o new.json --compare old.json --threshold 0.1
+
+对比时比较两份结果中路径相同的median_us（以及pool_checkout的per_checkout_us），
+变慢超过threshold（默认10%）的项目会被列出，且进程以状态码1退出，便于在CI中使用。
+"""
+import argparse
+import contextlib
+import datetime
+import importlib
+import io
+import json
+import os
+import platform
+import sys
+
+import common  # noqa: F401  将仓库目录加入sys.path
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+# 参与对比的指标，数值越小越好
+METRICS = ("median_us", "per_checkout_us")
+
+
+def discover():
+    """
+    列出benchmarks目录下的所有基准测试
+    :return: 名称列表（去掉bench_前缀与.py后缀）
+    """
+    return sorted(name[6:-3] for name in os.listdir(BENCH_DIR) if name.startswith("bench_") and name.endswith(".py"))
+
+
+def run(names: list):
+    """
+    依次运行基准测试，各测试自己的输出被丢弃，只收集main()的返回值
+    :param names: 基准测试名称
+    :return: {名称: 结果}
+    """
+    results = {}
+    for name in names:
+        print(f"running {name} ...", file=sys.stderr)
+        module = importlib.import_module(f"bench_{name}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = module.main()
+    return results
+
+
+def flatten(results, prefix: str = ""):
+    """
+    取出结果中所有参与对比的指标
+    :param results: 结果
+    :param prefix: 路径前缀
+    :return: {"core/sqlite/select_equal/median_us": 32.8, ...}
+    """
+    values = {}
+    if isinstance(results, dict):
+        for key, value in results.items():
+            path = f"{prefix}/{key}" if prefix else str(key)
+            if key in METRICS and type(value) in (int, float):
+                values[path] = value
+            else:
+                values.update(flatten(value, path))
+    return values
+
+
+def compare(old: dict, new: dict, threshold: float):
+    """
+    对比两份结果
+    :param old: 基线结果文件内容
+    :param new: 新结果文件内容
+    :param threshold: 允许的变慢比例
+    :return: 变慢的项目列表
+    """
+    before = flatten(old["benchmarks"])
+    after = flatten(new["benchmarks"])
+    regressions = []
+    for path in sorted(before.keys() & after.keys()):
+        if before[path] <= 0:
+            continue
+        change = after[path] / before[path] - 1
+        if change > threshold:
+            regressions.append({"metric": path, "before": before[path], "after": after[path],
+                                "change_percent": round(change * 100, 1)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run babySql benchmarks")
+    parser.add_argument("names", nargs="*", help="benchmarks to run, default all: " + ", ".join(discover()))
+    parser.add_argument("-o", "--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file written by a previous run")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown ratio, default 0.1")
+    args = parser.parse_args()
+    names = args.names or discover()
+    unknown = set(names) - set(discover())
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    from babySql import BabySql  # noqa: F401  导入失败时尽早报错
+
+    output = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": run(names),
+    }
+    text = json.dumps(output, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, output, args.threshold)
+        for item in regressions:
+            print(f"REGRESSION {item['metric']}: {item['before']} -> {item['after']} (+{item['change_percent']}%)",
+                  file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("no regressions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
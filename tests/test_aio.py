@@ -0,0 +1,35 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from babySql.aio import AsyncBabySql
+
+
+class AsyncQueryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = AsyncBabySql(dt_type="sqlite", db=os.path.join(self.tmp.name, "test.db"), max_connections=2)
+
+    def tearDown(self):
+        asyncio.run(self.db.close())
+        self.tmp.cleanup()
+
+    def test_unknown_method_fails_at_call_site(self):
+        with self.assertRaises(AttributeError):
+            self.db.select("t").equl("id", 1)
+        with self.assertRaises(AttributeError):
+            self.db.update("t", {"name": "Jack"}).wher("id", 1)
+
+    def test_run(self):
+        async def main():
+            await self.db.user_defined_sql("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+            await self.db.insert("t", ["id", "name"], [[1, "Rose"], [2, "Jack"]])
+            await self.db.update("t", {"name": "Lily"}).equal("id", 2).run()
+            return await self.db.select("t", ["id", "name"]).greater("id", 0).sort("id").run()
+
+        self.assertEqual(asyncio.run(main()), [(1, "Rose"), (2, "Lily")])
+
+
+if __name__ == "__main__":
+    unittest.main()
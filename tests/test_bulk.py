@@ -0,0 +1,25 @@
+import datetime
+import unittest
+
+from babySql.tools.bulk import copy_csv_value
+
+
+class CopyCsvValueTest(unittest.TestCase):
+    def test_array_literal(self):
+        self.assertEqual(copy_csv_value([1, 2, None]), '"{1,2,NULL}"')
+        self.assertEqual(copy_csv_value([]), '"{}"')
+        self.assertEqual(copy_csv_value([[1, 2], [3, 4]]), '"{{1,2},{3,4}}"')
+        self.assertEqual(copy_csv_value([True, 1.5]), '"{t,1.5}"')
+
+    def test_array_text_elements(self):
+        # 元素中的引号与反斜杠先按数组语法转义，整个字段再按CSV规则加引号
+        self.assertEqual(copy_csv_value(["a", 'b"c', "d\\e", "NULL", ""]),
+                         '"{""a"",""b\\""c"",""d\\\\e"",""NULL"",""""}"')
+        self.assertEqual(copy_csv_value([datetime.date(2024, 1, 2)]), '"{""2024-01-02""}"')
+
+    def test_dict_is_json(self):
+        self.assertEqual(copy_csv_value({"a": [1]}), '"{""a"": [1]}"')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import time
+import unittest
+
+from babySql import BabySql
+from babySql.tools.cache import ResultCache
+
+
+class ResultCacheTest(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = ResultCache(max_size=2)
+        cache.set("a", [1], ("t",))
+        cache.set("b", [2], ("t",))
+        self.assertEqual(cache.get("a"), (True, [1]))
+        # b最久未使用，被淘汰
+        cache.set("c", [3], ("t",))
+        self.assertEqual(cache.get("b"), (False, None))
+        self.assertEqual(cache.get("a"), (True, [1]))
+        self.assertEqual(cache.get("c"), (True, [3]))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"], stats["size"]), (3, 1, 1, 2))
+        self.assertEqual(stats["hit_rate"], 0.75)
+
+    def test_ttl(self):
+        cache = ResultCache(ttl=0.05)
+        cache.set("a", [1], ("t",))
+        cache.set("b", [2], ("t",), ttl=10)
+        self.assertEqual(cache.get("a"), (True, [1]))
+        time.sleep(0.06)
+        self.assertEqual(cache.get("a"), (False, None))
+        self.assertEqual(cache.get("b"), (True, [2]))
+        stats = cache.stats()
+        self.assertEqual((stats["expirations"], stats["size"]), (1, 1))
+        self.assertRaises(ValueError, ResultCache, ttl=0)
+
+    def test_invalidate_by_table(self):
+        cache = ResultCache()
+        cache.set("a", [1], ("user",))
+        cache.set("b", [2], ("`Order`",))
+        cache.set("c", [3], ("user", "order"))
+        # 表名去掉引号并忽略大小写
+        self.assertEqual(cache.invalidate(['"ORDER"']), 2)
+        self.assertEqual(cache.get("a"), (True, [1]))
+        self.assertEqual(cache.get("b"), (False, None))
+        self.assertEqual(cache.get("c"), (False, None))
+        self.assertEqual(cache.invalidate(["user"]), 1)
+        self.assertEqual(cache.stats()["invalidations"], 3)
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_stale_result_is_not_stored(self):
+        cache = ResultCache()
+        generation = cache.generation(("user",))
+        # 查询执行期间表被修改，结果可能是旧数据
+        cache.invalidate(["user"])
+        self.assertFalse(cache.set("a", [1], ("user",), generation=generation))
+        self.assertEqual(cache.get("a"), (False, None))
+        # 其他表失效不影响
+        generation = cache.generation(("user",))
+        cache.invalidate(["order"])
+        self.assertTrue(cache.set("a", [1], ("user",), generation=generation))
+        # clear()使所有正在执行的查询的结果都不缓存
+        generation = cache.generation(("order",))
+        cache.clear()
+        self.assertFalse(cache.set("b", [2], ("order",), generation=generation))
+        self.assertEqual(cache.stats()["stale"], 2)
+
+
+class QueryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = BabySql(dt_type="sqlite", db=os.path.join(self.tmp.name, "test.db"), max_connections=2,
+                          result_cache=16)
+        self.db.user_defined_sql("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        self.db.insert("t", ["id", "name"], [[1, "Rose"], [2, "Jack"]])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_write_invalidates(self):
+        query = self.db.select("t", ["name"]).equal("id", 1).cache()
+        self.assertEqual(query.run(), [("Rose",)])
+        self.assertEqual(query.run(), [("Rose",)])
+        self.assertEqual(self.db.cache_stats()["hits"], 1)
+        self.db.update("t", {"name": "Lily"}).equal("id", 1).run()
+        self.assertEqual(self.db.select("t", ["name"]).equal("id", 1).cache().run(), [("Lily",)])
+        # 未调用cache()的查询不使用缓存
+        self.db.select("t").run()
+        self.assertEqual(self.db.cache_stats()["misses"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
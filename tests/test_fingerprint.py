@@ -0,0 +1,71 @@
+import logging
+import threading
+import unittest
+
+from babySql.tools.fingerprint import QueryStats, fingerprint
+
+
+class FingerprintTest(unittest.TestCase):
+    def test_literals(self):
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'Rose'"),
+                         "select * from t where id in (?+) and name = ?")
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE a = $1 AND b = ? -- note"),
+                         "select * from t where a = ? and b = ?")
+
+    def test_negative_numbers(self):
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE a = -5"), fingerprint("SELECT * FROM t WHERE a = 5"))
+        self.assertEqual(fingerprint("SELECT -1.5, (-2), x IN (-3, 4)"), "select ?, (?), x in (?+)")
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE a > - 5 AND b < -6"),
+                         "select * from t where a > ? and b < ?")
+        # 二元减号保留
+        self.assertEqual(fingerprint("SELECT a - 1, b-2, (c) - 3, 4 - -5 FROM t"),
+                         "select a - ?, b-?, (c) - ?, ? - ? from t")
+
+    def test_dollar_quoted_strings(self):
+        self.assertEqual(fingerprint("SELECT $$it's -- not a comment$$, $fn$ body $$ inner $$ $fn$ FROM t"),
+                         "select ?, ? from t")
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE a = $1 AND b = $2"),
+                         "select * from t where a = ? and b = ?")
+
+    def test_lists_of_any_length(self):
+        expected = "select * from t where id in (?+)"
+        for sql in ("SELECT * FROM t WHERE id IN (1)", "SELECT * FROM t WHERE id IN (?)",
+                    "SELECT * FROM t WHERE id IN (1, 2, 3)", "SELECT * FROM t WHERE id in ( %s )"):
+            self.assertEqual(fingerprint(sql), expected, sql)
+
+    def test_values_rows(self):
+        expected = "insert into t (id) values (?+)"
+        for sql in ("INSERT INTO t (id) VALUES (1)", "INSERT INTO t (id) VALUES (?), (?), (?)",
+                    "INSERT INTO t (id) VALUES (%s),(%s)"):
+            self.assertEqual(fingerprint(sql), expected, sql)
+        self.assertEqual(fingerprint("INSERT INTO t (id, name) VALUES (?, ?), (?, ?)"),
+                         "insert into t (id, name) values (?+)")
+        # 函数参数不是列表，不折叠
+        self.assertEqual(fingerprint("SELECT lower(?), upper(?) FROM t"), "select lower(?), upper(?) from t")
+
+
+
+class ReporterTest(unittest.TestCase):
+    def test_reporter_survives_sink_errors(self):
+        stats = QueryStats()
+        calls = []
+        done = threading.Event()
+
+        def sink(text):
+            calls.append(text)
+            if len(calls) == 1:
+                raise OSError("broken handler")
+            done.set()
+
+        with self.assertLogs("babySql", logging.ERROR):
+            stats.start_reporter(0.01, sink)
+            self.assertTrue(done.wait(5))
+        stats.stop_reporter()
+        self.assertGreaterEqual(len(calls), 2)
+        # 线程停止后可以再次启动
+        stats.start_reporter(0.01, lambda text: None)
+        stats.stop_reporter()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import os
+import tempfile
+import unittest
+
+from babySql import BabySql
+
+
+class PagesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = BabySql(dt_type="sqlite", db=os.path.join(self.tmp.name, "test.db"), max_connections=2)
+        self.db.user_defined_sql("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        self.db.insert("t", ["id", "name"], [[i, f"name{i}"] for i in range(1, 26)])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_pages_does_not_change_builder(self):
+        query = self.db.select("t", ["id", "name"]).seek(order=["id"], size=10)
+        self.assertEqual([len(rows) for rows in query.pages()], [10, 10, 5])
+        self.assertEqual([len(rows) for rows in query.pages()], [10, 10, 5])
+        self.assertEqual([row[0] for row in query.run()], list(range(1, 11)))
+
+    def test_pages_from_after(self):
+        query = self.db.select("t", ["id"]).seek(after={"id": 20}, order=["id"], size=3)
+        self.assertEqual([[row[0] for row in rows] for rows in query.pages()], [[21, 22, 23], [24, 25]])
+        self.assertEqual([row[0] for row in query.run()], [21, 22, 23])
+
+
+if __name__ == "__main__":
+    unittest.main()
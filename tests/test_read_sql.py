@@ -0,0 +1,22 @@
+import unittest
+
+from babySql.tools.select.s_base import is_read_sql
+
+
+class IsReadSqlTest(unittest.TestCase):
+    def test_read(self):
+        for sql in ("SELECT * FROM t", "  (SELECT id FROM t)", "show tables", "EXPLAIN SELECT 1",
+                    "SELECT updated_at FROM t", "SELECT * FROM t ORDER BY intos"):
+            self.assertTrue(is_read_sql(sql), sql)
+
+    def test_write(self):
+        for sql in ("UPDATE t SET a = 1", "SELECT * FROM t WHERE id = 1 FOR UPDATE",
+                    "select * from t for no key update", "SELECT * FROM t FOR SHARE",
+                    "SELECT * FROM t LOCK IN SHARE MODE", "SELECT nextval('t_id_seq')",
+                    "SELECT setval('t_id_seq', 10)", "SELECT LAST_INSERT_ID()", "SELECT * INTO t2 FROM t",
+                    "SELECT pg_advisory_lock(1)", "SELECT GET_LOCK('a', 10)"):
+            self.assertFalse(is_read_sql(sql), sql)
+
+
+if __name__ == "__main__":
+    unittest.main()
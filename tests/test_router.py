@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from dbutils.pooled_db import TooManyConnectionsError
+
+from babySql.tools.pool import StatsPooledDB
+from babySql.tools.router import ReplicaRouter
+
+
+class ReplicaRouterTest(unittest.TestCase):
+    """
+    以SQLite连接池代替主库与只读实例，每个库的who表记录库名
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pools = {}
+        for name in ("primary", "replica1", "replica2"):
+            path = os.path.join(self.tmp.name, f"{name}.db")
+            connect = sqlite3.connect(path)
+            connect.execute("CREATE TABLE who (name TEXT)")
+            connect.execute("INSERT INTO who VALUES (?)", (name,))
+            connect.commit()
+            connect.close()
+            self.pools[name] = StatsPooledDB(creator=sqlite3, maxconnections=1, blocking=False, database=path,
+                                             check_same_thread=False)
+
+    def tearDown(self):
+        for pool in self.pools.values():
+            pool.close()
+        self.tmp.cleanup()
+
+    def router(self, replicas=("replica1", "replica2"), **kwargs):
+        return ReplicaRouter(self.pools["primary"], [self.pools[name] for name in replicas], **kwargs)
+
+    @staticmethod
+    def read(router, route: str = None):
+        connect = router.reader(route).connection()
+        try:
+            cursor = connect.cursor()
+            cursor.execute("SELECT name FROM who")
+            return cursor.fetchone()[0]
+        finally:
+            connect.close()
+
+    def test_round_robin(self):
+        router = self.router()
+        self.assertEqual([self.read(router) for _ in range(4)], ["replica1", "replica2", "replica1", "replica2"])
+        self.assertEqual(router.stats()["replica_reads"], [2, 2])
+
+    def test_least_busy(self):
+        router = self.router(strategy="least_busy")
+        busy = self.pools["replica1"].connection()
+        try:
+            # 轮询位置指向replica1，但它的连接已被占用
+            self.assertEqual([self.read(router) for _ in range(2)], ["replica2", "replica2"])
+        finally:
+            busy.close()
+        self.assertEqual(self.read(router), "replica1")
+
+    def test_read_your_writes(self):
+        router = self.router(read_your_writes=0.2)
+        self.assertEqual(self.read(router), "replica1")
+        connect = router.writer().connection()
+        connect.cursor().execute("SELECT 1")
+        # 写连接归还后才开始窗口
+        self.assertEqual(self.read(router, "replica"), "replica2")
+        connect.close()
+        self.assertEqual(self.read(router), "primary")
+        # 窗口内仍可指定只读实例
+        self.assertEqual(self.read(router, "replica"), "replica1")
+        time.sleep(0.25)
+        self.assertEqual(self.read(router), "replica2")
+        self.assertEqual(router.stats()["writes"], 1)
+
+    def test_fallback_to_primary(self):
+        router = self.router(replicas=("replica1",))
+        busy = self.pools["replica1"].connection()
+        try:
+            self.assertEqual(self.read(router), "primary")
+            # 指定只读实例时不回退
+            self.assertRaises(TooManyConnectionsError, self.read, router, "replica")
+        finally:
+            busy.close()
+        self.assertEqual(self.read(router), "replica1")
+        stats = router.stats()
+        self.assertEqual(stats["fallbacks"], 1)
+        self.assertEqual(stats["primary_reads"], 1)
+
+    def test_route_override(self):
+        router = self.router()
+        self.assertEqual(self.read(router, "primary"), "primary")
+        self.assertEqual(self.read(router, "replica"), "replica1")
+        self.assertRaises(ValueError, router.reader, "replcia")
+
+    def test_route_checked_for_writes(self):
+        from babySql import BabySql
+        # 路由在获取连接之前校验，不需要连接数据库
+        for dt_type in ("mysql", "mariadb", "postgresql"):
+            db = BabySql(dt_type=dt_type, host="127.0.0.1", port=1, user="root", passwd="", db="test")
+            try:
+                self.assertRaises(ValueError, db.user_defined_sql, "DELETE FROM t", route="replcia")
+                self.assertRaises(ValueError, db.user_defined_sql, "DELETE FROM t", route="replica")
+            finally:
+                db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
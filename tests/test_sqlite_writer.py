@@ -0,0 +1,154 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from concurrent.futures import Future
+
+from babySql import BabySql
+from babySql.tools.sqlite_writer import SQLiteWriter
+
+
+class SQLiteWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test.db")
+        connect = sqlite3.connect(self.path)
+        connect.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        connect.commit()
+        connect.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def count(self):
+        connect = sqlite3.connect(self.path)
+        try:
+            return connect.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+        finally:
+            connect.close()
+
+    def blocked(self, writer: SQLiteWriter):
+        """
+        提交一个在写线程中阻塞的写操作，之后提交的写操作在队列中等待，release后合并为一个事务
+        """
+        started = threading.Event()
+        release = threading.Event()
+
+        def wait():
+            started.set()
+            release.wait()
+
+        writer.submit("INSERT INTO t (id, name) VALUES (?, ?)", (0, "block"), on_commit=wait)
+        started.wait()
+        return release
+
+    def test_concurrent_submit(self):
+        writer = SQLiteWriter(self.path)
+        futures = []
+        lock = threading.Lock()
+
+        def work(start):
+            for i in range(start, start + 50):
+                future = writer.submit("INSERT INTO t (id, name) VALUES (?, ?)", (i, f"name{i}"))
+                with lock:
+                    futures.append(future)
+
+        threads = [threading.Thread(target=work, args=(i * 50 + 1,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([future.result() for future in futures], [1] * 400)
+        writer.close()
+        self.assertEqual(self.count(), 400)
+        self.assertEqual(writer.stats()["jobs"], 400)
+
+    def test_failed_job_only_fails_its_future(self):
+        writer = SQLiteWriter(self.path)
+        release = self.blocked(writer)
+        first = writer.submit("INSERT INTO t (id, name) VALUES (?, ?)", (1, "a"))
+        duplicate = writer.submit("INSERT INTO t (id, name) VALUES (?, ?)", (1, "b"))
+        last = writer.submit("INSERT INTO t (id, name) VALUES (?, ?)", (2, "c"), result="lastrowid")
+        release.set()
+        self.assertEqual(first.result(), 1)
+        self.assertRaises(sqlite3.IntegrityError, duplicate.result)
+        self.assertEqual(last.result(), 2)
+        stats = writer.stats()
+        writer.close()
+        # 阻塞的写操作单独一批，之后的三个写操作合并为一个事务
+        self.assertEqual(stats["batches"], 2)
+        self.assertEqual(stats["max_batch_size"], 3)
+        self.assertEqual(stats["last_batch_size"], 3)
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(self.count(), 3)
+
+    def test_max_batch(self):
+        writer = SQLiteWriter(self.path, max_batch=10)
+        release = self.blocked(writer)
+        futures = [writer.submit("INSERT INTO t (id, name) VALUES (?, ?)", (i, "x")) for i in range(1, 26)]
+        release.set()
+        for future in futures:
+            future.result()
+        stats = writer.stats()
+        writer.close()
+        self.assertEqual(stats["jobs"], 26)
+        self.assertEqual(stats["batches"], 4)
+        self.assertEqual(stats["max_batch_size"], 10)
+
+    def test_close_drains_queue(self):
+        writer = SQLiteWriter(self.path)
+        release = self.blocked(writer)
+        futures = [writer.submit("INSERT INTO t (id, name) VALUES (?, ?)", (i, "x")) for i in range(1, 101)]
+        threading.Timer(0.05, release.set).start()
+        writer.close()
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(self.count(), 101)
+        self.assertRaises(RuntimeError, writer.submit, "DELETE FROM t")
+
+    def test_script_runs_outside_batch(self):
+        writer = SQLiteWriter(self.path)
+        release = self.blocked(writer)
+        before = writer.submit("INSERT INTO t (id, name) VALUES (?, ?)", (1, "a"))
+        script = writer.submit_script("CREATE TABLE s (id INTEGER); INSERT INTO s VALUES (1);")
+        after = writer.submit("INSERT INTO s VALUES (?)", (2,))
+        release.set()
+        self.assertEqual(before.result(), 1)
+        self.assertIsNone(script.result())
+        self.assertEqual(after.result(), 1)
+        writer.close()
+        # 阻塞的写操作、脚本之前的写操作、脚本、脚本之后的写操作各为一批
+        self.assertEqual(writer.stats()["batches"], 4)
+
+
+class SqLiteWriterModeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = BabySql(dt_type="sqlite", db=os.path.join(self.tmp.name, "test.db"), max_connections=2,
+                          writer=True, result_cache=16)
+        self.db.execute_script("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT);").result()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_user_defined_sql_uses_writer(self):
+        self.db.insert("t", ["id", "name"], [[1, "a"], [2, "b"]]).result()
+        self.assertEqual(self.db.select("t", ["id"]).cache().run(), [(1,), (2,)])
+        future = self.db.user_defined_sql("DELETE FROM t WHERE id = ?", (2,))
+        self.assertIsInstance(future, Future)
+        self.assertEqual(future.result(), 1)
+        # 写操作提交后结果缓存已清空
+        self.assertEqual(self.db.select("t", ["id"]).cache().run(), [(1,)])
+        self.assertEqual(self.db.user_defined_sql("SELECT name FROM t"), [("a",)])
+        self.assertEqual(self.db.writer_stats()["failed"], 0)
+
+    def test_ddl_waits_for_writer(self):
+        self.db.add_column("t", "age", "INTEGER")
+        self.assertIn("age", [column["name"] for column in self.db.table_info("t")])
+        self.db.drop_table("t")
+        self.assertNotIn("t", self.db.show_tables())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from babySql import BabySql
+
+
+class TransactionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test.db")
+        self.db = BabySql(dt_type="sqlite", db=self.path, max_connections=4, result_cache=16)
+        self.db.user_defined_sql("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def committed(self):
+        """
+        从独立的连接读取已提交的数据
+        """
+        connect = sqlite3.connect(self.path)
+        try:
+            return connect.execute("SELECT id, name FROM t ORDER BY id").fetchall()
+        finally:
+            connect.close()
+
+    def test_commit_once_on_exit(self):
+        with self.db.transaction() as tx:
+            tx.insert("t", ["id", "name"], [1, "Rose"])
+            tx.insert("t", ["id", "name"], [[2, "Jack"], [3, "Tom"]])
+            tx.update("t", {"name": "Lily"}).equal("id", 3).run()
+            # 事务内的操作使用同一个连接，能读到未提交的数据；其他连接读不到
+            self.assertEqual(tx.select("t", ["id"]).run(), [(1,), (2,), (3,)])
+            self.assertEqual(self.committed(), [])
+        self.assertEqual(self.committed(), [(1, "Rose"), (2, "Jack"), (3, "Lily")])
+
+    def test_rollback_on_exception(self):
+        with self.assertRaises(ValueError):
+            with self.db.transaction() as tx:
+                tx.insert("t", ["id", "name"], [1, "Rose"])
+                raise ValueError("abort")
+        self.assertEqual(self.committed(), [])
+        self.assertEqual(self.db.select("t").run(), [])
+        self.assertRaises(RuntimeError, getattr, tx, "insert")
+
+    def test_savepoint_rollback_keeps_transaction(self):
+        with self.db.transaction() as tx:
+            tx.insert("t", ["id", "name"], [1, "Rose"])
+            with self.assertRaises(sqlite3.IntegrityError):
+                with tx.savepoint():
+                    tx.insert("t", ["id", "name"], [2, "Jack"])
+                    tx.insert("t", ["id", "name"], [1, "Duplicate"])
+            with tx.transaction():
+                tx.insert("t", ["id", "name"], [3, "Tom"])
+        self.assertEqual(self.committed(), [(1, "Rose"), (3, "Tom")])
+
+    def test_view_bypasses_cache(self):
+        self.db.insert("t", ["id", "name"], [1, "Rose"])
+        self.assertEqual(self.db.select("t", ["name"]).cache().run(), [("Rose",)])
+        with self.db.transaction() as tx:
+            self.assertIsNone(tx.__cache__)
+            self.assertIsNot(tx.__pool__, self.db.__pool__)
+            tx.update("t", {"name": "Jack"}).equal("id", 1).run()
+            # 事务内不使用缓存的结果
+            self.assertEqual(tx.select("t", ["name"]).cache().run(), [("Jack",)])
+        self.assertIsNotNone(self.db.__cache__)
+        # 提交后缓存已清空
+        self.assertEqual(self.db.select("t", ["name"]).cache().run(), [("Jack",)])
+
+
+class WriterTransactionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = BabySql(dt_type="sqlite", db=os.path.join(self.tmp.name, "test.db"), max_connections=2,
+                          writer=True)
+        self.db.execute_script("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT);").result()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_view_bypasses_writer(self):
+        with self.db.transaction() as tx:
+            self.assertIsNone(tx.__writer__)
+            # 事务内的写操作直接在事务连接上执行，返回最后插入的行ID而不是Future
+            self.assertEqual(tx.insert("t", ["id", "name"], [1, "Rose"]), 1)
+            self.assertEqual(tx.update("t", {"name": "Jack"}).equal("id", 1).run(), [])
+        self.assertIsNotNone(self.db.__writer__)
+        self.assertEqual(self.db.select("t").run(), [(1, "Jack")])
+        self.assertEqual(self.db.writer_stats()["jobs"], 1)
+
+
+class RouterTransactionTest(unittest.TestCase):
+    def test_view_bypasses_router(self):
+        # 只构建实例不连接数据库：事务视图去掉路由，查询与写操作都使用事务连接
+        from babySql.tools.transaction import Transaction
+        db = BabySql(dt_type="mysql", host="127.0.0.1", port=1, user="root", passwd="", db="test",
+                     replicas=[{"host": "127.0.0.2"}])
+        try:
+            tx = Transaction(db)
+            connect = FakeConnection()
+            db.__pool__, pool = FakePool(connect), db.__pool__
+            try:
+                with tx:
+                    self.assertIsNone(tx.__router__)
+                    self.assertIs(tx._read_pool().connection()._connect, connect)
+                    self.assertIs(tx._write_pool().connection()._connect, connect)
+            finally:
+                db.__pool__ = pool
+            self.assertEqual(connect.calls, ["begin", "commit", "close"])
+        finally:
+            db.close()
+
+
+class FakeConnection:
+    def __init__(self):
+        self.calls = []
+
+    def begin(self):
+        self.calls.append("begin")
+
+    def commit(self):
+        self.calls.append("commit")
+
+    def rollback(self):
+        self.calls.append("rollback")
+
+    def close(self):
+        self.calls.append("close")
+
+
+class FakePool:
+    def __init__(self, connect):
+        self._connect = connect
+
+    def connection(self):
+        return self._connect
+
+
+if __name__ == "__main__":
+    unittest.main()